@@ -7,13 +7,17 @@ import json
 import aiohttp
 
 import base64
-
+import os
 
 bedrock_agent_runtime = boto3.client("bedrock-agent-runtime", region_name="us-west-2")
 
 
 ENV_ENDPOINT = "http://environment.computer-use.local:5000/execute"
 
+# Return only what changed between consecutive screenshots to the agent
+SCREENSHOT_DELTA = os.getenv("SCREENSHOT_DELTA", "false").lower() == "true"
+SCREENSHOT_MAX_BYTES = int(os.getenv("SCREENSHOT_MAX_BYTES", "150000"))
+
 
 logging.basicConfig(
     format="[%(asctime)s] p%(process)s {%(filename)s:%(lineno)d} %(levelname)s - %(message)s",
@@ -22,6 +26,7 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 from anthropic_local.tools import ToolResult
+from screenshot_delta import ScreenshotDeltaEncoder
 from anthropic.types import (
     ImageBlockParam,
     MessageParam,
@@ -48,6 +53,11 @@ async def invoke_agent_with_roc(
     # sessionId = str(uuid.uuid4())
     agent_answer = str()
     sessionState = {"returnControlInvocationResults": list(), "invocationId": str()}
+    screenshot_encoder = (
+        ScreenshotDeltaEncoder(max_bytes=SCREENSHOT_MAX_BYTES)
+        if SCREENSHOT_DELTA
+        else None
+    )
 
     # Anthropic defined tools
     # tool_collection = ToolCollection(
@@ -240,20 +250,10 @@ async def invoke_agent_with_roc(
                                                 "function": functionInvocationInput[
                                                     "function"
                                                 ],
-                                                "responseBody": {
-                                                    "IMAGES": {
-                                                        "images": [
-                                                            {
-                                                                "format": "png",
-                                                                "source": {
-                                                                    "bytes": base64.b64decode(
-                                                                        result.base64_image
-                                                                    )
-                                                                },
-                                                            }
-                                                        ]
-                                                    }
-                                                },
+                                                "responseBody": _screenshot_response_body(
+                                                    result.base64_image,
+                                                    screenshot_encoder,
+                                                ),
                                             }
                                         }
                                     )
@@ -298,6 +298,37 @@ async def invoke_agent_with_roc(
             raise Exception("unexpected event.", e)
 
 
+def _screenshot_response_body(
+    base64_image: str, encoder: ScreenshotDeltaEncoder | None
+) -> dict:
+    """Return of control response body for a screenshot, delta encoded with encoder."""
+    if encoder is None:
+        return {
+            "IMAGES": {
+                "images": [
+                    {
+                        "format": "png",
+                        "source": {"bytes": base64.b64decode(base64_image)},
+                    }
+                ]
+            }
+        }
+    screenshot = encoder.encode(base64_image)
+    logger.info(
+        f"Screenshot sent as {screenshot.kind}, {len(screenshot.data or b'')} bytes"
+    )
+    response_body = {}
+    if screenshot.text:
+        response_body["TEXT"] = {"body": screenshot.text}
+    if screenshot.data is not None:
+        response_body["IMAGES"] = {
+            "images": [
+                {"format": screenshot.format, "source": {"bytes": screenshot.data}}
+            ]
+        }
+    return response_body
+
+
 def _make_api_tool_result(result: ToolResult, tool_use_id: str) -> ToolResultBlockParam:
     """Convert an agent ToolResult to an API ToolResultBlockParam."""
     tool_result_content: list[TextBlockParam | ImageBlockParam] | str = []
@@ -0,0 +1,143 @@
+"""Delta encoding of the screenshots returned to the agent.
+
+Consecutive screenshots of a computer use session usually differ in a small
+region, such as a menu that opened or text that was typed. Instead of a full
+PNG for every action, ScreenshotDeltaEncoder sends:
+
+- a keyframe, the full screenshot, for the first action and periodically after
+- only the changed region, with its position on the screen, when little changed
+- the full screenshot with the unchanged areas at reduced resolution otherwise
+- no image at all when nothing changed
+
+Images are encoded as WebP, or JPEG when Pillow lacks WebP support, with the
+highest quality that fits the byte budget. Cropping to the changed region also
+lowers the number of image tokens, which grows with the number of pixels.
+"""
+
+import base64
+import io
+from dataclasses import dataclass
+
+from PIL import Image, ImageChops, features
+
+UNCHANGED_TEXT = "The screen did not change since the previous screenshot."
+
+
+@dataclass
+class EncodedScreenshot:
+    kind: str  # keyframe, region, frame or unchanged
+    format: str | None = None
+    data: bytes | None = None
+    text: str | None = None
+
+
+class ScreenshotDeltaEncoder:
+    def __init__(
+        self,
+        max_bytes: int = 150_000,
+        keyframe_interval: int = 10,
+        region_ratio: float = 0.3,
+        pixel_threshold: int = 8,
+        margin: int = 16,
+        downsample: int = 2,
+        min_quality: int = 30,
+        max_quality: int = 85,
+    ):
+        """
+        Args:
+            max_bytes: byte budget of every encoded image
+            keyframe_interval: actions between two full screenshots
+            region_ratio: largest share of the screen sent as a changed region
+            pixel_threshold: smallest channel difference counted as a change
+            margin: pixels of context around the changed region
+            downsample: resolution divisor for the unchanged areas of a frame
+            min_quality, max_quality: range of the WebP/JPEG quality
+        """
+        self.max_bytes = max_bytes
+        self.keyframe_interval = keyframe_interval
+        self.region_ratio = region_ratio
+        self.pixel_threshold = pixel_threshold
+        self.margin = margin
+        self.downsample = downsample
+        self.min_quality = min_quality
+        self.max_quality = max_quality
+        self.format = "webp" if features.check("webp") else "jpeg"
+        self._previous: Image.Image | None = None
+        self._since_keyframe = 0
+
+    def encode(self, base64_png: str) -> EncodedScreenshot:
+        """Encode a screenshot relative to the previous one."""
+        image = Image.open(io.BytesIO(base64.b64decode(base64_png))).convert("RGB")
+        previous, self._previous = self._previous, image
+        self._since_keyframe += 1
+        if (
+            previous is None
+            or previous.size != image.size
+            or self._since_keyframe >= self.keyframe_interval
+        ):
+            self._since_keyframe = 0
+            return EncodedScreenshot("keyframe", self.format, self._fit(image))
+
+        box = self.changed_box(previous, image)
+        if box is None:
+            return EncodedScreenshot("unchanged", text=UNCHANGED_TEXT)
+        left, top, right, bottom = box
+        width, height = image.size
+        if (right - left) * (bottom - top) <= self.region_ratio * width * height:
+            text = (
+                f"Only the region from ({left}, {top}) to ({right}, {bottom}) of the "
+                f"{width}x{height} screen changed since the previous screenshot. The "
+                f"image shows that region, add ({left}, {top}) to positions in it to "
+                "get screen coordinates."
+            )
+            return EncodedScreenshot(
+                "region", self.format, self._fit(image.crop(box)), text
+            )
+
+        # The unchanged areas keep their layout but compress to a few bytes
+        reduced = image.resize(
+            (max(1, width // self.downsample), max(1, height // self.downsample)),
+            Image.Resampling.BILINEAR,
+        ).resize(image.size, Image.Resampling.BILINEAR)
+        reduced.paste(image.crop(box), (left, top))
+        return EncodedScreenshot("frame", self.format, self._fit(reduced))
+
+    def changed_box(
+        self, previous: Image.Image, image: Image.Image
+    ) -> tuple[int, int, int, int] | None:
+        """Bounding box of the pixels that changed, with a margin, or None."""
+        red, green, blue = ImageChops.difference(previous, image).split()
+        difference = ImageChops.lighter(ImageChops.lighter(red, green), blue)
+        box = difference.point(
+            lambda value: 255 if value > self.pixel_threshold else 0
+        ).getbbox()
+        if box is None:
+            return None
+        left, top, right, bottom = box
+        return (
+            max(0, left - self.margin),
+            max(0, top - self.margin),
+            min(image.width, right + self.margin),
+            min(image.height, bottom + self.margin),
+        )
+
+    def _save(self, image: Image.Image, quality: int) -> bytes:
+        buffer = io.BytesIO()
+        image.save(buffer, format=self.format.upper(), quality=quality)
+        return buffer.getvalue()
+
+    def _fit(self, image: Image.Image) -> bytes:
+        """Encode with the highest quality that fits max_bytes, or the lowest."""
+        data = self._save(image, self.max_quality)
+        if len(data) <= self.max_bytes:
+            return data
+        best = None
+        low, high = self.min_quality, self.max_quality - 1
+        while low <= high:
+            quality = (low + high) // 2
+            data = self._save(image, quality)
+            if len(data) <= self.max_bytes:
+                best, low = data, quality + 1
+            else:
+                high = quality - 1
+        return best if best is not None else self._save(image, self.min_quality)
@@ -0,0 +1,130 @@
+"""Compare delta-encoded screenshots with full PNGs on a sequence of frames.
+
+By default the frames are synthetic: a desktop on which a window opens, text is
+typed, a menu opens and closes and the pointer moves. With --display, frames
+are grabbed from a running X server instead, e.g. Xvfb in the sandbox while an
+agent works in it (needs mss):
+
+    python screenshot_delta_benchmark.py
+    python screenshot_delta_benchmark.py --display :1 --frames 30 --interval 1
+
+Image tokens are estimated as width * height / 750.
+"""
+
+import argparse
+import base64
+import io
+import time
+
+from PIL import Image, ImageDraw
+
+from screenshot_delta import ScreenshotDeltaEncoder
+
+
+def synthetic_frames(width: int = 1024, height: int = 768):
+    """Yield a sequence of desktop-like frames where most actions change little."""
+    desktop = Image.new("RGB", (width, height), (58, 110, 165))
+    draw = ImageDraw.Draw(desktop)
+    draw.rectangle((0, height - 32, width, height), fill=(40, 40, 40))
+    for x in range(8, 200, 40):
+        draw.rectangle((x, height - 28, x + 32, height - 4), fill=(200, 200, 200))
+    yield desktop.copy()
+
+    # a window opens
+    draw.rectangle((120, 80, 900, 620), fill=(250, 250, 250), outline=(0, 0, 0))
+    draw.rectangle((120, 80, 900, 110), fill=(70, 70, 90))
+    draw.text((130, 88), "Untitled - Text Editor", fill=(255, 255, 255))
+    yield desktop.copy()
+
+    # text is typed line by line
+    for line in range(8):
+        draw.text(
+            (140, 130 + line * 18),
+            f"Line {line}: the quick brown fox jumps over the lazy dog",
+            fill=(0, 0, 0),
+        )
+        yield desktop.copy()
+
+    # nothing happens
+    yield desktop.copy()
+
+    # a menu opens and closes
+    with_menu = desktop.copy()
+    menu = ImageDraw.Draw(with_menu)
+    menu.rectangle((130, 110, 300, 260), fill=(235, 235, 235), outline=(0, 0, 0))
+    for item in range(6):
+        menu.text((140, 118 + item * 22), f"Menu item {item}", fill=(0, 0, 0))
+    yield with_menu
+    yield desktop.copy()
+
+    # the pointer moves across the screen
+    for step in range(5):
+        frame = desktop.copy()
+        x, y = 200 + step * 120, 300 + step * 40
+        ImageDraw.Draw(frame).polygon(
+            [(x, y), (x, y + 18), (x + 5, y + 14), (x + 12, y + 12)], fill=(0, 0, 0)
+        )
+        yield frame
+
+
+def x_frames(display: str, count: int, interval: float):
+    import mss
+
+    with mss.mss(display=display) as sct:
+        for _ in range(count):
+            shot = sct.grab(sct.monitors[0])
+            yield Image.frombytes("RGB", shot.size, shot.rgb)
+            time.sleep(interval)
+
+
+def to_base64_png(image: Image.Image) -> str:
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+def tokens(image_bytes: bytes | None) -> int:
+    if not image_bytes:
+        return 0
+    width, height = Image.open(io.BytesIO(image_bytes)).size
+    return round(width * height / 750)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--display", help="X display to grab, e.g. :1")
+    parser.add_argument("--frames", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--max-bytes", type=int, default=150_000)
+    args = parser.parse_args()
+
+    frames = (
+        x_frames(args.display, args.frames, args.interval)
+        if args.display
+        else synthetic_frames()
+    )
+    encoder = ScreenshotDeltaEncoder(max_bytes=args.max_bytes)
+    png_total = delta_total = png_tokens = delta_tokens = 0
+    print(f"{'step':>4} {'kind':>9} {'png bytes':>10} {'bytes':>8} {'tokens':>13}")
+    for step, frame in enumerate(frames):
+        png = to_base64_png(frame)
+        png_bytes = base64.b64decode(png)
+        encoded = encoder.encode(png)
+        size = len(encoded.data or b"")
+        png_total += len(png_bytes)
+        delta_total += size
+        png_tokens += tokens(png_bytes)
+        delta_tokens += tokens(encoded.data)
+        print(
+            f"{step:>4} {encoded.kind:>9} {len(png_bytes):>10} {size:>8}"
+            f" {tokens(png_bytes):>6} {tokens(encoded.data):>6}"
+        )
+    print(
+        f"total: {delta_total} bytes for {png_total} bytes of PNG "
+        f"({delta_total / png_total:.1%}), "
+        f"{delta_tokens} image tokens for {png_tokens}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ from anthropic.types.beta import BetaToolComputerUse20241022Param, BetaToolUnion
 
 from .base import BaseAnthropicTool, ToolError, ToolResult
 from .run import run
+from .screen import ScreenCapture
 
 OUTPUT_DIR = "/tmp/outputs"
 
@@ -94,8 +95,11 @@ class BaseComputerTool:
     height: int
     display_num: int | None
 
+    # longest wait for the screen to settle before taking a screenshot
     _screenshot_delay = 2.0
     _scaling_enabled = True
+    # grab the screen in process, falls back to gnome-screenshot/scrot
+    _in_process_capture = True
 
     @property
     def options(self) -> ComputerToolOptions:
@@ -122,6 +126,11 @@ class BaseComputerTool:
             self._display_prefix = ""
 
         self.xdotool = f"{self._display_prefix}xdotool"
+        self._capture = (
+            ScreenCapture.for_display(self.display_num)
+            if self._in_process_capture and ScreenCapture.available()
+            else None
+        )
 
     async def __call__(
         self,
@@ -217,8 +226,22 @@ class BaseComputerTool:
 
         return self.scale_coordinates(ScalingSource.API, int(coordinate[0]), int(coordinate[1]))
 
-    async def screenshot(self):
+    async def screenshot(self, frame=None):
         """Take a screenshot of the current screen and return the base64 encoded image."""
+        if self._capture is not None:
+            try:
+                if frame is None:
+                    frame = await self._capture.grab()
+                size = None
+                if self._scaling_enabled:
+                    size = self.scale_coordinates(
+                        ScalingSource.COMPUTER, self.width, self.height
+                    )
+                return ToolResult(base64_image=await self._capture.encode(frame, size))
+            except Exception:
+                # e.g. no access to the display, keep using the screenshot commands
+                self._capture = None
+
         output_dir = Path(OUTPUT_DIR)
         output_dir.mkdir(parents=True, exist_ok=True)
         path = output_dir / f"screenshot_{uuid4().hex}.png"
@@ -251,9 +274,17 @@ class BaseComputerTool:
         base64_image = None
 
         if take_screenshot:
-            # delay to let things settle before taking a screenshot
-            await asyncio.sleep(self._screenshot_delay)
-            base64_image = (await self.screenshot()).base64_image
+            frame = None
+            if self._capture is not None:
+                # wait until the screen stops changing, at most _screenshot_delay
+                try:
+                    frame = await self._capture.settle(self._screenshot_delay)
+                except Exception:
+                    self._capture = None
+            if frame is None:
+                # delay to let things settle before taking a screenshot
+                await asyncio.sleep(self._screenshot_delay)
+            base64_image = (await self.screenshot(frame)).base64_image
 
         return ToolResult(output=stdout, error=stderr, base64_image=base64_image)
 
@@ -0,0 +1,101 @@
+"""In-process screen capture for the computer tool.
+
+Frames are grabbed from the X server with MIT-SHM (XShmGetImage) through mss,
+and resized and PNG-encoded in memory with Pillow, instead of running a
+screenshot tool, writing a file and resizing it with ImageMagick.
+"""
+
+import asyncio
+import base64
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import mss
+    from PIL import Image
+except ImportError:  # fall back to the screenshot commands
+    mss = None
+
+
+class ScreenCapture:
+    """Grabs frames of an X display.
+
+    mss instances are bound to the thread that created them, so every grab runs
+    on the same dedicated thread, which also keeps resizing and encoding off the
+    event loop. Tools are created for every request, so they share one instance
+    per display through for_display.
+    """
+
+    _instances: dict[int | None, "ScreenCapture"] = {}
+
+    def __init__(self, display_num: int | None):
+        self.display = f":{display_num}" if display_num is not None else None
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="screen-capture"
+        )
+        self._sct = None
+
+    @staticmethod
+    def available() -> bool:
+        return mss is not None
+
+    @classmethod
+    def for_display(cls, display_num: int | None) -> "ScreenCapture":
+        if display_num not in cls._instances:
+            cls._instances[display_num] = cls(display_num)
+        return cls._instances[display_num]
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _grab(self):
+        if self._sct is None:
+            self._sct = mss.mss(display=self.display)
+        return self._sct.grab(self._sct.monitors[0])
+
+    async def grab(self):
+        """Grab the whole screen, returns an mss ScreenShot."""
+        return await self._run(self._grab)
+
+    async def settle(
+        self,
+        timeout: float,
+        interval: float = 0.1,
+        min_delay: float = 0.2,
+        stable_frames: int = 2,
+    ):
+        """Wait until the screen stops changing and return the last frame.
+
+        The screen is considered settled once it has not changed between
+        stable_frames + 1 grabs, interval seconds apart. The first grab happens after
+        min_delay, to give applications time to start reacting to the action,
+        and the frame grabbed when timeout runs out is returned if the screen
+        keeps changing, e.g. for an animation or a video.
+        """
+        deadline = time.monotonic() + timeout
+        await asyncio.sleep(min(min_delay, timeout))
+        frame = await self.grab()
+        unchanged = 0
+        while unchanged < stable_frames:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(interval, remaining))
+            previous, frame = frame, await self.grab()
+            unchanged = unchanged + 1 if frame.raw == previous.raw else 0
+        return frame
+
+    @staticmethod
+    def _encode(frame, size: tuple[int, int] | None) -> str:
+        image = Image.frombytes("RGB", frame.size, frame.rgb)
+        if size is not None and size != image.size:
+            image = image.resize(size, Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG", compress_level=3)
+        return base64.b64encode(buffer.getvalue()).decode()
+
+    async def encode(self, frame, size: tuple[int, int] | None = None) -> str:
+        """Encode a frame as a base64 PNG, resized to size if given."""
+        return await self._run(self._encode, frame, size)
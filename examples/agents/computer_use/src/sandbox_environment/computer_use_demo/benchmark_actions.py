@@ -0,0 +1,64 @@
+"""Benchmark the round-trip time of computer tool actions in the sandbox.
+
+Runs the same actions with in-process capture and change-aware settling, then
+with the screenshot commands and the fixed delay, and prints p50/p95 for each.
+Run it inside the sandbox container, where Xvfb is started and DISPLAY_NUM,
+WIDTH and HEIGHT are set:
+
+    python computer_use_demo/benchmark_actions.py --rounds 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from anthropic_local.tools import ComputerTool20250124
+
+ACTIONS = [
+    {"action": "mouse_move", "coordinate": [100, 100]},
+    {"action": "left_click", "coordinate": [200, 150]},
+    {"action": "mouse_move", "coordinate": [400, 300]},
+    {"action": "screenshot"},
+]
+
+
+async def benchmark(tool: ComputerTool20250124, rounds: int) -> dict[str, list[float]]:
+    timings: dict[str, list[float]] = {}
+    for _ in range(rounds):
+        for action in ACTIONS:
+            start = time.perf_counter()
+            result = await tool(**action)
+            elapsed = (time.perf_counter() - start) * 1e3
+            assert result.base64_image, f"no screenshot for {action}"
+            timings.setdefault(action["action"], []).append(elapsed)
+    return timings
+
+
+def report(name: str, timings: dict[str, list[float]]):
+    print(name)
+    for action, values in timings.items():
+        values = sorted(values)
+        p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+        print(
+            f"  {action:12} p50 {statistics.median(values):8.1f} ms"
+            f"  p95 {p95:8.1f} ms"
+        )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    in_process = ComputerTool20250124()
+    if in_process._capture is None:
+        raise SystemExit("mss and pillow are needed for in-process capture")
+    report("in-process capture", await benchmark(in_process, args.rounds))
+
+    ComputerTool20250124._in_process_capture = False
+    report("screenshot commands", await benchmark(ComputerTool20250124(), args.rounds))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,16 +1,17 @@
 import boto3
-import base64
 import os
 
-from io import BytesIO
 from datetime import datetime, timedelta
 from aws_lambda_powertools import Logger
-
+from frame_pipeline import FramePipeline
 
 # Environment variables
 FRAMES_BUCKET = os.environ["FRAMES_BUCKET"]
 SAMPLING_INTERVAL_MS = 3000  # 3 seconds
 FRAMES_PER_GROUP = 25
+# Frames within this many bits of the last kept frame's hash are dropped, -1 keeps all
+DEDUP_THRESHOLD = int(os.environ.get("DEDUP_THRESHOLD", "5"))
+UPLOAD_CONCURRENCY = int(os.environ.get("UPLOAD_CONCURRENCY", "8"))
 
 # Initialize AWS clients
 s3_client = boto3.client("s3")
@@ -78,47 +79,17 @@ def get_frames(client, stream_name, start_time, end_time):
     return response.get("Images", [])
 
 
-def process_frames(frames, stream_name):
-    """Process and group frames."""
+def process_frames(frames, stream_name, keep_bytes=False):
+    """Deduplicate, upload and group frames."""
     logger.info(f"Retrieved {len(frames)} images")
 
-    frame_groups = []
-    current_group = []
-
-    for frame in frames:
-        if "Error" in frame:
-            continue
-
-        frame_data = process_single_frame(frame, stream_name)
-        current_group.append(frame_data)
-
-        if len(current_group) == FRAMES_PER_GROUP:
-            frame_groups.append(current_group)
-            current_group = []
-
-    # Add any remaining frames as a group
-    if current_group:
-        frame_groups.append(current_group)
-
-    return frame_groups
-
-
-def process_single_frame(frame, stream_name):
-    """Process a single frame: decode, upload to S3, and return metadata."""
-    image_data = base64.b64decode(frame["ImageContent"])
-    image_file = BytesIO(image_data)
-
-    timestamp = frame["TimeStamp"]
-    s3_frame_key = f"frames/{timestamp.isoformat()}_{os.urandom(4).hex()}.png"
-
-    try:
-        s3_client.upload_fileobj(image_file, FRAMES_BUCKET, s3_frame_key)
-    except Exception as e:
-        logger.error(f"Error uploading frame to S3: {str(e)}")
-        raise
-
-    return {
-        "timestamp_string": timestamp.isoformat(),
-        "s3_frame_key": s3_frame_key,
-        "stream_name": stream_name,
-    }
+    pipeline = FramePipeline(
+        s3_client,
+        FRAMES_BUCKET,
+        threshold=DEDUP_THRESHOLD,
+        max_workers=UPLOAD_CONCURRENCY,
+        frames_per_group=FRAMES_PER_GROUP,
+        keep_bytes=keep_bytes,
+        logger=logger,
+    )
+    return pipeline.run(frames, stream_name)
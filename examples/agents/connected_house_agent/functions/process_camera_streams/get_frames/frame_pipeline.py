@@ -0,0 +1,131 @@
+import base64
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from PIL import Image
+
+HASH_SIZE = 8
+
+
+def perceptual_hash(image_data, hash_size=HASH_SIZE):
+    """Difference hash of an image: one bit per pixel of a small grayscale copy,
+    set when the pixel is brighter than its right neighbour. Frames that look
+    alike have hashes that differ in few bits, even with sensor noise or
+    compression artifacts."""
+    with Image.open(BytesIO(image_data)) as image:
+        image.draft("L", (hash_size * 8, hash_size * 8))
+        pixels = (
+            image.convert("L")
+            .resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR)
+            .tobytes()
+        )
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+class FramePipeline:
+    """Decode, deduplicate, upload and group frames returned by KVS GetImages.
+
+    A frame is dropped when its perceptual hash is within ``threshold`` bits of
+    the last frame kept, so a static scene is stored and sent to the model once
+    instead of every sampling interval. Kept frames are uploaded to S3
+    concurrently.
+
+    With ``keep_bytes`` each frame's metadata also carries its PNG bytes, so a
+    processing step running in the same invocation does not download them again.
+    The bytes are not JSON serializable, so leave it off when the groups are
+    returned to Step Functions.
+    """
+
+    def __init__(
+        self,
+        s3_client,
+        bucket,
+        threshold=5,
+        max_workers=8,
+        frames_per_group=25,
+        keep_bytes=False,
+        logger=None,
+    ):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.threshold = threshold
+        self.max_workers = max_workers
+        self.frames_per_group = frames_per_group
+        self.keep_bytes = keep_bytes
+        self.logger = logger
+
+    def run(self, frames, stream_name):
+        """Return the kept frames' metadata in groups of ``frames_per_group``."""
+        kept = self.deduplicate(self.decode(frames))
+        uploaded = self.upload(kept, stream_name)
+        return [
+            uploaded[start : start + self.frames_per_group]
+            for start in range(0, len(uploaded), self.frames_per_group)
+        ]
+
+    def decode(self, frames):
+        """Return ``(timestamp, image_data)`` for frames without errors."""
+        return [
+            (frame["TimeStamp"], base64.b64decode(frame["ImageContent"]))
+            for frame in frames
+            if "Error" not in frame and "ImageContent" in frame
+        ]
+
+    def deduplicate(self, decoded):
+        if self.threshold is None or self.threshold < 0:
+            return decoded
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            hashes = list(executor.map(lambda item: perceptual_hash(item[1]), decoded))
+
+        kept = []
+        last_hash = None
+        for item, frame_hash in zip(decoded, hashes):
+            if (
+                last_hash is not None
+                and hamming_distance(frame_hash, last_hash) <= self.threshold
+            ):
+                continue
+            kept.append(item)
+            last_hash = frame_hash
+
+        if self.logger:
+            self.logger.info(f"Kept {len(kept)} of {len(decoded)} frames")
+        return kept
+
+    def upload(self, kept, stream_name):
+        def upload_frame(item):
+            timestamp, image_data = item
+            s3_frame_key = f"frames/{timestamp.isoformat()}_{os.urandom(4).hex()}.png"
+            try:
+                self.s3_client.upload_fileobj(
+                    BytesIO(image_data), self.bucket, s3_frame_key
+                )
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Error uploading frame to S3: {str(e)}")
+                raise
+
+            frame_data = {
+                "timestamp_string": timestamp.isoformat(),
+                "s3_frame_key": s3_frame_key,
+                "stream_name": stream_name,
+            }
+            if self.keep_bytes:
+                frame_data["image_bytes"] = image_data
+            return frame_data
+
+        # boto3 clients are thread safe; map keeps the frames in time order
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(upload_frame, kept))
@@ -2,17 +2,17 @@ import json
 import os
 import boto3
 import base64
+from concurrent.futures import ThreadPoolExecutor
 from aws_lambda_powertools import Logger
 
 # Environment variables
 FRAMES_BUCKET = os.environ["FRAMES_BUCKET"]
-DELIVERY_STREAM = os.environ["DELIVERY_STREAM"]
 MODEL_ID = os.environ["MODEL_ID"]
+DOWNLOAD_CONCURRENCY = int(os.environ.get("DOWNLOAD_CONCURRENCY", "8"))
 
 
 # Initialize AWS clients
 s3_client = boto3.client("s3")
-firehose_client = boto3.client("firehose")
 bedrock_client = boto3.client("bedrock-runtime", region_name="us-west-2")
 
 
@@ -26,7 +26,7 @@ def lambda_handler(event, context):
         timestamp_string = payload[0]["timestamp_string"]
         stream_name = payload[0]["stream_name"]
 
-        encoded_images = [encode_image(image["s3_frame_key"]) for image in payload]
+        encoded_images = encode_images(payload)
 
         prompt = get_prompt(stream_name)
         model_payload = get_prompt_payload(encoded_images, prompt)
@@ -42,11 +42,12 @@ def lambda_handler(event, context):
             "stream_name": stream_name,
         }
 
-        push_to_firehose(result_payload)
-
+        # Written to Firehose with the descriptions of the other groups by the
+        # WriteDescriptions step that follows the map
         return {
             "statusCode": 200,
             "body": json.dumps({"message": "Processing completed successfully"}),
+            "description": result_payload,
         }
 
     except Exception as e:
@@ -54,6 +55,23 @@ def lambda_handler(event, context):
         return {"statusCode": 500, "body": json.dumps({"error": str(e)})}
 
 
+def encode_images(frames):
+    """Encode the frames of a group, in order.
+
+    Frames that carry their bytes from a previous step in the same invocation
+    are encoded directly, the rest are downloaded from S3 concurrently.
+    """
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_CONCURRENCY) as executor:
+        return list(executor.map(encode_frame, frames))
+
+
+def encode_frame(frame):
+    image_bytes = frame.get("image_bytes")
+    if image_bytes is not None:
+        return base64.b64encode(image_bytes).decode("utf-8")
+    return encode_image(frame["s3_frame_key"])
+
+
 def encode_image(s3_frame_key):
     try:
         response = s3_client.get_object(Bucket=FRAMES_BUCKET, Key=s3_frame_key)
@@ -128,14 +146,3 @@ def invoke_model(payload):
 
 def get_completion_from_response(response):
     return response["output"]["message"]["content"][0]["text"]
-
-
-def push_to_firehose(json_payload):
-    try:
-        firehose_client.put_record(
-            DeliveryStreamName=DELIVERY_STREAM,
-            Record={"Data": json.dumps(json_payload) + "\n"},
-        )
-    except Exception as e:
-        logger.error(f"Error pushing to Firehose: {str(e)}")
-        raise
@@ -0,0 +1,158 @@
+import importlib.util
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+WRITE_DESCRIPTIONS = os.path.join(os.path.dirname(__file__), "..", "write_descriptions")
+sys.path.insert(0, WRITE_DESCRIPTIONS)
+
+from firehose_writer import (
+    MAX_RECORD_BYTES,
+    FirehoseBatchWriter,
+    FirehoseDeliveryError,
+)
+
+
+class LocalFirehose:
+    """Stands in for the boto3 Firehose client, rejecting chosen records."""
+
+    def __init__(self, reject=None):
+        self.batches = []
+        self.delivered = []
+        # Number of times each record is rejected before it is accepted
+        self.reject = dict(reject or {})
+
+    def put_record_batch(self, DeliveryStreamName, Records):
+        self.batches.append([record["Data"] for record in Records])
+        responses = []
+        for record in Records:
+            if self.reject.get(record["Data"], 0) > 0:
+                self.reject[record["Data"]] -= 1
+                responses.append({"ErrorCode": "ServiceUnavailableException"})
+            else:
+                self.delivered.append(record["Data"])
+                responses.append({"RecordId": "id"})
+        return {
+            "FailedPutCount": sum("ErrorCode" in r for r in responses),
+            "RequestResponses": responses,
+        }
+
+
+class TestFirehoseBatchWriter(unittest.TestCase):
+    def test_flushes_at_record_limit(self):
+        firehose = LocalFirehose()
+        writer = FirehoseBatchWriter(firehose, "stream")
+
+        for idx in range(1201):
+            writer.put(f"{idx}\n")
+
+        self.assertEqual([len(batch) for batch in firehose.batches], [500, 500])
+        self.assertEqual(len(writer), 201)
+        writer.flush()
+        self.assertEqual(len(firehose.delivered), 1201)
+        self.assertEqual(firehose.delivered[0], b"0\n")
+
+    def test_flushes_before_byte_limit(self):
+        firehose = LocalFirehose()
+        writer = FirehoseBatchWriter(firehose, "stream", max_bytes=2500)
+
+        for _ in range(3):
+            writer.put(b"x" * 1000)
+
+        self.assertEqual([len(batch) for batch in firehose.batches], [2])
+        self.assertEqual(len(writer), 1)
+
+    def test_retries_only_failed_records(self):
+        firehose = LocalFirehose(reject={b"b": 2})
+        writer = FirehoseBatchWriter(firehose, "stream", backoff=0)
+
+        for data in ("a", "b", "c"):
+            writer.put(data)
+        writer.flush()
+
+        self.assertEqual(firehose.batches, [[b"a", b"b", b"c"], [b"b"], [b"b"]])
+        self.assertEqual(sorted(firehose.delivered), [b"a", b"b", b"c"])
+
+    def test_raises_after_retries(self):
+        firehose = LocalFirehose(reject={b"b": 10})
+        writer = FirehoseBatchWriter(firehose, "stream", max_retries=2, backoff=0)
+
+        writer.put("a")
+        writer.put("b")
+        with self.assertRaises(FirehoseDeliveryError) as error:
+            writer.flush()
+
+        self.assertEqual(error.exception.failed_records, [b"b"])
+        self.assertEqual(len(firehose.batches), 3)
+
+    def test_rejects_oversized_record(self):
+        writer = FirehoseBatchWriter(LocalFirehose(), "stream")
+
+        with self.assertRaises(ValueError):
+            writer.put(b"x" * (MAX_RECORD_BYTES + 1))
+
+
+@unittest.skipUnless(
+    importlib.util.find_spec("aws_lambda_powertools"), "needs aws-lambda-powertools"
+)
+class TestWriteDescriptions(unittest.TestCase):
+    def setUp(self):
+        self.firehose = LocalFirehose()
+        spec = importlib.util.spec_from_file_location(
+            "write_descriptions_app", os.path.join(WRITE_DESCRIPTIONS, "app.py")
+        )
+        self.app = importlib.util.module_from_spec(spec)
+        with mock.patch.dict(os.environ, {"DELIVERY_STREAM": "stream"}), mock.patch(
+            "boto3.client", return_value=self.firehose
+        ):
+            spec.loader.exec_module(self.app)
+
+    def group_result(self, idx):
+        return {
+            "statusCode": 200,
+            "description": {
+                "timestamp_string": "2025-02-10 10:00:00",
+                "description": f"Group {idx}",
+                "stream_name": "kitchen",
+            },
+        }
+
+    def test_writes_all_groups_in_one_batch(self):
+        results = [self.group_result(idx) for idx in range(4)]
+        results.append({"statusCode": 500, "body": json.dumps({"error": "failed"})})
+
+        response = self.app.lambda_handler({"Payload": results}, None)
+
+        self.assertEqual(response["statusCode"], 200)
+        self.assertEqual(len(self.firehose.batches), 1)
+        self.assertEqual(
+            [json.loads(data)["description"] for data in self.firehose.delivered],
+            ["Group 0", "Group 1", "Group 2", "Group 3"],
+        )
+
+    def test_chunks_at_batch_limit(self):
+        results = [self.group_result(idx) for idx in range(1200)]
+
+        self.app.lambda_handler({"Payload": results}, None)
+
+        self.assertEqual(
+            [len(batch) for batch in self.firehose.batches], [500, 500, 200]
+        )
+
+    def test_delivery_error_is_returned(self):
+        self.firehose.reject = {
+            (json.dumps(self.group_result(0)["description"]) + "\n").encode(): 10
+        }
+        with mock.patch("firehose_writer.time.sleep"):
+            response = self.app.lambda_handler(
+                {"Payload": [self.group_result(0)]}, None
+            )
+
+        self.assertEqual(response["statusCode"], 500)
+        self.assertIn("not delivered", json.loads(response["body"])["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import base64
+import os
+import sys
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from io import BytesIO
+
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "get_frames"))
+
+from frame_pipeline import FramePipeline, hamming_distance, perceptual_hash
+
+
+class LocalS3:
+    """Stands in for the boto3 S3 client, keeping objects in memory."""
+
+    def __init__(self):
+        self.objects = {}
+        self.threads = set()
+        self.lock = threading.Lock()
+
+    def upload_fileobj(self, fileobj, bucket, key):
+        time.sleep(0.005)
+        with self.lock:
+            self.objects[(bucket, key)] = fileobj.read()
+            self.threads.add(threading.get_ident())
+
+
+def png(box=None, noise=0):
+    image = Image.new("RGB", (320, 240), (40 + noise, 90, 140))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 160, 320, 240), fill=(90, 70, 50))
+    if box:
+        draw.rectangle(box, fill=(230, 220, 210))
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def kvs_frames(images):
+    start = datetime(2024, 1, 1, 12, 0, 0)
+    return [
+        {
+            "TimeStamp": start + timedelta(seconds=3 * idx),
+            "ImageContent": base64.b64encode(image).decode(),
+        }
+        for idx, image in enumerate(images)
+    ]
+
+
+class TestFramePipeline(unittest.TestCase):
+    def test_similar_frames_hash_close(self):
+        empty = perceptual_hash(png())
+        self.assertLessEqual(hamming_distance(empty, perceptual_hash(png(noise=2))), 2)
+        self.assertGreater(
+            hamming_distance(empty, perceptual_hash(png(box=(120, 40, 220, 200)))), 5
+        )
+
+    def test_drops_near_duplicates(self):
+        s3 = LocalS3()
+        images = [
+            png(),
+            png(noise=1),
+            png(noise=2),
+            png(box=(20, 40, 120, 200)),
+            png(box=(20, 40, 120, 200)),
+            png(box=(200, 40, 300, 200)),
+        ]
+
+        (group,) = FramePipeline(s3, "frames").run(kvs_frames(images), "kitchen")
+
+        self.assertEqual(
+            [frame["timestamp_string"] for frame in group],
+            ["2024-01-01T12:00:00", "2024-01-01T12:00:09", "2024-01-01T12:00:15"],
+        )
+        self.assertEqual(len(s3.objects), 3)
+        self.assertEqual(s3.objects[("frames", group[1]["s3_frame_key"])], images[3])
+        self.assertNotIn("image_bytes", group[0])
+
+    def test_groups_and_uploads_concurrently(self):
+        s3 = LocalS3()
+        images = [png(box=(idx * 10, 0, idx * 10 + 5, 240)) for idx in range(30)]
+        frames = kvs_frames(images) + [{"TimeStamp": datetime.now(), "Error": "x"}]
+
+        groups = FramePipeline(s3, "frames", threshold=-1, max_workers=4).run(
+            frames, "kitchen"
+        )
+
+        self.assertEqual([len(group) for group in groups], [25, 5])
+        self.assertEqual(len(s3.objects), 30)
+        self.assertGreater(len(s3.threads), 1)
+
+    def test_keep_bytes(self):
+        images = [png(), png(box=(20, 40, 120, 200))]
+
+        (group,) = FramePipeline(LocalS3(), "frames", keep_bytes=True).run(
+            kvs_frames(images), "kitchen"
+        )
+
+        self.assertEqual([frame["image_bytes"] for frame in group], images)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import json
+import os
+import boto3
+from aws_lambda_powertools import Logger
+from firehose_writer import FirehoseBatchWriter
+
+# Environment variables
+DELIVERY_STREAM = os.environ["DELIVERY_STREAM"]
+
+
+# Initialize AWS clients
+firehose_client = boto3.client("firehose")
+
+
+# Set up logging
+logger = Logger()
+
+
+def lambda_handler(event, context):
+    """Write the descriptions of every frame group of an execution to Firehose.
+
+    Runs once after the ProcessFrames map, so the descriptions go out in as few
+    PutRecordBatch calls as the batch limits allow instead of one call per group.
+    Groups that failed to process have no description and are skipped.
+    """
+    try:
+        descriptions = [
+            result["description"]
+            for result in event["Payload"]
+            if isinstance(result, dict) and result.get("description")
+        ]
+
+        writer = FirehoseBatchWriter(firehose_client, DELIVERY_STREAM, logger=logger)
+        for description in descriptions:
+            writer.put(json.dumps(description) + "\n")
+        writer.flush()
+
+        logger.info(f"Wrote {len(descriptions)} descriptions to Firehose")
+
+        return {
+            "statusCode": 200,
+            "body": json.dumps({"message": f"Wrote {len(descriptions)} descriptions"}),
+        }
+
+    except Exception as e:
+        logger.error(f"Error writing to Firehose: {str(e)}")
+        return {"statusCode": 500, "body": json.dumps({"error": str(e)})}
@@ -0,0 +1,111 @@
+import threading
+import time
+
+# Service limits of PutRecordBatch
+MAX_BATCH_RECORDS = 500
+MAX_BATCH_BYTES = 4 * 1024 * 1024
+MAX_RECORD_BYTES = 1000 * 1024
+
+
+class FirehoseDeliveryError(Exception):
+    """Raised when records are still rejected after all retries."""
+
+    def __init__(self, failed_records):
+        self.failed_records = failed_records
+        super().__init__(
+            f"{len(failed_records)} records were not delivered to Firehose"
+        )
+
+
+class FirehoseBatchWriter:
+    """Buffers records and delivers them with PutRecordBatch.
+
+    Records are flushed when the buffer reaches ``max_records`` or ``max_bytes``,
+    and on ``flush``. Only the entries Firehose rejects are retried, with
+    exponential backoff.
+
+    A Lambda function must call ``flush`` before its invocation returns. Records
+    left in the buffer are lost when the execution environment is reclaimed.
+    """
+
+    def __init__(
+        self,
+        client,
+        delivery_stream,
+        max_records=MAX_BATCH_RECORDS,
+        max_bytes=MAX_BATCH_BYTES,
+        max_retries=3,
+        backoff=0.1,
+        logger=None,
+    ):
+        self.client = client
+        self.delivery_stream = delivery_stream
+        self.max_records = min(max_records, MAX_BATCH_RECORDS)
+        self.max_bytes = min(max_bytes, MAX_BATCH_BYTES)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.logger = logger
+
+        self._records = []
+        self._size = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._records)
+
+    def put(self, data):
+        """Buffer one record, flushing first when it would not fit the batch."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if len(data) > MAX_RECORD_BYTES:
+            raise ValueError(
+                f"Record of {len(data)} bytes exceeds the Firehose limit of {MAX_RECORD_BYTES}"
+            )
+
+        with self._lock:
+            if self._records and (
+                len(self._records) + 1 > self.max_records
+                or self._size + len(data) > self.max_bytes
+            ):
+                self.flush()
+
+            self._records.append(data)
+            self._size += len(data)
+
+            if len(self._records) >= self.max_records or self._size >= self.max_bytes:
+                self.flush()
+
+    def flush(self):
+        """Deliver every buffered record."""
+        with self._lock:
+            records = self._records
+            self._records = []
+            self._size = 0
+
+            if records:
+                self._put_record_batch(records)
+
+    def _put_record_batch(self, records):
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+
+            response = self.client.put_record_batch(
+                DeliveryStreamName=self.delivery_stream,
+                Records=[{"Data": data} for data in records],
+            )
+            if not response.get("FailedPutCount"):
+                return
+
+            # Responses are in the order of the records
+            records = [
+                data
+                for data, result in zip(records, response["RequestResponses"])
+                if "ErrorCode" in result
+            ]
+            if self.logger:
+                self.logger.warning(
+                    f"Firehose rejected {len(records)} records, attempt {attempt + 1}"
+                )
+
+        raise FirehoseDeliveryError(records)
@@ -1,9 +1,14 @@
 import boto3
 import json
 import time
+import os
 import zipfile
 from io import BytesIO
 
+LAMBDA_DISPATCHER_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "src", "utils", "lambda_dispatcher.py"
+)
+
 iam_client = boto3.client('iam')
 sts_client = boto3.client('sts')
 session = boto3.session.Session()
@@ -47,6 +52,8 @@ def create_lambda(lambda_function_name, lambda_iam_role):
     s = BytesIO()
     z = zipfile.ZipFile(s, 'w')
     z.write("lambda_function.py")
+    # Shared action group dispatcher imported by lambda_function.py
+    z.write(LAMBDA_DISPATCHER_FILE, "lambda_dispatcher.py")
     z.close()
     zip_content = s.getvalue()
 
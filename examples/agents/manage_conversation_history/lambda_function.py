@@ -1,17 +1,13 @@
-import json
 import uuid
-import boto3
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table('restaurant_bookings')
+from lambda_dispatcher import ActionGroupDispatcher, resource
 
-def get_named_parameter(event, name):
-    """
-    Get a parameter from the lambda event
-    """
-    return next(item for item in event['parameters'] if item['name'] == name)['value']
+dispatcher = ActionGroupDispatcher()
+# Created once per execution environment and reused by warm invocations
+table = resource('dynamodb').Table('restaurant_bookings')
 
 
+@dispatcher.action()
 def get_booking_details(booking_id):
     """
     Retrieve details of a restaurant booking
@@ -29,6 +25,7 @@ def get_booking_details(booking_id):
         return {'error': str(e)}
 
 
+@dispatcher.action()
 def create_booking(date, name, hour, num_guests):
     """
     Create a new restaurant booking
@@ -55,6 +52,7 @@ def create_booking(date, name, hour, num_guests):
         return {'error': str(e)}
 
 
+@dispatcher.action()
 def delete_booking(booking_id):
     """
     Delete an existing restaurant booking
@@ -73,55 +71,7 @@ def delete_booking(booking_id):
     
 
 def lambda_handler(event, context):
-    # get the action group used during the invocation of the lambda function
-    actionGroup = event.get('actionGroup', '')
-    
-    # name of the function that should be invoked
-    function = event.get('function', '')
-    
-    # parameters to invoke function with
-    parameters = event.get('parameters', [])
-
-    if function == 'get_booking_details':
-        booking_id = get_named_parameter(event, "booking_id")
-        if booking_id:
-            response = str(get_booking_details(booking_id))
-            responseBody = {'TEXT': {'body': json.dumps(response)}}
-        else:
-            responseBody = {'TEXT': {'body': 'Missing booking_id parameter'}}
-
-    elif function == 'create_booking':
-        date = get_named_parameter(event, "date")
-        name = get_named_parameter(event, "name")
-        hour = get_named_parameter(event, "hour")
-        num_guests = get_named_parameter(event, "num_guests")
-
-        if date and hour and num_guests:
-            response = str(create_booking(date, name, hour, num_guests))
-            responseBody = {'TEXT': {'body': json.dumps(response)}}
-        else:
-            responseBody = {'TEXT': {'body': 'Missing required parameters'}}
-
-    elif function == 'delete_booking':
-        booking_id = get_named_parameter(event, "booking_id")
-        if booking_id:
-            response = str(delete_booking(booking_id))
-            responseBody = {'TEXT': {'body': json.dumps(response)}}
-        else:
-            responseBody = {'TEXT': {'body': 'Missing booking_id parameter'}}
-
-    else:
-        responseBody = {'TEXT': {'body': 'Invalid function'}}
-
-    action_response = {
-        'actionGroup': actionGroup,
-        'function': function,
-        'functionResponse': {
-            'responseBody': responseBody
-        }
-    }
-
-    function_response = {'response': action_response, 'messageVersion': event['messageVersion']}
+    function_response = dispatcher.dispatch(event, context)
     print("Response: {}".format(function_response))
 
-    return function_response
\ No newline at end of file
+    return function_response
@@ -17,6 +17,48 @@ import {
   CHART_PROMPT
 } from "../env.js";
 
+/**
+ * Rows of a query result as objects, also when the function returned them in
+ * columnar form (column names once, then an array of values per row)
+ *
+ * @param {Object} data - The stored query result
+ * @returns {Array<Object>} - One object per row
+ */
+const resultRecords = (data) => {
+  if (!data.columns) {
+    return data.result;
+  }
+  return data.result.map((row) =>
+    Object.fromEntries(data.columns.map((column, x) => [column, row[x]]))
+  );
+};
+
+/**
+ * Data of an answer, stored in the answer item or, for large results, in a
+ * shared result item that the answer references
+ *
+ * @param {DynamoDBClient} dynamodb - The DynamoDB client
+ * @param {Object} item - The answer item
+ * @returns {Promise<Object>} - The stored query result
+ */
+const answerData = async (dynamodb, item) => {
+  if (!item.hasOwnProperty("data_ref")) {
+    return JSON.parse(item.data.S);
+  }
+  const response = await dynamodb.send(
+    new QueryCommand({
+      TableName: QUESTION_ANSWERS_TABLE_NAME,
+      KeyConditionExpression: "id = :dataRef",
+      ExpressionAttributeValues: {
+        ":dataRef": {
+          S: item.data_ref.S,
+        },
+      },
+    })
+  );
+  return JSON.parse(response.Items[0].data.S);
+};
+
 /**
  * Query data from DynamoDB
  *
@@ -49,7 +91,9 @@ export const getQueryResults = async (queryUuid = "") => {
       for (let i = 0; i < response.Items.length; i++) {
         queryResults.push({
           query: response.Items[i].query.S,
-          query_results: JSON.parse(response.Items[i].data.S).result,
+          query_results: resultRecords(
+            await answerData(dynamodb, response.Items[i])
+          ),
         });
       }
     }
@@ -3,105 +3,74 @@ import json
 import os
 import psycopg2
 import uuid
-from botocore.exceptions import ClientError
-from decimal import Decimal
-from datetime import date, datetime
+from datetime import datetime
+from db import PostgreSQLPool, SecretCache
+from query_cache import QueryResultCache
+from result_encoder import encode_results, get_size
+from psycopg2.errors import QueryCanceled
 
 SECRET_NAME = os.environ["SECRET_NAME"]
 POSTGRESQL_HOST = os.environ["POSTGRESQL_HOST"]
 DATABASE_NAME = os.environ["DATABASE_NAME"]
 QUESTION_ANSWERS_TABLE = os.environ["QUESTION_ANSWERS_TABLE"]
 AWS_REGION = os.environ["AWS_REGION"]
+STATEMENT_TIMEOUT_MS = int(os.environ.get("STATEMENT_TIMEOUT_MS", "30000"))
+SECRET_TTL_SECONDS = int(os.environ.get("SECRET_TTL_SECONDS", "300"))
+# Size of the query results returned to the agent, in bytes of JSON
+MAX_RESULT_BYTES = int(os.environ.get("MAX_RESULT_BYTES", "24000"))
+# "columns" returns the column names once and every row as an array of values
+RESULT_FORMAT = os.environ.get("RESULT_FORMAT", "records")
+# Seconds a query result is reused for the same query, 0 disables the cache
+QUERY_CACHE_TTL_SECONDS = int(os.environ.get("QUERY_CACHE_TTL_SECONDS", "300"))
+# Change it after reloading the database to invalidate the cached results
+DATA_VERSION = os.environ.get("DATA_VERSION", "1")
+# Larger results are stored once and referenced by the answers
+INLINE_RESULT_BYTES = int(os.environ.get("INLINE_RESULT_BYTES", "1000"))
 
 FILE_TABLES_INFORMATION = "tables_information.txt"
 
-def get_secret(secret_name, region_name):
-    # Create a Secrets Manager client
-    session = boto3.session.Session()
-    client = session.client(service_name="secretsmanager", region_name=region_name)
-    try:
-        get_secret_value_response = client.get_secret_value(SecretId=secret_name)
-    except ClientError as e:
-        # For a list of exceptions thrown, see
-        # https://docs.aws.amazon.com/secretsmanager/latest/apireference/API_GetSecretValue.html
-        raise e
-    secret = json.loads(get_secret_value_response["SecretString"])
-    print(secret)
-    return secret
-
-
-def get_postgresql_connection():
-    secret = get_secret(SECRET_NAME, AWS_REGION)
-    try:
-        conn = psycopg2.connect(
-            host=POSTGRESQL_HOST,
-            database=DATABASE_NAME,
-            user=secret["username"],
-            password=secret["password"],
-        )
-        print("Connected to the PostgreSQL database!")
-    except (Exception, psycopg2.Error) as error:
-        print("Error connecting to the PostgreSQL database:", error)
-        return False
-    return conn
+# Reused by every invocation of a warm execution environment
+secret_cache = SecretCache(SECRET_NAME, AWS_REGION, ttl=SECRET_TTL_SECONDS)
+postgresql_pool = PostgreSQLPool(
+    POSTGRESQL_HOST,
+    DATABASE_NAME,
+    secret_cache,
+    statement_timeout_ms=STATEMENT_TIMEOUT_MS,
+)
+query_cache = QueryResultCache(
+    QUESTION_ANSWERS_TABLE, data_version=DATA_VERSION, ttl=QUERY_CACHE_TTL_SECONDS
+)
 
 
-def get_size(string):
-    return len(string.encode("utf-8"))
+def get_query_results(sql_query):
+    # The query runs inside DECLARE ... CURSOR FOR, which takes a single statement
+    sql_query = sql_query.strip().rstrip(";")
 
+    def run_query(cur):
+        cur.execute(sql_query)
+        return encode_results(
+            cur,
+            max_bytes=MAX_RESULT_BYTES,
+            columnar=RESULT_FORMAT == "columns",
+            fetch_size=cur.itersize,
+        )
 
-def get_query_results(sql_query):
-    connection = get_postgresql_connection()
-    if connection == False:
+    # Execute a SQL query, fetching rows from a server-side cursor until the
+    # response is full
+    try:
+        return postgresql_pool.run(run_query, cursor_name="agent_query")
+    except QueryCanceled:
+        return {
+            "error": f"The query was cancelled after {STATEMENT_TIMEOUT_MS // 1000} seconds, ask the user to narrow down the question."
+        }
+    except psycopg2.OperationalError as error:
+        print("Error connecting to the PostgreSQL database:", error)
         return {
             "error": "Something went wrong connecting to the database, ask the user to try again later."
         }
-
-    message = ""
-    cur = connection.cursor()
-    records = []
-    records_to_return = []
-    # Execute a SQL query
-    try:
-        cur.execute(sql_query)
-        rows = cur.fetchall()
-        column_names = [desc[0] for desc in cur.description]
-        for item in rows:
-            record = {}
-            for x, value in enumerate(item):
-                if type(value) is Decimal:
-                    record[column_names[x]] = float(value)
-                elif isinstance(value, date):
-                    record[column_names[x]] = str(value)
-                else:
-                    record[column_names[x]] = value
-            records.append(record)
-        if get_size(json.dumps(records)) > 24000:
-
-            for item in records:
-                if get_size(json.dumps(records_to_return)) <= 24000:
-                    records_to_return.append(item)
-            message = (
-                "The data is too large, it has been truncated from "
-                + str(len(records))
-                + " to "
-                + str(len(records_to_return))
-                + " rows."
-            )
-        else:
-            records_to_return = records
-
     except (Exception, psycopg2.Error) as error:
         print("Error executing SQL query:", error)
-        connection.rollback()  # Rollback the transaction if there's an error
-        return {"error": error.pgerror}
-    # Close the cursor and the connection
-    ##cur.close()
-    # conn.close()
-    if message != "":
-        return {"result": records_to_return, "message": message}
-    else:
-        return {"result": records_to_return}
+        return {"error": getattr(error, "pgerror", None) or str(error)}
 
 
 def lambda_handler(event, context):
@@ -133,25 +102,39 @@ def lambda_handler(event, context):
         print("*---------*")
 
         if sql_query != "":
-            data = get_query_results(sql_query)
+            cache_key = query_cache.key(sql_query)
+            data = query_cache.get(cache_key)
+            cached = data is not None
+            if data is None:
+                data = get_query_results(sql_query)
             print("---------")
             print(data)
             print("---------")
             if "error" in data:
                 result = data
             else:
+                if not cached:
+                    query_cache.put(cache_key, data)
+                data_json = json.dumps(data)
+                answer = {
+                    "id": {"S": query_uuid},
+                    "my_timestamp": {"N": str(int(datetime.now().timestamp()))},
+                    "datetime": {"S": str(datetime.now())},
+                    "question": {"S": user_question},
+                    "query": {"S": sql_query},
+                }
+                data_ref = None
+                if get_size(data_json) > INLINE_RESULT_BYTES:
+                    data_ref = query_cache.store(data_json)
+                if data_ref:
+                    answer["data_ref"] = {"S": data_ref}
+                else:
+                    answer["data"] = {"S": data_json}
                 dynamodb_client = boto3.client("dynamodb")
                 try:
                     response = dynamodb_client.put_item(
                         TableName=QUESTION_ANSWERS_TABLE,
-                        Item={
-                            "id": {"S": query_uuid},
-                            "my_timestamp": {"N": str(int(datetime.now().timestamp()))},
-                            "datetime": {"S": str(datetime.now())},
-                            "question": {"S": user_question},
-                            "query": {"S": sql_query},
-                            "data": {"S": json.dumps(data)},
-                        },
+                        Item=answer,
                     )
                 except:
                     print("Error writing the answer in dynamodb")
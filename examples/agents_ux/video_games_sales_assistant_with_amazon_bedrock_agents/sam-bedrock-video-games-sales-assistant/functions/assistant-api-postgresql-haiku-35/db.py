@@ -0,0 +1,172 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+import boto3
+import psycopg2
+from psycopg2 import errors, pool
+
+
+class SecretCache:
+    """Caches a Secrets Manager secret for the lifetime of the execution environment.
+
+    The secret is fetched again after ``ttl`` seconds, or when ``refresh`` is called
+    because the database rejected the cached credentials after a rotation.
+    """
+
+    def __init__(self, secret_name, region_name, ttl=300):
+        self.secret_name = secret_name
+        self.ttl = ttl
+        self.client = boto3.client(
+            service_name="secretsmanager", region_name=region_name
+        )
+        self._secret = None
+        self._version_id = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if self._secret is None or time.monotonic() - self._fetched_at > self.ttl:
+                self._fetch()
+            return self._secret
+
+    def refresh(self):
+        """Fetch the secret again, returns True if it changed."""
+        with self._lock:
+            version_id = self._version_id
+            self._fetch()
+            return self._version_id != version_id
+
+    def _fetch(self):
+        response = self.client.get_secret_value(SecretId=self.secret_name)
+        self._secret = json.loads(response["SecretString"])
+        self._version_id = response.get("VersionId")
+        self._fetched_at = time.monotonic()
+
+
+def _is_authentication_error(error):
+    return isinstance(error, psycopg2.OperationalError) and (
+        "authentication failed" in str(error)
+    )
+
+
+class PostgreSQLPool:
+    """Keeps PostgreSQL connections open across invocations of a warm Lambda container.
+
+    Connections are opened on first use with the cached credentials. They run in
+    read-only autocommit mode, so no transaction stays open between invocations,
+    with a server-side statement timeout. A connection that the server or proxy
+    closed while the container was frozen is replaced, and the query retried once.
+    When the credentials are rejected, the secret is fetched again in case it was
+    rotated, and the pool is reopened with the new credentials.
+    """
+
+    def __init__(
+        self,
+        host,
+        database,
+        credentials,
+        maxconn=2,
+        statement_timeout_ms=30000,
+        connect_timeout=5,
+    ):
+        """
+        Args:
+            host: PostgreSQL or RDS Proxy endpoint
+            database: name of the database
+            credentials: a SecretCache, or any object whose get() returns a dict with
+                username and password, and whose refresh() fetches them again
+            maxconn: maximum number of open connections
+            statement_timeout_ms: queries running longer are cancelled by the server
+            connect_timeout: seconds to wait for a new connection
+        """
+        self.host = host
+        self.database = database
+        self.credentials = credentials
+        self.maxconn = maxconn
+        self.statement_timeout_ms = statement_timeout_ms
+        self.connect_timeout = connect_timeout
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                secret = self.credentials.get()
+                self._pool = pool.ThreadedConnectionPool(
+                    0,
+                    self.maxconn,
+                    host=self.host,
+                    database=self.database,
+                    user=secret["username"],
+                    password=secret["password"],
+                    connect_timeout=self.connect_timeout,
+                    options=f"-c statement_timeout={int(self.statement_timeout_ms)}",
+                )
+            return self._pool
+
+    def _reset(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+
+    def _connect(self):
+        try:
+            conn = self._get_pool().getconn()
+        except psycopg2.OperationalError as error:
+            if not _is_authentication_error(error):
+                raise
+            # The password may have been rotated since the secret was cached
+            self.credentials.refresh()
+            self._reset()
+            conn = self._get_pool().getconn()
+        if conn.autocommit is False:
+            conn.set_session(readonly=True, autocommit=True)
+        return conn
+
+    @contextmanager
+    def cursor(self, name=None):
+        """Yield a cursor on a pooled connection, returning the connection afterwards.
+
+        With a name, the cursor is a server-side cursor that fetches rows on demand.
+        It needs a transaction, which is rolled back once the cursor is done.
+        Broken connections are closed instead of being returned to the pool.
+        """
+        conn = self._connect()
+        broken = False
+        try:
+            if name is None:
+                with conn.cursor() as cur:
+                    yield cur
+            else:
+                conn.autocommit = False
+                try:
+                    with conn.cursor(name=name) as cur:
+                        yield cur
+                finally:
+                    if not conn.closed:
+                        conn.rollback()
+                        conn.autocommit = True
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as error:
+            # A cancelled statement leaves the connection usable
+            broken = not isinstance(error, errors.QueryCanceled)
+            raise
+        finally:
+            self._get_pool().putconn(conn, close=broken or bool(conn.closed))
+
+    def run(self, func, cursor_name=None):
+        """Call func with a cursor, retrying once on a new connection if the pooled
+        connection turns out to have been closed by the server."""
+        try:
+            with self.cursor(cursor_name) as cur:
+                return func(cur)
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as error:
+            if _is_authentication_error(error) or isinstance(
+                error, errors.QueryCanceled
+            ):
+                raise
+            with self.cursor(cursor_name) as cur:
+                return func(cur)
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import boto3
+from botocore.exceptions import ClientError
+
+# DynamoDB rejects items larger than 400 KB
+MAX_ITEM_BYTES = 350000
+
+_TOKENS = re.compile(
+    r"""
+    (?P<string>'(?:[^']|'')*')
+    | (?P<identifier>"(?:[^"]|"")*")
+    | (?P<comment>--[^\n]*|/\*.*?\*/)
+    | (?P<space>\s+)
+    | (?P<other>[^'"\s/-]+|.)
+    """,
+    re.DOTALL | re.VERBOSE,
+)
+
+
+def normalize_sql(sql_query):
+    """Normalize a query so that equivalent spellings share a cache entry.
+
+    Comments, trailing semicolons and whitespace differences are removed, and
+    keywords and unquoted identifiers are lowercased, as PostgreSQL folds them.
+    String literals and quoted identifiers are kept as they are.
+    """
+    parts = []
+    spaced = False
+    for match in _TOKENS.finditer(sql_query.strip().rstrip(";")):
+        kind = match.lastgroup
+        if kind in ("space", "comment"):
+            spaced = True
+            continue
+        token = match.group()
+        if kind == "other":
+            token = token.lower()
+        if spaced and parts and parts[-1][-1] not in "(," and token[0] not in "),":
+            parts.append(" ")
+        parts.append(token)
+        spaced = False
+    return "".join(parts).rstrip(";")
+
+
+class QueryResultCache:
+    """Caches the results of the agent's SQL queries for repeated questions.
+
+    Results are kept in memory by the warm execution environment and shared with
+    the other environments through items of the question answers table, with
+    "query#<fingerprint>" as id. The fingerprint covers the normalized query and
+    the data version, so bumping the version after loading new data invalidates
+    every cached result. These items are replaced when a query runs again.
+
+    Large results are stored separately by store, under "result#<content hash>",
+    so the answers that reference them always see the data they were given.
+    """
+
+    def __init__(
+        self,
+        table_name,
+        data_version="1",
+        ttl=300,
+        max_bytes=16 * 1024 * 1024,
+        client=None,
+    ):
+        """
+        Args:
+            table_name: the question answers table
+            data_version: changed whenever the data of the database is reloaded
+            ttl: seconds a result is served from the cache, 0 disables the cache
+            max_bytes: size of the results kept in memory
+            client: DynamoDB client
+        """
+        self.table_name = table_name
+        self.data_version = data_version
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.client = client or boto3.client("dynamodb")
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def key(self, sql_query):
+        fingerprint = hashlib.sha256(
+            (self.data_version + "\n" + normalize_sql(sql_query)).encode("utf-8")
+        ).hexdigest()
+        return "query#" + fingerprint
+
+    def get(self, key):
+        """Return the cached result of the query with this key, or None."""
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                cached_at, data_json = entry
+                if time.time() - cached_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    return json.loads(data_json)
+                self._remove(key)
+        try:
+            response = self.client.get_item(
+                TableName=self.table_name,
+                Key={"id": {"S": key}, "my_timestamp": {"N": "0"}},
+            )
+        except ClientError as error:
+            print("Error reading the query result cache:", error)
+            return None
+        item = response.get("Item")
+        if item is None:
+            return None
+        cached_at = int(item["cached_at"]["N"])
+        if time.time() - cached_at >= self.ttl:
+            return None
+        self._remember(key, cached_at, item["data"]["S"])
+        return json.loads(item["data"]["S"])
+
+    def put(self, key, data):
+        """Cache the result of the query with this key."""
+        if self.ttl <= 0:
+            return
+        data_json = json.dumps(data)
+        if len(data_json.encode("utf-8")) > MAX_ITEM_BYTES:
+            return
+        cached_at = int(time.time())
+        try:
+            self.client.put_item(
+                TableName=self.table_name,
+                Item={
+                    "id": {"S": key},
+                    "my_timestamp": {"N": "0"},
+                    "cached_at": {"N": str(cached_at)},
+                    "data": {"S": data_json},
+                },
+            )
+        except ClientError as error:
+            print("Error writing the query result cache:", error)
+            return
+        self._remember(key, cached_at, data_json)
+
+    def store(self, data_json):
+        """Store a result under a key derived from its content, for answers to
+        reference. Returns the key, or None if the result could not be stored.
+
+        The same content always gets the same key, so the item is never replaced
+        with different data.
+        """
+        if len(data_json.encode("utf-8")) > MAX_ITEM_BYTES:
+            return None
+        key = "result#" + hashlib.sha256(data_json.encode("utf-8")).hexdigest()
+        try:
+            self.client.put_item(
+                TableName=self.table_name,
+                Item={
+                    "id": {"S": key},
+                    "my_timestamp": {"N": "0"},
+                    "data": {"S": data_json},
+                },
+            )
+        except ClientError as error:
+            print("Error storing the query result:", error)
+            return None
+        return key
+
+    def _remember(self, key, cached_at, data_json):
+        size = len(data_json)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (cached_at, data_json)
+            self._size += size
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[1])
@@ -0,0 +1,53 @@
+import json
+from datetime import date, time
+from decimal import Decimal
+
+
+def get_size(string):
+    return len(string.encode("utf-8"))
+
+
+def to_json_value(value):
+    if type(value) is Decimal:
+        return float(value)
+    elif isinstance(value, (date, time)):
+        return str(value)
+    return value
+
+
+def encode_results(cur, max_bytes=24000, columnar=False, fetch_size=100):
+    """Encode the rows of an executed cursor until their JSON reaches max_bytes.
+
+    Rows are fetched fetch_size at a time and measured one by one as they are
+    serialized, so no more rows are read from the database once the budget is
+    spent. With columnar, the column names are sent once and every row as an
+    array of values, which fits more rows in the budget than one object per row.
+
+    Returns:
+        dict with the rows under "result", the column names under "columns" when
+        columnar, and a "message" when the rows were truncated
+    """
+    batch = cur.fetchmany(fetch_size)
+    # Server-side cursors only describe the columns after the first fetch
+    column_names = [desc[0] for desc in cur.description]
+    response = {"columns": column_names, "result": []} if columnar else {"result": []}
+    rows = response["result"]
+    size = get_size(json.dumps(response))
+
+    while batch:
+        for row in batch:
+            values = [to_json_value(value) for value in row]
+            item = values if columnar else dict(zip(column_names, values))
+            # json.dumps separates list items with ", "
+            item_size = get_size(json.dumps(item)) + (2 if rows else 0)
+            if size + item_size > max_bytes:
+                response["message"] = (
+                    "The data is too large, it has been truncated to "
+                    + str(len(rows))
+                    + " rows. Aggregate or filter the query to get the complete results."
+                )
+                return response
+            rows.append(item)
+            size += item_size
+        batch = cur.fetchmany(fetch_size)
+    return response
@@ -0,0 +1,114 @@
+"""Compare a new connection per query with the pooled connections of the Lambda function.
+
+Runs the same agent queries against a local PostgreSQL, opening a new connection for
+every query as the function used to, then through PostgreSQLPool as a warm container
+does, and prints p50/p99 latency of each.
+
+    docker run -e POSTGRES_PASSWORD=postgres -p 5432:5432 postgres
+    python resources/benchmark-database-connections.py --password postgres
+
+Secrets Manager is not called; each new connection used to fetch the secret too, so
+the real difference is larger.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import psycopg2
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(__file__),
+        "..",
+        "functions",
+        "assistant-api-postgresql-haiku-35",
+    ),
+)
+from db import PostgreSQLPool
+
+QUERIES = [
+    "SELECT genre, SUM(total_sales) FROM video_games_sales_units GROUP BY genre ORDER BY 2 DESC LIMIT 10",
+    "SELECT title, console, total_sales FROM video_games_sales_units WHERE release_date >= '2015-01-01' ORDER BY total_sales DESC LIMIT 20",
+    "SELECT publisher, COUNT(*) FROM video_games_sales_units GROUP BY publisher ORDER BY 2 DESC LIMIT 10",
+]
+
+# Used when the sales table has not been loaded
+FALLBACK_QUERIES = [
+    "SELECT g, g * 2 FROM generate_series(1, 100) AS g",
+    "SELECT COUNT(*) FROM pg_catalog.pg_class",
+]
+
+
+class StaticCredentials:
+    def __init__(self, username, password):
+        self.secret = {"username": username, "password": password}
+
+    def get(self):
+        return self.secret
+
+    def refresh(self):
+        return False
+
+
+def percentiles(timings):
+    ordered = sorted(timings)
+    return (
+        statistics.median(ordered),
+        ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+    )
+
+
+def run_query(query):
+    def run(cur):
+        cur.execute(query)
+        return cur.fetchall()
+
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--database", default="postgres")
+    parser.add_argument("--user", default="postgres")
+    parser.add_argument("--password", default=os.environ.get("PGPASSWORD", ""))
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    connect_args = dict(
+        host=args.host, database=args.database, user=args.user, password=args.password
+    )
+    with psycopg2.connect(**connect_args) as conn, conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('video_games_sales_units')")
+        queries = QUERIES if cur.fetchone()[0] else FALLBACK_QUERIES
+    conn.close()
+
+    new_connection = []
+    for idx in range(args.iterations):
+        start = time.perf_counter()
+        conn = psycopg2.connect(**connect_args)
+        with conn.cursor() as cur:
+            run_query(queries[idx % len(queries)])(cur)
+        conn.close()
+        new_connection.append((time.perf_counter() - start) * 1e3)
+
+    postgresql_pool = PostgreSQLPool(
+        args.host, args.database, StaticCredentials(args.user, args.password)
+    )
+    pooled = []
+    for idx in range(args.iterations):
+        start = time.perf_counter()
+        postgresql_pool.run(run_query(queries[idx % len(queries)]))
+        pooled.append((time.perf_counter() - start) * 1e3)
+
+    for name, timings in (("new connection", new_connection), ("pooled", pooled)):
+        p50, p99 = percentiles(timings)
+        print(f"{name:15} p50 {p50:8.2f} ms  p99 {p99:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
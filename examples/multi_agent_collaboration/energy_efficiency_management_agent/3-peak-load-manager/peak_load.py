@@ -9,6 +9,8 @@ dynamodb_resource = boto3.resource('dynamodb')
 dynamodb_table = os.getenv('dynamodb_table')
 dynamodb_pk = os.getenv('dynamodb_pk')
 dynamodb_sk = os.getenv('dynamodb_sk')
+# Attributes with a <attribute>-index GSI keyed by (dynamodb_pk, attribute)
+dynamodb_indexes = [name for name in os.getenv('dynamodb_indexes', '').split(',') if name]
 
 def get_named_parameter(event, name):
     return next(item for item in event['parameters'] if item['name'] == name)['value']
@@ -29,6 +31,25 @@ def put_dynamodb(table_name, item):
     )
     return resp
 
+def query_items(table, key_expression, index_name=None, projection=None, filter_expression=None):
+    # Yield items page by page, following LastEvaluatedKey until the partition is read
+    kwargs = {'KeyConditionExpression': key_expression}
+    if index_name:
+        kwargs['IndexName'] = index_name
+    if projection:
+        # Placeholders avoid clashes with reserved words such as "day"
+        kwargs['ProjectionExpression'] = ', '.join(f'#p{idx}' for idx in range(len(projection)))
+        kwargs['ExpressionAttributeNames'] = {f'#p{idx}': name for idx, name in enumerate(projection)}
+    if filter_expression is not None:
+        kwargs['FilterExpression'] = filter_expression
+
+    while True:
+        page = table.query(**kwargs)
+        yield from page['Items']
+        if 'LastEvaluatedKey' not in page:
+            return
+        kwargs['ExclusiveStartKey'] = page['LastEvaluatedKey']
+
 def read_dynamodb(
     table_name: str, 
     pk_field: str,
@@ -36,7 +57,8 @@ def read_dynamodb(
     sk_field: str=None, 
     sk_value: str=None,
     attr_key: str=None,
-    attr_val: str=None
+    attr_val: str=None,
+    projection: list=None
 ):
     try:
 
@@ -47,18 +69,24 @@ def read_dynamodb(
         else:
             key_expression = Key(pk_field).eq(pk_value)
 
-        if attr_key:
-            attr_expression = Attr(attr_key).eq(attr_val)
-            query_data = table.query(
-                KeyConditionExpression=key_expression,
-                FilterExpression=attr_expression
-            )
+        if attr_key in dynamodb_indexes and not sk_field:
+            # The index only reads the items with this attribute value
+            items = query_items(table, 
+                                Key(pk_field).eq(pk_value) & Key(attr_key).eq(attr_val), 
+                                index_name=f'{attr_key}-index', 
+                                projection=projection)
+            # Items with the same attribute value come back from the index in no
+            # particular order, restore the table's sort key order
+            items = sorted(items, key=lambda item: item.get(dynamodb_sk, ''))
+        elif attr_key:
+            items = query_items(table, 
+                                key_expression, 
+                                projection=projection, 
+                                filter_expression=Attr(attr_key).eq(attr_val))
         else:
-            query_data = table.query(
-                KeyConditionExpression=key_expression
-            )
+            items = query_items(table, key_expression, projection=projection)
         
-        return query_data['Items']
+        return list(items)
     except Exception:
         print(f'Error querying table: {table_name}.')
 
@@ -67,13 +95,15 @@ def detect_peak(customer_id):
     return read_dynamodb(dynamodb_table, 
                          dynamodb_pk, 
                          customer_id, 
-                         attr_key="peak", attr_val="True")
+                         attr_key="peak", attr_val="True", 
+                         projection=["item_id", "item_desc", "quota", "used"])
 
 def detect_non_essential_processes(customer_id):
     return read_dynamodb(dynamodb_table, 
                          dynamodb_pk, 
                          customer_id,
-                         attr_key="essential", attr_val="False")
+                         attr_key="essential", attr_val="False", 
+                         projection=["item_id", "item_desc", "quota", "used"])
 
                 
 def redistribute_allocation(customer_id, item_id, quota):
@@ -298,9 +298,14 @@ class AgentsForAmazonBedrock:
                             "dynamodb:Query",
                             "dynamodb:UpdateItem"
                         ],
-                        "Resource": "arn:aws:dynamodb:{}:{}:table/{}".format(
-                            self._region, self._account_id, dynamodb_table_name
-                        )
+                        "Resource": [
+                            "arn:aws:dynamodb:{}:{}:table/{}".format(
+                                self._region, self._account_id, dynamodb_table_name
+                            ),
+                            "arn:aws:dynamodb:{}:{}:table/{}/index/*".format(
+                                self._region, self._account_id, dynamodb_table_name
+                            )
+                        ]
                     }
                 ]
             }
@@ -487,6 +492,8 @@ class AgentsForAmazonBedrock:
             Must be a local file, and use underscores, not hyphens.
             additional_function_iam_policy (Dict, Optional): Additional IAM policy to attach to the Lambda function. Defaults to None.
             sub_agent_arns (List[str], Optional): List of ARNs of the sub-agents that this Lambda is allowed to invoke.
+            dynamo_args (List, Optional): Table name, partition key and sort key of a DynamoDB table to create
+            for the Lambda, optionally followed by a list of attributes to create a GSI for (see create_dynamodb).
 
         Returns:
             str: ARN of the new Lambda function
@@ -525,11 +532,14 @@ class AgentsForAmazonBedrock:
             self.create_dynamodb(
                 dynamo_args[0],
                 dynamo_args[1],
-                dynamo_args[2]
+                dynamo_args[2],
+                index_attributes=dynamo_args[3] if len(dynamo_args) > 3 else None
             )
             env_variables['Variables']['dynamodb_table'] = dynamo_args[0]
             env_variables['Variables']['dynamodb_pk'] = dynamo_args[1]
             env_variables['Variables']['dynamodb_sk'] = dynamo_args[2]
+            if len(dynamo_args) > 3:
+                env_variables['Variables']['dynamodb_indexes'] = ','.join(dynamo_args[3])
         else:
             lambda_role = self._create_lambda_iam_role(
                 agent_name, sub_agent_arns
@@ -1912,8 +1922,39 @@ class AgentsForAmazonBedrock:
 
         return _update_agent_response
 
-    def create_dynamodb(self, table_name, pk_item, sk_item):
+    def create_dynamodb(self, table_name, pk_item, sk_item, index_attributes: List[str] = None):
+        """Creates a DynamoDB table with a string partition and sort key.
+
+        Args:
+            table_name (str): Name of the table
+            pk_item (str): Name of the partition key
+            sk_item (str): Name of the sort key
+            index_attributes (List[str], Optional): Attributes to query by. Each gets a GSI named
+            <attribute>-index with pk_item as partition key and the attribute as sort key, so
+            a query for one value reads only the matching items instead of filtering the whole
+            partition. Items without the attribute are left out of its index.
+        """
+        index_attributes = index_attributes or []
         try:
+            table_args = {}
+            if index_attributes:
+                table_args['GlobalSecondaryIndexes'] = [
+                    {
+                        'IndexName': f'{attribute}-index',
+                        'KeySchema': [
+                            {
+                                'AttributeName': pk_item,
+                                'KeyType': 'HASH'
+                            },
+                            {
+                                'AttributeName': attribute,
+                                'KeyType': 'RANGE'
+                            }
+                        ],
+                        'Projection': {'ProjectionType': 'ALL'}
+                    }
+                    for attribute in index_attributes
+                ]
             table = self._dynamodb_resource.create_table(
                 TableName=table_name,
                 KeySchema=[
@@ -1928,15 +1969,13 @@ class AgentsForAmazonBedrock:
                 ],
                 AttributeDefinitions=[
                     {
-                        'AttributeName': pk_item,
-                        'AttributeType': 'S'
-                    },
-                    {
-                        'AttributeName': sk_item,
+                        'AttributeName': attribute,
                         'AttributeType': 'S'
                     }
+                    for attribute in [pk_item, sk_item, *index_attributes]
                 ],
-                BillingMode='PAY_PER_REQUEST'  # Use on-demand capacity mode
+                BillingMode='PAY_PER_REQUEST',  # Use on-demand capacity mode
+                **table_args
             )
 
             # Wait for the table to be created
@@ -1951,33 +1990,94 @@ class AgentsForAmazonBedrock:
             table_name: str,
             items: List
     ):
+        """Writes items to a DynamoDB table, 25 per BatchWriteItem request.
+
+        batch_writer resubmits unprocessed items. Like put_item, the last of the
+        items with the same key wins instead of failing the batch.
+
+        Args:
+            table_name (str): Name of the table
+            items (List[Dict]): Items to write
+        """
         try:
 
             table = self._dynamodb_resource.Table(table_name)
-            for item in items:
-                table.put_item(Item=item)
+            key_names = [key['AttributeName'] for key in table.key_schema]
+            with table.batch_writer(overwrite_by_pkeys=key_names) as batch:
+                for item in items:
+                    batch.put_item(Item=item)
         except self._dynamodb_client.exceptions.ResourceInUseException:
             print(f'Error on loading process for table: {table_name}.')
 
-    def query_dynamodb(
+    def iter_dynamodb(
             self,
             table_name: str,
             pk_field: str,
             pk_value: str,
             sk_field: str = None,
-            sk_value: str = None
+            sk_value: str = None,
+            index_name: str = None,
+            projection: List[str] = None,
+            page_size: int = None
     ):
-        try:
+        """Yields the items of a partition, querying one page at a time.
 
-            table = self._dynamodb_resource.Table(table_name)
-            # Create expression
-            if sk_field:
-                key_expression = Key(pk_field).eq(pk_value) & Key(sk_field).begins_with(sk_value)
-            else:
-                key_expression = Key(pk_field).eq(pk_value)
+        Args:
+            table_name (str): Name of the table
+            pk_field (str): Name of the partition key
+            pk_value (str): Partition key value
+            sk_field (str, Optional): Name of the sort key, or of the index sort key
+            sk_value (str, Optional): Prefix of the sort key values to return
+            index_name (str, Optional): GSI to query instead of the table, e.g. 'kind-index'
+            projection (List[str], Optional): Attributes to return. Defaults to whole items
+            page_size (int, Optional): Maximum number of items to read per request
+        """
+        table = self._dynamodb_resource.Table(table_name)
+        # Create expression
+        if sk_field:
+            key_expression = Key(pk_field).eq(pk_value) & Key(sk_field).begins_with(sk_value)
+        else:
+            key_expression = Key(pk_field).eq(pk_value)
+
+        query_args = {'KeyConditionExpression': key_expression}
+        if index_name:
+            query_args['IndexName'] = index_name
+        if projection:
+            # Placeholders avoid clashes with reserved words such as "day"
+            query_args['ProjectionExpression'] = ', '.join(f'#p{idx}' for idx in range(len(projection)))
+            query_args['ExpressionAttributeNames'] = {f'#p{idx}': name for idx, name in enumerate(projection)}
+        if page_size:
+            query_args['Limit'] = page_size
+
+        while True:
+            query_data = table.query(**query_args)
+            yield from query_data['Items']
+            if 'LastEvaluatedKey' not in query_data:
+                return
+            query_args['ExclusiveStartKey'] = query_data['LastEvaluatedKey']
 
-            query_data = table.query(KeyConditionExpression=key_expression)
-            return query_data['Items']
+    def query_dynamodb(
+            self,
+            table_name: str,
+            pk_field: str,
+            pk_value: str,
+            sk_field: str = None,
+            sk_value: str = None,
+            index_name: str = None,
+            projection: List[str] = None
+    ):
+        try:
+            return list(
+                self.iter_dynamodb(
+                    table_name,
+                    pk_field,
+                    pk_value,
+                    sk_field,
+                    sk_value,
+                    index_name=index_name,
+                    projection=projection
+                )
+            )
         except self._dynamodb_client.exceptions.ResourceInUseException:
             print(f'Error querying table: {table_name}.')
 
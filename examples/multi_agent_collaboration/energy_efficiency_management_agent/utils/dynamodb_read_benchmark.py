@@ -0,0 +1,135 @@
+"""Compares the reads of the forecast Lambda against DynamoDB Local.
+
+Loads long consumption histories for a few customers into a table with a
+kind-index GSI, then reads the forecasted items of a customer
+
+- with a FilterExpression on the table, which reads every item of the customer, and
+- with a query on the GSI and a ProjectionExpression, which reads only the forecasted items.
+
+Start DynamoDB Local first, for example with
+docker run -p 8000:8000 amazon/dynamodb-local, then run
+
+    python utils/dynamodb_read_benchmark.py --customers 3 --days 20000
+"""
+
+import argparse
+import statistics
+import time
+import uuid
+from decimal import Decimal
+
+import boto3
+from boto3.dynamodb.conditions import Attr, Key
+
+
+def create_table(dynamodb, table_name):
+    table = dynamodb.create_table(
+        TableName=table_name,
+        KeySchema=[
+            {'AttributeName': 'customer_id', 'KeyType': 'HASH'},
+            {'AttributeName': 'day', 'KeyType': 'RANGE'}
+        ],
+        AttributeDefinitions=[
+            {'AttributeName': 'customer_id', 'AttributeType': 'S'},
+            {'AttributeName': 'day', 'AttributeType': 'S'},
+            {'AttributeName': 'kind', 'AttributeType': 'S'}
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                'IndexName': 'kind-index',
+                'KeySchema': [
+                    {'AttributeName': 'customer_id', 'KeyType': 'HASH'},
+                    {'AttributeName': 'kind', 'KeyType': 'RANGE'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'}
+            }
+        ],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    table.wait_until_exists()
+    return table
+
+
+def load_history(table, customers, days, forecast_ratio, reading_bytes):
+    # One item per customer and day, the most recent ones are forecasts
+    first_forecast = int(days * (1 - forecast_ratio))
+    readings = 'x' * reading_bytes
+    with table.batch_writer() as batch:
+        for customer in range(customers):
+            for day in range(days):
+                batch.put_item(Item={
+                    'customer_id': str(customer),
+                    'day': f'{day:08d}',
+                    'sumPowerReading': Decimal(day % 500),
+                    'kind': 'forecasted' if day >= first_forecast else 'measured',
+                    'readings': readings
+                })
+
+
+def read(table, **query_args):
+    # Follow LastEvaluatedKey like query_items in forecast.py, counting what was read
+    items, pages, scanned, capacity = [], 0, 0, 0.0
+    while True:
+        page = table.query(ReturnConsumedCapacity='TOTAL', **query_args)
+        pages += 1
+        items.extend(page['Items'])
+        scanned += page['ScannedCount']
+        capacity += page.get('ConsumedCapacity', {}).get('CapacityUnits', 0)
+        if 'LastEvaluatedKey' not in page:
+            return items, pages, scanned, capacity
+        query_args['ExclusiveStartKey'] = page['LastEvaluatedKey']
+
+
+def benchmark(name, table, repeat, **query_args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        items, pages, scanned, capacity = read(table, **dict(query_args))
+        timings.append((time.perf_counter() - start) * 1e3)
+    print(
+        f'{name:22} items {len(items):6}  scanned {scanned:6}  pages {pages:4}  '
+        f'RCU {capacity:8.1f}  ms {statistics.median(timings):8.1f}'
+    )
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--endpoint-url', default='http://localhost:8000')
+    parser.add_argument('--customers', type=int, default=3)
+    parser.add_argument('--days', type=int, default=20000)
+    parser.add_argument('--forecast-ratio', type=float, default=0.05)
+    parser.add_argument('--reading-bytes', type=int, default=400)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    dynamodb = boto3.resource(
+        'dynamodb',
+        endpoint_url=args.endpoint_url,
+        region_name='us-east-1',
+        aws_access_key_id='local',
+        aws_secret_access_key='local'
+    )
+    table = create_table(dynamodb, f'forecast-benchmark-{uuid.uuid4().hex[:8]}')
+    try:
+        load_history(table, args.customers, args.days, args.forecast_ratio, args.reading_bytes)
+
+        filtered = benchmark(
+            'filter on table', table, args.repeat,
+            KeyConditionExpression=Key('customer_id').eq('0'),
+            FilterExpression=Attr('kind').eq('forecasted')
+        )
+        indexed = benchmark(
+            'GSI with projection', table, args.repeat,
+            IndexName='kind-index',
+            KeyConditionExpression=Key('customer_id').eq('0') & Key('kind').eq('forecasted'),
+            ProjectionExpression='#day, sumPowerReading',
+            ExpressionAttributeNames={'#day': 'day'}
+        )
+        assert sorted(item['day'] for item in filtered) == sorted(item['day'] for item in indexed)
+    finally:
+        table.delete()
+
+
+if __name__ == '__main__':
+    main()
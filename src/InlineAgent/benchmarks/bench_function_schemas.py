@@ -0,0 +1,115 @@
+"""Cost of building ``ActionGroups.actionGroups`` for action groups with many tools.
+
+Run from ``src/InlineAgent/src``::
+
+    PYTHONPATH=. python ../benchmarks/bench_function_schemas.py --tools 500
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from unittest import mock
+
+from InlineAgent.action_group import ActionGroup, ActionGroupBuilder, ActionGroups
+
+
+def legacy_clean_string(line: str) -> str:
+    """The character-by-character parser ``clean_string`` replaced."""
+    clean_line = str()
+    prev_char: str = None
+    for character in line:
+
+        if character == " ":
+            prev_char = " "
+        else:
+            if prev_char == " ":
+                clean_line += " " + character
+            else:
+                clean_line += character
+            prev_char = character
+    return clean_line
+
+
+def make_tool(idx: int):
+    def tool(city: str, days: int = 3, units: str = "metric", verbose: bool = False):
+        pass
+
+    tool.__name__ = f"get_forecast_{idx}"
+    tool.__qualname__ = tool.__name__
+    tool.__doc__ = f"""
+        Fetch the weather forecast number {idx} for a city.   The forecast is
+        aggregated    from several providers and    cached for an hour.
+
+        Parameters:
+            city (str): Name of the city,   e.g. Seattle or Berlin
+            days (int): Number of days    to forecast
+                Must be between 1 and 14
+            units (str): Either   metric or imperial
+            verbose (bool): Include hourly     breakdown
+
+        Returns:
+            dict: Forecast with daily   high, low and precipitation.
+        """
+    return tool
+
+
+def build_action_groups(n_tools: int, per_group: int) -> ActionGroups:
+    tools = [make_tool(idx) for idx in range(n_tools)]
+    return ActionGroups(
+        action_groups=[
+            ActionGroup(name=f"Tools{start}", tools=tools[start : start + per_group])
+            for start in range(0, n_tools, per_group)
+        ]
+    )
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--tools", type=int, default=500)
+    parser.add_argument("--per-group", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    action_groups = build_action_groups(args.tools, args.per_group)
+
+    def cold():
+        ActionGroupBuilder.clear_schema_cache()
+        action_groups.actionGroups
+
+    with mock.patch.object(
+        ActionGroupBuilder, "clean_string", staticmethod(legacy_clean_string)
+    ):
+        legacy = timed(cold, args.repeat)
+    uncached = timed(cold, args.repeat)
+
+    action_groups.actionGroups
+    cached = timed(lambda: action_groups.actionGroups, args.repeat)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "schemas.json")
+        ActionGroupBuilder.export_function_schemas(action_groups.action_groups, path)
+
+        def loaded():
+            ActionGroupBuilder.clear_schema_cache()
+            ActionGroupBuilder.load_function_schemas(path)
+            action_groups.actionGroups
+
+        from_file = timed(loaded, args.repeat)
+
+    print(f"{args.tools} tools in {len(action_groups.action_groups)} action groups")
+    print(f"cold, legacy clean_string: {legacy:8.2f} ms")
+    print(f"cold:                      {uncached:8.2f} ms")
+    print(f"cold, schemas from JSON:   {from_file:8.2f} ms")
+    print(f"warm cache:                {cached:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Per-turn overhead of InlineAgent.get_invoke_params for deep collaborator trees.
+
+Run from ``src/InlineAgent/src``::
+
+    PYTHONPATH=. python ../benchmarks/bench_invoke_params.py
+"""
+
+import argparse
+import time
+import timeit
+
+from unittest import mock
+
+from InlineAgent.action_group import ActionGroup
+from InlineAgent.agent import CollaboratorAgent, InlineAgent
+from InlineAgent.clients import client_registry
+
+
+class StubControlPlane:
+    """Stands in for the bedrock-agent and sts clients with a fixed latency."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def get_caller_identity(self):
+        time.sleep(self.latency)
+        return {"Account": "123456789012"}
+
+    def get_paginator(self, operation_name):
+        return self
+
+    def paginate(self):
+        time.sleep(self.latency)
+        yield {
+            "agentSummaries": [
+                {"agentName": "DeployedAgent", "agentId": "MOCKAGENTID"}
+            ]
+        }
+
+
+def build_tree(
+    depth: int,
+    fanout: int,
+    action_groups: int,
+    deployed_collaborators: int = 0,
+    level: int = 0,
+) -> InlineAgent:
+    groups = [
+        ActionGroup(
+            name=f"ActionGroup{level}_{idx}",
+            lambda_name=f"mock-lambda-{idx}",
+            function_schema=[
+                {
+                    "name": f"tool_{idx}_{fn}",
+                    "description": "Mock tool " * 20,
+                    "parameters": {
+                        "value": {
+                            "type": "string",
+                            "description": "Mock parameter",
+                            "required": True,
+                        }
+                    },
+                }
+                for fn in range(10)
+            ],
+            test=True,
+        )
+        for idx in range(action_groups)
+    ]
+    if level == depth:
+        return InlineAgent(
+            foundation_model="MOCK_ID",
+            instruction=f"You are a level {level} collaborator.",
+            agent_name=f"Agent{level}",
+            action_groups=groups,
+        )
+    return InlineAgent(
+        foundation_model="MOCK_ID",
+        instruction=f"You are a level {level} supervisor.",
+        agent_name=f"Agent{level}",
+        action_groups=groups,
+        agent_collaboration="SUPERVISOR",
+        collaborators=[
+            build_tree(depth, fanout, action_groups, deployed_collaborators, level + 1)
+            for _ in range(fanout)
+        ]
+        + [
+            CollaboratorAgent(
+                agent_name="DeployedAgent",
+                agent_alias_id="MOCKALIAS",
+                routing_instruction="Route deployed agent questions here.",
+            )
+            for _ in range(deployed_collaborators if level == 0 else 0)
+        ],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--action-groups", type=int, default=5)
+    parser.add_argument("--deployed-collaborators", type=int, default=2)
+    parser.add_argument(
+        "--control-plane-latency",
+        type=float,
+        default=0.005,
+        help="Seconds added to each stubbed list_agents/STS call",
+    )
+    parser.add_argument("--turns", type=int, default=200)
+    args = parser.parse_args()
+
+    supervisor = build_tree(
+        args.depth, args.fanout, args.action_groups, args.deployed_collaborators
+    )
+
+    control_plane = StubControlPlane(args.control_plane_latency)
+    with mock.patch.object(client_registry, "client", return_value=control_plane):
+        with mock.patch.object(client_registry, "region", return_value="us-east-1"):
+            cold = timeit.timeit(supervisor._build_invoke_params, number=args.turns)
+            supervisor.get_invoke_params()
+            warm = timeit.timeit(supervisor.get_invoke_params, number=args.turns)
+
+    print(
+        f"depth={args.depth} fanout={args.fanout} "
+        f"deployed_collaborators={args.deployed_collaborators} turns={args.turns}"
+    )
+    print(f"rebuild every turn: {cold / args.turns * 1e6:,.1f} us/turn")
+    print(f"cached payload:     {warm / args.turns * 1e6:,.1f} us/turn")
+
+
+if __name__ == "__main__":
+    main()
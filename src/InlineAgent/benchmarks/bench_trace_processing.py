@@ -0,0 +1,202 @@
+"""Events/second of ``observe()`` trace processing, default vs low-overhead mode.
+
+Replays a recorded session through the instrumentation with OpenTelemetry
+span production enabled. Run from ``src/InlineAgent/src``::
+
+    PYTHONPATH=. python ../benchmarks/bench_trace_processing.py
+    PYTHONPATH=. python ../benchmarks/bench_trace_processing.py --traces trace --session <id>
+
+Without ``--traces`` a synthetic multi-step orchestration is replayed.
+"""
+
+import argparse
+import contextlib
+import io
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List
+from unittest import mock
+
+from opentelemetry.sdk.trace import TracerProvider
+
+from InlineAgent.observability import agent_instrument, process, span_manager
+from InlineAgent.observability.agent_instrument import InvocationObserver
+from InlineAgent.observability.trace_store import read_session_traces
+
+AGENT_ARN = "arn:aws:bedrock:us-east-1:123456789012:agent-alias/AGENT/ALIAS"
+
+
+def synthetic_session(session_id: str, steps: int) -> List[Dict]:
+    family = str(uuid.uuid4())
+    caller_chain = [{"agentAliasArn": AGENT_ARN}]
+
+    def trace(counter: int, orchestration: Dict) -> Dict:
+        return {
+            "trace": {
+                "agentId": "AGENT",
+                "agentAliasId": "ALIAS",
+                "agentVersion": "DRAFT",
+                "sessionId": session_id,
+                "eventTime": datetime.now(timezone.utc),
+                "callerChain": caller_chain,
+                "trace": {"orchestrationTrace": orchestration},
+            }
+        }
+
+    def model_invocation(counter: int) -> List[Dict]:
+        trace_id = f"{family}-{counter}"
+        return [
+            trace(
+                counter,
+                {
+                    "modelInvocationInput": {
+                        "traceId": trace_id,
+                        "text": '{"system": "You are a helpful agent", "messages": []}'
+                        * 20,
+                        "foundationModel": "anthropic.claude-3-haiku",
+                        "inferenceConfiguration": {
+                            "maximumLength": 2048,
+                            "temperature": 0,
+                            "topP": 1,
+                            "topK": 250,
+                            "stopSequences": ["</invoke>"],
+                        },
+                    }
+                },
+            ),
+            trace(
+                counter,
+                {
+                    "modelInvocationOutput": {
+                        "traceId": trace_id,
+                        "rawResponse": {
+                            "content": '{"model": "claude-3-haiku", "content": []}'
+                        },
+                        "metadata": {"usage": {"inputTokens": 900, "outputTokens": 80}},
+                    }
+                },
+            ),
+        ]
+
+    events = list()
+    for counter in range(steps):
+        trace_id = f"{family}-{counter}"
+        events.extend(model_invocation(counter))
+        events.append(
+            trace(counter, {"rationale": {"traceId": trace_id, "text": "Use the tool"}})
+        )
+        events.append(
+            trace(
+                counter,
+                {
+                    "invocationInput": {
+                        "traceId": trace_id,
+                        "invocationType": "ACTION_GROUP",
+                        "actionGroupInvocationInput": {
+                            "actionGroupName": "Tools",
+                            "function": "lookup",
+                            "parameters": [{"name": "q", "value": str(counter)}],
+                        },
+                    }
+                },
+            )
+        )
+        events.append(
+            trace(
+                counter,
+                {
+                    "observation": {
+                        "traceId": trace_id,
+                        "actionGroupInvocationOutput": {"text": "result " * 20},
+                    }
+                },
+            )
+        )
+
+    events.extend(model_invocation(steps))
+    events.append(
+        trace(
+            steps,
+            {
+                "observation": {
+                    "traceId": f"{family}-{steps}",
+                    "finalResponse": {"text": "Done"},
+                }
+            },
+        )
+    )
+    events.append({"chunk": {"bytes": b"Done"}})
+    return events
+
+
+def recorded_session(directory: str, session_id: str) -> List[Dict]:
+    events = list()
+    for trace_data in read_session_traces(session_id=session_id, directory=directory):
+        # Saved traces store eventTime as text
+        if isinstance(trace_data.get("eventTime"), str):
+            trace_data["eventTime"] = datetime.fromisoformat(trace_data["eventTime"])
+        events.append({"trace": trace_data})
+    return events
+
+
+def replay(events: List[Dict], session_id: str, low_overhead: bool):
+    observer = InvocationObserver(
+        inputText="benchmark",
+        sessionId=session_id,
+        kwargs={"agentId": "AGENT", "agentAliasId": "ALIAS"},
+        show_traces=True,
+        low_overhead=low_overhead,
+    )
+    for event in events:
+        observer.process_event(event)
+    observer.finish()
+    observer.report()
+
+
+def measure(events: List[Dict], session_id: str, low_overhead: bool, seconds: float):
+    replayed = 0
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        while time.perf_counter() - start < seconds:
+            replay(events, session_id, low_overhead)
+            replayed += len(events)
+    return replayed / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--traces", help="Directory with saved session traces")
+    parser.add_argument("--session", help="Session ID to replay from --traces")
+    parser.add_argument("--steps", type=int, default=5)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    if args.traces:
+        session_id = args.session
+        events = recorded_session(args.traces, session_id)
+    else:
+        session_id = str(uuid.uuid4())
+        events = synthetic_session(session_id, args.steps)
+
+    tracer = TracerProvider().get_tracer("benchmark")
+    patches = [
+        mock.patch.object(agent_instrument, "tracer", tracer),
+        mock.patch.object(span_manager, "tracer", tracer),
+        mock.patch.object(agent_instrument.config, "PRODUCE_BEDROCK_OTEL_TRACES", True),
+        mock.patch.object(process.config, "PRODUCE_BEDROCK_OTEL_TRACES", True),
+    ]
+    with contextlib.ExitStack() as stack:
+        for patch in patches:
+            stack.enter_context(patch)
+
+        print(f"Replaying {len(events)} events per session")
+        baseline = measure(events, session_id, False, args.seconds)
+        light = measure(events, session_id, True, args.seconds)
+
+    print(f"default:      {baseline:>12,.0f} events/s")
+    print(f"low overhead: {light:>12,.0f} events/s ({light / baseline:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
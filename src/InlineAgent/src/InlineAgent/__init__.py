@@ -7,8 +7,17 @@ Amazon Bedrock.
 """
 
 from .action_group import ActionGroup, ActionGroups
-from .agent import InlineAgent, CollaboratorAgent, require_confirmation
+from .agent import (
+    InlineAgent,
+    CollaboratorAgent,
+    require_confirmation,
+    run_in_executor,
+    shutdown_executors,
+)
 from .knowledge_base import knowledgebase_plugin
+from .clients import ClientRegistry, client_registry
+from .resolver import NameResolver, resolver
+from .tool_cache import SQLiteCacheBackend, ToolResultCache, cache_result
 from .constants import USER_INPUT_ACTION_GROUP_NAME, TraceColor, Level
 from .utils import AgentAppConfig
 from .observability import *
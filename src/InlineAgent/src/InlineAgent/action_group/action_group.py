@@ -1,6 +1,11 @@
+import hashlib
 import json
+from concurrent.futures import Executor as PoolExecutor
 from functools import cached_property
+import os
 import re
+import threading
+import weakref
 from typing import (
     Annotated,
     List,
@@ -13,10 +18,11 @@ from typing import (
     Tuple,
     Union,
 )
-from inspect import Parameter, signature
+from inspect import Parameter, signature, unwrap
 import boto3
 from pydantic import BaseModel, computed_field, model_validator, validate_call, Field
 
+from InlineAgent.clients import client_registry
 from InlineAgent.tools import MCPServer
 from InlineAgent.types import APISchema, Executor, FunctionDefination
 
@@ -36,6 +42,10 @@ class ActionGroup(BaseModel):
     ] = Field(default_factory=dict)
     argument_key: str = "Parameters:"
     return_key: str = "Returns:"
+    # Where synchronous return-of-control tools run: "thread" for blocking
+    # I/O, "process" for CPU-bound tools, or an Executor; see run_in_executor
+    tool_executor: Optional[Union[Literal["thread", "process"], PoolExecutor]] = None
+    tool_timeout: Optional[float] = None
     test: bool = False
 
     class Config:
@@ -67,7 +77,7 @@ class ActionGroup(BaseModel):
         print(
             f"Using `{self.profile}` [profile](https://docs.aws.amazon.com/cli/v1/userguide/cli-configure-files.html)."
         )
-        return boto3.Session(profile_name=self.profile)
+        return client_registry.session(self.profile)
 
     @computed_field
     @cached_property
@@ -77,9 +87,9 @@ class ActionGroup(BaseModel):
         try:
             if self.test:
                 return "Mock-Account", "Mock-Region"
-            sts_client = self.session.client("sts")
-            identity = sts_client.get_caller_identity()
-            return identity["Account"], self.session.region_name
+            return client_registry.account_id(self.profile), client_registry.region(
+                self.profile
+            )
         except Exception as e:
             return "Mock-Account", "Mock-Region"
 
@@ -260,6 +270,21 @@ class ActionGroups(BaseModel):
 
         return tool_map
 
+    @property
+    def tool_executors(
+        self,
+    ) -> Dict[str, Tuple[Optional[Union[str, PoolExecutor]], Optional[float]]]:
+        """``(tool_executor, tool_timeout)`` of return-of-control action groups."""
+        return {
+            action_group.name: (action_group.tool_executor, action_group.tool_timeout)
+            for action_group in self.action_groups
+            if action_group.executor == Executor.RETURN_CONTROL
+            and (
+                action_group.tool_executor is not None
+                or action_group.tool_timeout is not None
+            )
+        }
+
     @computed_field
     @property
     def actionGroups(self) -> List:
@@ -330,7 +355,24 @@ class ActionGroups(BaseModel):
         return json.dumps(self.actionGroups, indent=4)
 
 
+_PARAM_TYPE_PATTERN = re.compile(r"\((.*?)\)")
+_SPACES_PATTERN = re.compile(" +")
+
+FUNCTION_SCHEMA_FILE_VERSION = 1
+
+
 class ActionGroupBuilder:
+    # Function schemas are derived from docstrings and signatures only, so
+    # they are cached per function object and reused every time
+    # ``ActionGroups.actionGroups`` is read. Entries are dropped with the
+    # function and rebuilt when its code or docstring changes.
+    _schema_cache: "weakref.WeakKeyDictionary[Callable, Tuple[Tuple, Dict]]" = (
+        weakref.WeakKeyDictionary()
+    )
+    # Schemas loaded with ``load_function_schemas``, keyed by ``schema_fingerprint``
+    _precomputed_schemas: Dict[str, Dict] = dict()
+    _schema_lock = threading.Lock()
+
     @staticmethod
     def get_indent_level(line: str) -> int:
         """Count the number of leading spaces to determine indent level."""
@@ -343,8 +385,7 @@ class ActionGroupBuilder:
         current_param, current_desc = str(), list()
         if len(param_parts) == 2 and param_parts[1]:
 
-            pattern = r"\((.*?)\)"
-            match = re.search(pattern, param_parts[0].strip())
+            match = _PARAM_TYPE_PATTERN.search(param_parts[0].strip())
             current_param_type = str()
             if match:
                 current_param_type = match.group(
@@ -358,21 +399,9 @@ class ActionGroupBuilder:
         return current_param, current_desc
 
     @staticmethod
-    @validate_call
     def clean_string(line: str) -> str:
-        clean_line = str()
-        prev_char: str = None
-        for character in line:
-
-            if character == " ":
-                prev_char = " "
-            else:
-                if prev_char == " ":
-                    clean_line += " " + character
-                else:
-                    clean_line += character
-                prev_char = character
-        return clean_line
+        """Collapse runs of spaces into one and drop trailing spaces."""
+        return _SPACES_PATTERN.sub(" ", line).rstrip(" ")
 
     @staticmethod
     @validate_call
@@ -494,6 +523,136 @@ class ActionGroupBuilder:
         if func.__doc__ is None:
             raise ValueError("Docstring is empty or None")
 
+        cache_key = (
+            getattr(unwrap(func), "__code__", None),
+            func.__doc__,
+            func.__name__,
+            argument_key,
+            return_key,
+            getattr(func, "__is_confirmation_required__", False),
+        )
+        try:
+            cached = ActionGroupBuilder._schema_cache.get(func)
+        except TypeError:
+            # Not weak-referenceable, e.g. a builtin
+            cached = None
+        if cached is not None and cached[0] == cache_key:
+            return ActionGroupBuilder._copy_schema(cached[1])
+
+        schema = None
+        if ActionGroupBuilder._precomputed_schemas:
+            schema = ActionGroupBuilder._precomputed_schemas.get(
+                ActionGroupBuilder.schema_fingerprint(
+                    func=func, argument_key=argument_key, return_key=return_key
+                )
+            )
+        if schema is None:
+            schema = ActionGroupBuilder._build_function_schema(
+                func=func, argument_key=argument_key, return_key=return_key
+            )
+
+        try:
+            with ActionGroupBuilder._schema_lock:
+                ActionGroupBuilder._schema_cache[func] = (cache_key, schema)
+        except TypeError:
+            pass
+        return ActionGroupBuilder._copy_schema(schema)
+
+    @staticmethod
+    def _copy_schema(schema: Dict) -> Dict:
+        return {
+            **schema,
+            "parameters": {
+                name: dict(param) for name, param in schema["parameters"].items()
+            },
+        }
+
+    @staticmethod
+    def schema_fingerprint(
+        func: Callable, argument_key: str = "Parameters:", return_key: str = "Returns:"
+    ) -> str:
+        """Stable hash of everything ``create_function_schema`` reads from ``func``."""
+        return hashlib.sha256(
+            json.dumps(
+                [
+                    getattr(func, "__module__", None),
+                    getattr(func, "__qualname__", func.__name__),
+                    func.__doc__,
+                    str(signature(func)),
+                    argument_key,
+                    return_key,
+                    getattr(func, "__is_confirmation_required__", False),
+                ]
+            ).encode("utf8")
+        ).hexdigest()
+
+    @staticmethod
+    def clear_schema_cache():
+        """Forget cached and loaded function schemas."""
+        with ActionGroupBuilder._schema_lock:
+            ActionGroupBuilder._schema_cache.clear()
+            ActionGroupBuilder._precomputed_schemas = dict()
+
+    @staticmethod
+    def export_function_schemas(action_groups: List[ActionGroup], path: str) -> int:
+        """Write the function schemas of every ``tools`` action group to ``path``.
+
+        Generate the file at build time and call ``load_function_schemas`` at
+        startup so docstrings do not have to be parsed again. Returns the
+        number of schemas written.
+        """
+        schemas = dict()
+        for action_group in action_groups:
+            for func in action_group.tools:
+                schemas[
+                    ActionGroupBuilder.schema_fingerprint(
+                        func=func,
+                        argument_key=action_group.argument_key,
+                        return_key=action_group.return_key,
+                    )
+                ] = ActionGroupBuilder.create_function_schema(
+                    func=func,
+                    argument_key=action_group.argument_key,
+                    return_key=action_group.return_key,
+                )
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(
+                {"version": FUNCTION_SCHEMA_FILE_VERSION, "schemas": schemas}, file
+            )
+        return len(schemas)
+
+    @staticmethod
+    def load_function_schemas(path: str) -> int:
+        """Load schemas written by ``export_function_schemas``.
+
+        A loaded schema is only used for a function whose fingerprint still
+        matches, so a stale file falls back to parsing the docstring. Returns
+        the number of schemas loaded.
+        """
+        with open(path, "r") as file:
+            exported = json.load(file)
+
+        if exported.get("version") != FUNCTION_SCHEMA_FILE_VERSION:
+            raise ValueError(
+                f"Unsupported function schema file version: {exported.get('version')}"
+            )
+
+        with ActionGroupBuilder._schema_lock:
+            ActionGroupBuilder._precomputed_schemas = {
+                **ActionGroupBuilder._precomputed_schemas,
+                **exported["schemas"],
+            }
+        return len(exported["schemas"])
+
+    @staticmethod
+    def _build_function_schema(
+        func: Callable, argument_key: str, return_key: str
+    ) -> FunctionDefination:
+
         description, param_descriptions = ActionGroupBuilder.parse_docstring(
             docstring=func.__doc__, argument_key=argument_key, return_key=return_key
         )
@@ -12,14 +12,40 @@ from .inline_agent import (
     InlineAgent,
 )
 from .confirmation import require_confirmation
+from .tool_executor import run_in_executor, shutdown_executors
 from .process_roc import ProcessROC
 from .collaborator_agent_instance import (
     CollaboratorAgent,
 )
+from .event_stream import AsyncBedrockAgentRuntime, AsyncEventStream
+from .console_renderer import ConsoleRenderer
+from .stream_events import (
+    CitationEvent,
+    FilesEvent,
+    FinalResponseEvent,
+    ReturnControlEvent,
+    StreamEvent,
+    TextDelta,
+    TraceEvent,
+    UsageEvent,
+)
 
 __all__ = [
     "InlineAgent",
     "require_confirmation",
+    "run_in_executor",
+    "shutdown_executors",
     "ProcessROC",
     "CollaboratorAgent",
+    "AsyncBedrockAgentRuntime",
+    "AsyncEventStream",
+    "ConsoleRenderer",
+    "CitationEvent",
+    "FilesEvent",
+    "FinalResponseEvent",
+    "ReturnControlEvent",
+    "StreamEvent",
+    "TextDelta",
+    "TraceEvent",
+    "UsageEvent",
 ]
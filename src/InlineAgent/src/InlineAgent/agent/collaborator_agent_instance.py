@@ -5,13 +5,15 @@ import uuid
 import copy
 import os
 import boto3
-from typing import Dict, Literal
+from typing import Dict, Literal, Optional, Union
 from pydantic import Field
 from termcolor import colored
 from rich.console import Console
 from rich.markdown import Markdown
 
 
+from InlineAgent.clients import client_registry
+from InlineAgent.resolver import profile_name, resolver
 from InlineAgent.constants import (
     TraceColor,
 )
@@ -30,17 +32,15 @@ class CollaboratorAgent:
     @property
     def session(self) -> boto3.Session:
         """Lazy loading of AWS session"""
-        return boto3.Session(profile_name=self.profile)
+        return client_registry.session(self.profile)
 
     @property
     def account_id(self) -> str:
-        sts_client = self.session.client("sts")
-        identity = sts_client.get_caller_identity()
-        return identity["Account"]
+        return client_registry.account_id(self.profile)
 
     @property
     def region(self) -> str:
-        return self.session.region_name
+        return client_registry.region(self.profile)
 
     def __post_init__(self):
 
@@ -61,7 +61,7 @@ class CollaboratorAgent:
             agent_name=self.agent_name,
             region=self.region,
             account_id=self.account_id,
-            session=self.session,
+            profile=self.profile,
         )
 
         if self.routing_instruction == "":
@@ -75,23 +75,24 @@ class CollaboratorAgent:
         }
 
     @staticmethod
-    def get_agent_id_by_name(agent_name: str, session: boto3.Session):
-        # Create Bedrock Agent client
-        bedrock_agent = session.client("bedrock-agent")
-
-        # List all agents and find the one matching the name
-        paginator = bedrock_agent.get_paginator("list_agents")
-
-        for page in paginator.paginate():
-            for agent in page["agentSummaries"]:
-                if agent["agentName"] == agent_name:
-                    return agent["agentId"]
-
-        raise ValueError(f"Agent {agent_name} not found")
+    def get_agent_id_by_name(
+        agent_name: str,
+        profile: Union[boto3.Session, str] = "default",
+        session: Optional[boto3.Session] = None,
+    ):
+        # Agents are listed once per TTL by the shared resolver
+        agent_id = resolver.agent_id(agent_name, profile=profile_name(profile, session))
+        if agent_id is None:
+            raise ValueError(f"Agent {agent_name} not found")
+        return agent_id
 
     @staticmethod
     def get_agent_arn_by_name(
-        agent_name: str, region: str, account_id: str, session: boto3.Session
+        agent_name: str,
+        region: str,
+        account_id: str,
+        profile: Union[boto3.Session, str] = "default",
+        session: Optional[boto3.Session] = None,
     ):
-
-        return f"arn:aws:bedrock:{region}:{account_id}:agent/{CollaboratorAgent.get_agent_id_by_name(agent_name=agent_name, session=session)}"
+        profile = profile_name(profile, session)
+        return f"arn:aws:bedrock:{region}:{account_id}:agent/{CollaboratorAgent.get_agent_id_by_name(agent_name=agent_name, profile=profile)}"
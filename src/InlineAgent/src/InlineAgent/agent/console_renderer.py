@@ -0,0 +1,97 @@
+import os
+from typing import Dict, List
+
+from rich.console import Console
+from rich.markdown import Markdown
+from termcolor import colored
+
+from InlineAgent.agent.stream_events import (
+    CitationEvent,
+    FilesEvent,
+    ReturnControlEvent,
+    StreamEvent,
+    TextDelta,
+    TraceEvent,
+    UsageEvent,
+)
+from InlineAgent.constants import TraceColor
+from InlineAgent.observability import Trace
+
+
+def save_files(files: List[Dict], session_id: str):
+    """Save files returned by the agent under ``output/<session_id>``."""
+    directory_path = os.path.join(os.getcwd(), "output", str(session_id))
+    try:
+        os.makedirs(directory_path, exist_ok=True)
+    except OSError as e:
+        print(f"Error creating directory output: {e}")
+        raise
+
+    for this_file in files:
+        file_name = os.path.join(directory_path, this_file["name"])
+        with open(file_name, "wb") as f:
+            f.write(this_file["bytes"])
+
+
+class ConsoleRenderer:
+    """Prints the events of ``InlineAgent.invoke_stream`` with termcolor/rich."""
+
+    def __init__(
+        self,
+        agent_name: str,
+        session_id: str,
+        enable_trace: bool = True,
+        add_citation: bool = False,
+        truncate_response: int = None,
+    ):
+        self.agent_name = agent_name
+        self.session_id = session_id
+        self.enable_trace = enable_trace
+        self.add_citation = add_citation
+        self.truncate_response = truncate_response
+        self.cite = None
+
+    def render(self, event: StreamEvent):
+        match event:
+            case FilesEvent():
+                console = Console()
+                print("\n\n")
+                console.print(Markdown("**Files saved in output directory**"))
+                save_files(files=event.files, session_id=self.session_id)
+
+            case TraceEvent() if self.enable_trace:
+                Trace.parse_trace(
+                    trace=event.trace,
+                    truncateResponse=self.truncate_response,
+                    agentName=self.agent_name,
+                )
+
+            case CitationEvent() if self.add_citation:
+                _, self.cite = Trace.add_citation(
+                    citations=event.citations,
+                    cite=1 if not self.cite else self.cite,
+                )
+
+            case TextDelta() | CitationEvent():
+                print(colored(event.text, TraceColor.final_output), end="")
+
+            case ReturnControlEvent():
+                for result in event.session_state["returnControlInvocationResults"]:
+                    if "responseBody" in result["functionResult"]:
+                        print(
+                            colored(
+                                f"Tool output: {result['functionResult']['responseBody']['TEXT']['body']}",
+                                TraceColor.invocation_input,
+                            )
+                        )
+
+            case UsageEvent():
+                print(
+                    colored(
+                        f"\nAgent made a total of {event.llm_calls} LLM calls, "
+                        + f"using {event.input_tokens+event.output_tokens} tokens "
+                        + f"(in: {event.input_tokens}, out: {event.output_tokens})"
+                        + f", and took {event.duration:,.1f} total seconds",
+                        TraceColor.stats,
+                    )
+                )
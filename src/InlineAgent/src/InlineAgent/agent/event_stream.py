@@ -0,0 +1,64 @@
+import asyncio
+import functools
+from concurrent.futures import Executor
+from typing import Any, AsyncIterator, Dict, Iterable, Optional
+
+_END_OF_STREAM = object()
+
+
+class AsyncEventStream:
+    """Async iterator over a blocking botocore ``EventStream``.
+
+    Every read of the underlying stream happens on an executor thread, so a
+    slow agent never blocks the event loop while it waits for the next event.
+    """
+
+    def __init__(self, event_stream: Iterable, executor: Optional[Executor] = None):
+        self._event_stream = event_stream
+        self._iterator = iter(event_stream)
+        self._executor = executor
+
+    def __aiter__(self) -> AsyncIterator[Dict]:
+        return self
+
+    async def __anext__(self) -> Dict:
+        loop = asyncio.get_running_loop()
+        event = await loop.run_in_executor(
+            self._executor, next, self._iterator, _END_OF_STREAM
+        )
+        if event is _END_OF_STREAM:
+            raise StopAsyncIteration
+        return event
+
+    async def close(self):
+        close = getattr(self._event_stream, "close", None)
+        if close is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, close)
+
+
+class AsyncBedrockAgentRuntime:
+    """Executor-backed async facade over a ``bedrock-agent-runtime`` client.
+
+    The request itself and every read of the returned ``completion`` stream
+    run off the event loop, which lets many agent sessions share one process.
+    """
+
+    def __init__(self, client: Any, executor: Optional[Executor] = None):
+        self.client = client
+        self.executor = executor
+
+    async def invoke_inline_agent(self, **kwargs) -> Dict:
+        """Call ``invoke_inline_agent`` without blocking the event loop.
+
+        Returns the raw boto3 response; wrap ``response["completion"]`` with
+        :meth:`stream` to consume the events asynchronously.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            functools.partial(self.client.invoke_inline_agent, **kwargs),
+        )
+
+    def stream(self, event_stream: Iterable) -> AsyncEventStream:
+        return AsyncEventStream(event_stream=event_stream, executor=self.executor)
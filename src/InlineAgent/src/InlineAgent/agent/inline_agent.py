@@ -1,26 +1,40 @@
 from dataclasses import dataclass, field
 from datetime import datetime, UTC
 
+import io
+import itertools
 import json
 import uuid
+import weakref
 import copy
-import os
 import boto3
-from typing import Callable, Dict, List, Literal, Optional, Tuple, Union
+from concurrent.futures import Executor
+from typing import AsyncIterator, Callable, Dict, List, Literal, Optional, Tuple, Union
 from pydantic import Field
 from termcolor import colored
-from rich.console import Console
-from rich.markdown import Markdown
 
 
 from InlineAgent.action_group import ActionGroups
 from InlineAgent.action_group.action_group import ActionGroup
 from InlineAgent.agent.collaborator_agent_instance import CollaboratorAgent
+from InlineAgent.clients import client_registry
 from InlineAgent.constants import (
     USER_INPUT_ACTION_GROUP_NAME,
     TraceColor,
 )
 from InlineAgent.agent.process_roc import ProcessROC
+from InlineAgent.agent.console_renderer import ConsoleRenderer
+from InlineAgent.agent.event_stream import AsyncBedrockAgentRuntime
+from InlineAgent.agent.stream_events import (
+    CitationEvent,
+    FilesEvent,
+    FinalResponseEvent,
+    ReturnControlEvent,
+    StreamEvent,
+    TextDelta,
+    TraceEvent,
+    UsageEvent,
+)
 from InlineAgent.observability import Trace
 from InlineAgent.knowledge_base import KnowledgeBasePlugin
 from InlineAgent.tools.mcp import MCPServer
@@ -29,6 +43,8 @@ from InlineAgent.types import (
     InlineCollaboratorConfigurations,
 )
 
+_REVISIONS = itertools.count(1)
+
 
 @dataclass
 class InlineAgent:
@@ -50,21 +66,42 @@ class InlineAgent:
     profile: str = field(default="default")
     user_input: bool = False
     tool_map: Dict[str, Callable] = None
+    tool_executors: Dict[str, Tuple] = None
+    max_tool_concurrency: int = 8
+    tool_timeout: Optional[float] = None
+
+    _revision: int = field(default=0, init=False, repr=False, compare=False)
+    _supervisors: List[weakref.ref] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+    _invoke_params_cache: Optional[Tuple[int, Dict]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if not name.startswith("_") and "_supervisors" in self.__dict__:
+            if name == "collaborators" and value:
+                self._register_collaborators()
+            self.invalidate_invoke_params()
+
+    def _register_collaborators(self):
+        for collaborator in self.collaborators:
+            if isinstance(collaborator, InlineAgent):
+                collaborator._supervisors.append(weakref.ref(self))
 
     @property
     def session(self) -> boto3.Session:
         """Lazy loading of AWS session"""
-        return boto3.Session(profile_name=self.profile)
+        return client_registry.session(self.profile)
 
     @property
     def account_id(self) -> str:
-        sts_client = self.session.client("sts")
-        identity = sts_client.get_caller_identity()
-        return identity["Account"]
+        return client_registry.account_id(self.profile)
 
     @property
     def region(self) -> str:
-        return self.session.region_name
+        return client_registry.region(self.profile)
 
     def __post_init__(self):
 
@@ -87,6 +124,7 @@ class InlineAgent:
                 self.action_groups = ActionGroups(action_groups=self.action_groups)
 
             self.tool_map = self.action_groups.tool_map
+            self.tool_executors = self.action_groups.tool_executors
 
             self.action_groups = self.action_groups.actionGroups
 
@@ -124,6 +162,7 @@ class InlineAgent:
                     raise ValueError(
                         "collaborators must be either instance of class `InlineAgent` or `CollaboratorAgent`"
                     )
+            self._register_collaborators()
         if self.collaborator_configuration is None:
             self.collaborator_configuration = InlineCollaboratorAgentConfig()
         else:
@@ -139,7 +178,33 @@ class InlineAgent:
         if not self.collaborator_configuration.instruction:
             self.collaborator_configuration.instruction = self.instruction
 
+    def invalidate_invoke_params(self):
+        """Drop the cached invoke payload of this agent and its supervisors.
+
+        Assigning any public field invalidates the cache automatically; call
+        this after mutating a field in place, e.g. ``agent.action_groups.append(...)``.
+        """
+        self._revision = next(_REVISIONS)
+        for supervisor_ref in self._supervisors:
+            supervisor = supervisor_ref()
+            if supervisor is not None:
+                supervisor.invalidate_invoke_params()
+
     def get_invoke_params(self) -> Dict:
+        """Return the InvokeInlineAgent payload, built once and cached.
+
+        Collaborator ARNs, nested ``InlineAgent`` payloads and filtered dicts
+        are computed on the first call only; the cache is rebuilt after this
+        agent or any nested collaborator changes.
+        """
+        if (
+            self._invoke_params_cache is None
+            or self._invoke_params_cache[0] != self._revision
+        ):
+            self._invoke_params_cache = (self._revision, self._build_invoke_params())
+        return self._invoke_params_cache[1]
+
+    def _build_invoke_params(self) -> Dict:
         invokeParams = dict()
         match self.agent_collaboration:
             case "DISABLED":
@@ -203,25 +268,30 @@ class InlineAgent:
         }
         return {k: v for k, v in agentParams.items() if v}
 
-    async def invoke(
+    async def invoke_stream(
         self,
         input_text: str,
         enable_trace: bool = True,
         session_id: str = str(uuid.uuid4()),
         end_session: bool = False,
         session_state: Dict = None,
-        add_citation: bool = False,
-        process_response: bool = True,
-        truncate_response: int = None,
         streaming_configurations: Dict = {"streamFinalResponse": False},
         bedrock_model_configurations: Dict = {
             "performanceConfig": {"latency": "standard"}
         },
-    ):
+        executor: Optional[Executor] = None,
+    ) -> AsyncIterator[StreamEvent]:
+        """Invoke the agent and yield typed events as they arrive.
+
+        Return-of-control requests are resolved with the agent's tools and sent
+        back until the agent produces a final response. Nothing is printed:
+        render the events with :class:`ConsoleRenderer` or consume them
+        directly. The last two events are always a :class:`UsageEvent` and a
+        :class:`FinalResponseEvent` carrying the complete response text.
+        """
         if session_state is None:
             session_state = {}
 
-        print(f"SessionId: {session_id}")
         if "returnControlInvocationResults" in session_state:
             raise ValueError(
                 "returnControlInvocationResults key is not supported in inlineSessionState"
@@ -230,176 +300,187 @@ class InlineAgent:
         if "invocationId" in session_state:
             raise ValueError("invocationId key is not supported in inlineSessionState")
 
-        agent_answer = ""
-
-        bedrock_agent_runtime = boto3.Session(profile_name=self.profile).client(
-            "bedrock-agent-runtime"
+        bedrock_agent_runtime = AsyncBedrockAgentRuntime(
+            client=client_registry.client(
+                "bedrock-agent-runtime", profile=self.profile
+            ),
+            executor=executor,
         )
 
         inlineSessionState = copy.deepcopy(session_state)
+        agent_answer = io.StringIO()
 
         total_input_tokens = 0
         total_output_tokens = 0
         total_llm_calls = 0
 
         time_before_call = datetime.now(UTC)
-        cite = None
-        orch_step = 0
-        sub_step = 0
 
-        stream_final_response = streaming_configurations["streamFinalResponse"]
-        # print(self.get_invoke_params())
-        while not agent_answer:
+        invoke_params = self.get_invoke_params()
+        while True:
+            request_params = invoke_params
             if inlineSessionState:
-                response = bedrock_agent_runtime.invoke_inline_agent(
-                    sessionId=session_id,
-                    inputText=input_text,
-                    enableTrace=enable_trace,
-                    endSession=end_session,
-                    inlineSessionState=inlineSessionState,
-                    streamingConfigurations=streaming_configurations,
-                    bedrockModelConfigurations=bedrock_model_configurations,
-                    **self.get_invoke_params(),
-                )
-            else:
-                response = bedrock_agent_runtime.invoke_inline_agent(
-                    sessionId=session_id,
-                    inputText=input_text,
-                    enableTrace=enable_trace,
-                    endSession=end_session,
-                    streamingConfigurations=streaming_configurations,
-                    bedrockModelConfigurations=bedrock_model_configurations,
-                    **self.get_invoke_params(),
-                )
-
-            if not process_response:
-                return response
+                request_params = {
+                    **invoke_params,
+                    "inlineSessionState": inlineSessionState,
+                }
+            response = await bedrock_agent_runtime.invoke_inline_agent(
+                sessionId=session_id,
+                inputText=input_text,
+                enableTrace=enable_trace,
+                endSession=end_session,
+                streamingConfigurations=streaming_configurations,
+                bedrockModelConfigurations=bedrock_model_configurations,
+                **request_params,
+            )
 
             inlineSessionState = copy.deepcopy(session_state)
+            returned_control = False
 
-            event_stream = response["completion"]
+            event_stream = bedrock_agent_runtime.stream(response["completion"])
 
             try:
-                for event in event_stream:
-                    # print(json.dumps(event, indent=2, default=str))
+                async for event in event_stream:
                     if "files" in event:
-                        files_event = event["files"]
-
-                        console = Console()
-                        print("\n\n")
-                        console.print(Markdown("**Files saved in output directory**"))
-
-                        files_list = files_event["files"]
-                        for idx, this_file in enumerate(files_list):
-                            file_bytes = this_file["bytes"]
-
-                            # save bytes to file, given the name of file and the bytes
-                            directory_path = os.path.join(os.getcwd(), "output")
-                            if not os.path.exists(directory_path):
-                                try:
-                                    os.makedirs(directory_path, exist_ok=True)
-                                except OSError as e:
-                                    print(f"Error creating directory output: {e}")
-                                    raise
-
-                            if not os.path.exists(
-                                os.path.join(directory_path, str(session_id))
-                            ):
-                                try:
-                                    os.makedirs(
-                                        os.path.join(directory_path, str(session_id)),
-                                        exist_ok=True,
-                                    )
-                                except OSError as e:
-                                    print(f"Error creating directory output: {e}")
-                                    raise
-
-                            file_name = os.path.join(
-                                directory_path, str(session_id), this_file["name"]
-                            )
-                            with open(file_name, "wb") as f:
-                                f.write(file_bytes)
+                        yield FilesEvent(files=event["files"]["files"])
 
                     if "returnControl" in event:
+                        returned_control = True
                         inlineSessionState = await ProcessROC.process_roc(
                             inlineSessionState=inlineSessionState,
                             roc_event=event["returnControl"],
                             tool_map=self.tool_map,
+                            max_concurrency=self.max_tool_concurrency,
+                            tool_timeout=self.tool_timeout,
+                            executor=executor,
+                            action_group_executors=self.tool_executors,
+                        )
+                        yield ReturnControlEvent(
+                            return_control=event["returnControl"],
+                            session_state=inlineSessionState,
                         )
 
-                    # Process trace
                     if "trace" in event and "trace" in event["trace"] and enable_trace:
-
-                        # print(json.dumps(event["trace"], indent=2))
-                        input_tokens, output_tokens, llm_calls = Trace.parse_trace(
+                        input_tokens, output_tokens, llm_calls = Trace.get_usage(
+                            trace=event["trace"]["trace"]
+                        )
+                        total_input_tokens += input_tokens
+                        total_output_tokens += output_tokens
+                        total_llm_calls += llm_calls
+                        yield TraceEvent(
                             trace=event["trace"]["trace"],
-                            truncateResponse=truncate_response,
-                            agentName=self.agent_name,
+                            input_tokens=input_tokens,
+                            output_tokens=output_tokens,
+                            llm_calls=llm_calls,
                         )
-                        total_input_tokens += int(input_tokens)
-                        total_output_tokens += int(output_tokens)
-                        total_llm_calls += int(llm_calls)
 
-                    # Get Final Answer
                     if "chunk" in event:
-                        if add_citation:
-                            if "attribution" in event["chunk"]:
-                                agent_answer, cite = Trace.add_citation(
-                                    citations=event["chunk"]["attribution"][
-                                        "citations"
-                                    ],
-                                    cite=1 if not cite else cite,
-                                )
-                            else:
-                                data = event["chunk"]["bytes"]
-                                agent_answer += data.decode("utf8")
-                                print(
-                                    colored(
-                                        data.decode("utf8"), TraceColor.final_output
-                                    ),
-                                    end="",
-                                )
-                        elif not add_citation:
-                            data = event["chunk"]["bytes"]
-                            if stream_final_response:
-                                agent_answer += data.decode("utf8")
-                                print(
-                                    colored(
-                                        data.decode("utf8"), TraceColor.final_output
-                                    ),
-                                    end="",
-                                )
-                            else:
-                                agent_answer += data.decode("utf8")
-                                print(
-                                    colored(agent_answer, TraceColor.final_output),
-                                    end="",
-                                )
+                        text = event["chunk"].get("bytes", b"").decode("utf8")
+                        agent_answer.write(text)
+                        if "attribution" in event["chunk"]:
+                            yield CitationEvent(
+                                text=text,
+                                citations=event["chunk"]["attribution"]["citations"],
+                            )
+                        else:
+                            yield TextDelta(text=text)
 
             except Exception as e:
-                print(
-                    colored("Caught exception while invoking Agent", TraceColor.error)
+                raise RuntimeError(
+                    f"request ID: {response['ResponseMetadata']['RequestId']}, "
+                    + f"retries: {response['ResponseMetadata']['RetryAttempts']}"
+                ) from e
+
+            if agent_answer.tell() or not returned_control:
+                break
+
+        yield UsageEvent(
+            input_tokens=total_input_tokens,
+            output_tokens=total_output_tokens,
+            llm_calls=total_llm_calls,
+            duration=(datetime.now(UTC) - time_before_call).total_seconds(),
+        )
+        yield FinalResponseEvent(text=agent_answer.getvalue())
+
+    async def invoke(
+        self,
+        input_text: str,
+        enable_trace: bool = True,
+        session_id: str = str(uuid.uuid4()),
+        end_session: bool = False,
+        session_state: Dict = None,
+        add_citation: bool = False,
+        process_response: bool = True,
+        truncate_response: int = None,
+        streaming_configurations: Dict = {"streamFinalResponse": False},
+        bedrock_model_configurations: Dict = {
+            "performanceConfig": {"latency": "standard"}
+        },
+        executor: Optional[Executor] = None,
+    ):
+        if session_state is None:
+            session_state = {}
+
+        print(f"SessionId: {session_id}")
+
+        if not process_response:
+            if "returnControlInvocationResults" in session_state:
+                raise ValueError(
+                    "returnControlInvocationResults key is not supported in inlineSessionState"
                 )
-                print(colored(f"input text: {input_text}", TraceColor.error))
-                print(
-                    colored(
-                        f"request ID: {response['ResponseMetadata']['RequestId']}, retries: {response['ResponseMetadata']['RetryAttempts']}\n",
-                        TraceColor.error,
-                    )
+
+            if "invocationId" in session_state:
+                raise ValueError(
+                    "invocationId key is not supported in inlineSessionState"
                 )
-                print(colored(f"Error: {e}", TraceColor.error))
-                raise Exception("Unexpected exception: ", e)
-
-        duration = datetime.now(UTC) - time_before_call
-
-        print(
-            colored(
-                f"\nAgent made a total of {total_llm_calls} LLM calls, "
-                + f"using {total_input_tokens+total_output_tokens} tokens "
-                + f"(in: {total_input_tokens}, out: {total_output_tokens})"
-                + f", and took {duration.total_seconds():,.1f} total seconds",
-                TraceColor.stats,
+
+            invoke_params = self.get_invoke_params()
+            if session_state:
+                invoke_params = {**invoke_params, "inlineSessionState": session_state}
+            return await AsyncBedrockAgentRuntime(
+                client=client_registry.client(
+                    "bedrock-agent-runtime", profile=self.profile
+                ),
+                executor=executor,
+            ).invoke_inline_agent(
+                sessionId=session_id,
+                inputText=input_text,
+                enableTrace=enable_trace,
+                endSession=end_session,
+                streamingConfigurations=streaming_configurations,
+                bedrockModelConfigurations=bedrock_model_configurations,
+                **invoke_params,
             )
+
+        renderer = ConsoleRenderer(
+            agent_name=self.agent_name,
+            session_id=session_id,
+            enable_trace=enable_trace,
+            add_citation=add_citation,
+            truncate_response=truncate_response,
         )
 
+        agent_answer = str()
+        try:
+            async for event in self.invoke_stream(
+                input_text=input_text,
+                enable_trace=enable_trace,
+                session_id=session_id,
+                end_session=end_session,
+                session_state=session_state,
+                streaming_configurations=streaming_configurations,
+                bedrock_model_configurations=bedrock_model_configurations,
+                executor=executor,
+            ):
+                renderer.render(event)
+                if isinstance(event, FinalResponseEvent):
+                    agent_answer = event.text
+
+        except RuntimeError as e:
+            print(colored("Caught exception while invoking Agent", TraceColor.error))
+            print(colored(f"input text: {input_text}", TraceColor.error))
+            print(colored(f"{e}\n", TraceColor.error))
+            print(colored(f"Error: {e.__cause__}", TraceColor.error))
+            raise Exception("Unexpected exception: ", e.__cause__)
+
         return agent_answer
@@ -1,17 +1,39 @@
-import copy
+import asyncio
+import functools
 import inspect
 import json
-from typing import Any, Callable, Dict, Union
-from termcolor import colored
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
-from InlineAgent.constants import TraceColor
+from InlineAgent.agent.tool_executor import ExecutorSpec, get_executor
 
 
 class ProcessROC:
     @staticmethod
     async def process_roc(
-        inlineSessionState: Dict, roc_event: Dict, tool_map: Dict[str, Callable]
+        inlineSessionState: Dict,
+        roc_event: Dict,
+        tool_map: Dict[str, Callable],
+        max_concurrency: int = 8,
+        tool_timeout: Optional[float] = None,
+        executor: Optional[Executor] = None,
+        action_group_executors: Optional[
+            Dict[str, Tuple[Optional[ExecutorSpec], Optional[float]]]
+        ] = None,
     ):
+        """Invoke the tools requested by a returnControl event.
+
+        RESULT invocation inputs are independent of each other, so they are
+        dispatched concurrently: coroutine tools are gathered on the event
+        loop and synchronous tools run on ``executor`` (the loop's default
+        thread pool when ``None``). At most ``max_concurrency`` tools run at
+        once and each one is bounded by ``tool_timeout`` seconds. Results keep
+        the order of ``roc_event["invocationInputs"]``.
+
+        The executor and timeout of a tool can be overridden per action group
+        with ``action_group_executors``, mapping action group names to
+        ``(executor, timeout)``, and per tool with :func:`run_in_executor`.
+        """
         # TODO: Tool to invoke is str and callable
         if "returnControlInvocationResults" in inlineSessionState:
             raise ValueError(
@@ -21,11 +43,19 @@ class ProcessROC:
         if "invocationId" in inlineSessionState:
             raise ValueError("invocationId key is not supported in sessionState")
 
-        inlineSessionState = copy.deepcopy(inlineSessionState)
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be greater than 0")
+
         inlineSessionState = {"returnControlInvocationResults": []}
         inlineSessionState["invocationId"] = roc_event["invocationId"]
 
-        for invocationInput in roc_event["invocationInputs"]:
+        if action_group_executors is None:
+            action_group_executors = dict()
+
+        results: List[Optional[Dict]] = [None] * len(roc_event["invocationInputs"])
+        pending_results: List[Tuple[int, Dict, Callable, Dict]] = []
+
+        for idx, invocationInput in enumerate(roc_event["invocationInputs"]):
 
             # This is a Tagged Union structure. Only one of the following top level keys will be set: apiInvocationInput, functionInvocationInput.
             # If a client receives an unknown member it will set SDK_UNKNOWN_MEMBER as the top level key, which maps to the name or tag of the unknown member.
@@ -39,33 +69,10 @@ class ProcessROC:
                 "actionInvocationType"
             ]
             functionInvocationInput = invocationInput["functionInvocationInput"]
-            actionGroup = functionInvocationInput["actionGroup"]
-
-            parameters = dict()
-            for param in functionInvocationInput["parameters"]:
-                if param["type"] == "array":
-                    result = None
-                    try:
-                        result = json.loads(param["value"])
-                    except Exception:
-                        json_str = (
-                            param["value"]
-                            .replace("=", ":")
-                            .replace("[{", '[{"')
-                            .replace("}]", '"}]')
-                        )
-                        json_str = json_str.replace(", ", '", "').replace(":", '":"')
-                        result = json.loads(json_str)
-                    finally:
-                        parameters[param["name"]] = result
-                elif param["type"] == "string":
-                    parameters[param["name"]] = param["value"]
-                elif param["type"] == "number":
-                    parameters[param["name"]] = int(param["value"])
-                elif param["type"] == "boolean":
-                    parameters[param["name"]] = bool(param["value"])
-                elif param["type"] == "integer":
-                    parameters[param["name"]] = int(param["value"])
+
+            parameters = ProcessROC.parse_parameters(
+                functionInvocationInput["parameters"]
+            )
             if (
                 actionInvocationType == "RESULT"
                 or actionInvocationType == "USER_CONFIRMATION_AND_RESULT"
@@ -80,40 +87,104 @@ class ProcessROC:
                     )
 
                 if actionInvocationType == "USER_CONFIRMATION_AND_RESULT":
+                    confirmationState = {"returnControlInvocationResults": []}
                     await ProcessROC.process_user_confirmation(
-                        sessionState=inlineSessionState,
+                        sessionState=confirmationState,
                         tool_to_invoke=tool_to_invoke,
                         functionInvocationInput=functionInvocationInput,
                         include_result=True,
                         parameters=parameters,
                     )
+                    results[idx] = confirmationState["returnControlInvocationResults"][
+                        0
+                    ]
 
                 else:
-                    inlineSessionState["returnControlInvocationResults"].append(
-                        {
-                            "functionResult": await ProcessROC.invoke_roc_function(
-                                functionInvocationInput=functionInvocationInput,
-                                tool_to_invoke=tool_to_invoke,
-                                parameters=parameters,
-                                confirm=None,
-                            )
-                        }
+                    pending_results.append(
+                        (idx, functionInvocationInput, tool_to_invoke, parameters)
                     )
 
             elif actionInvocationType == "USER_CONFIRMATION":
                 tool_to_invoke = functionInvocationInput["function"]
+                confirmationState = {"returnControlInvocationResults": []}
                 await ProcessROC.process_user_confirmation(
-                    sessionState=inlineSessionState,
+                    sessionState=confirmationState,
                     tool_to_invoke=tool_to_invoke,
                     functionInvocationInput=functionInvocationInput,
                     include_result=False,
                     parameters=parameters,
                 )
+                results[idx] = confirmationState["returnControlInvocationResults"][0]
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def invoke_pending(
+            functionInvocationInput: Dict, tool_to_invoke: Callable, parameters: Dict
+        ) -> Dict:
+            group_executor, group_timeout = action_group_executors.get(
+                functionInvocationInput["actionGroup"], (None, None)
+            )
+            tool_executor = getattr(tool_to_invoke, "__roc_executor__", None)
+            timeout = getattr(tool_to_invoke, "__roc_timeout__", None)
+            if timeout is None:
+                timeout = group_timeout if group_timeout is not None else tool_timeout
+
+            async with semaphore:
+                return await ProcessROC.invoke_roc_function(
+                    functionInvocationInput=functionInvocationInput,
+                    tool_to_invoke=tool_to_invoke,
+                    parameters=parameters,
+                    confirm=None,
+                    timeout=timeout,
+                    executor=get_executor(tool_executor or group_executor) or executor,
+                    offload_sync=True,
+                )
 
-        inlineSessionState.update(inlineSessionState)
+        functionResults = await asyncio.gather(
+            *[
+                invoke_pending(functionInvocationInput, tool_to_invoke, parameters)
+                for _, functionInvocationInput, tool_to_invoke, parameters in pending_results
+            ]
+        )
+        for (idx, *_), functionResult in zip(pending_results, functionResults):
+            results[idx] = {"functionResult": functionResult}
+
+        inlineSessionState["returnControlInvocationResults"] = [
+            result for result in results if result is not None
+        ]
 
         return inlineSessionState
 
+    @staticmethod
+    def parse_parameters(parameters: List[Dict]) -> Dict[str, Any]:
+        """Convert returnControl parameters into keyword arguments for a tool."""
+        parsed_parameters = dict()
+        for param in parameters:
+            if param["type"] == "array":
+                result = None
+                try:
+                    result = json.loads(param["value"])
+                except Exception:
+                    json_str = (
+                        param["value"]
+                        .replace("=", ":")
+                        .replace("[{", '[{"')
+                        .replace("}]", '"}]')
+                    )
+                    json_str = json_str.replace(", ", '", "').replace(":", '":"')
+                    result = json.loads(json_str)
+                finally:
+                    parsed_parameters[param["name"]] = result
+            elif param["type"] == "string":
+                parsed_parameters[param["name"]] = param["value"]
+            elif param["type"] == "number":
+                parsed_parameters[param["name"]] = int(param["value"])
+            elif param["type"] == "boolean":
+                parsed_parameters[param["name"]] = bool(param["value"])
+            elif param["type"] == "integer":
+                parsed_parameters[param["name"]] = int(param["value"])
+        return parsed_parameters
+
     @staticmethod
     async def process_user_confirmation(
         sessionState: Dict,
@@ -193,6 +264,9 @@ class ProcessROC:
         parameters: Dict = dict(),
         confirm: str = None,
         tool_to_invoke: Callable = None,
+        timeout: Optional[float] = None,
+        executor: Optional[Executor] = None,
+        offload_sync: bool = False,
     ) -> Dict:
 
         functionResult = dict
@@ -201,23 +275,55 @@ class ProcessROC:
         try:
 
             if inspect.iscoroutinefunction(tool_to_invoke):
-                result = await tool_to_invoke(**parameters)
+                result = await asyncio.wait_for(
+                    tool_to_invoke(**parameters), timeout=timeout
+                )
+            elif offload_sync:
+                loop = asyncio.get_running_loop()
+                result = await asyncio.wait_for(
+                    loop.run_in_executor(
+                        executor, functools.partial(tool_to_invoke, **parameters)
+                    ),
+                    timeout=timeout,
+                )
             else:
                 result = tool_to_invoke(**parameters)
 
-            print(
-                colored(
-                    f"Tool output: {result}",
-                    TraceColor.invocation_input,
-                )
-            )
-
             functionResult = {
                 "actionGroup": functionInvocationInput["actionGroup"],
                 "agentId": functionInvocationInput["agentId"],
                 "function": functionInvocationInput["function"],
                 "responseBody": {"TEXT": {"body": result}},
             }
+        except asyncio.TimeoutError:
+            functionResult = {
+                "actionGroup": functionInvocationInput["actionGroup"],
+                "agentId": functionInvocationInput["agentId"],
+                "function": functionInvocationInput["function"],
+                "responseBody": {
+                    "TEXT": {
+                        "body": f"Function {functionInvocationInput['function']} timed out after {timeout} seconds"
+                    }
+                },
+                "responseState": "FAILURE",
+            }
+        except asyncio.CancelledError:
+            # Cancelling the invocation itself still cancels it; a tool that was
+            # cancelled underneath us, e.g. by an executor shutdown, is a failure
+            task = asyncio.current_task()
+            if task is not None and task.cancelling():
+                raise
+            functionResult = {
+                "actionGroup": functionInvocationInput["actionGroup"],
+                "agentId": functionInvocationInput["agentId"],
+                "function": functionInvocationInput["function"],
+                "responseBody": {
+                    "TEXT": {
+                        "body": f"Function {functionInvocationInput['function']} was cancelled"
+                    }
+                },
+                "responseState": "FAILURE",
+            }
         except Exception as e:
             functionResult = {
                 "actionGroup": functionInvocationInput["actionGroup"],
@@ -0,0 +1,70 @@
+from dataclasses import dataclass
+from typing import Dict, List, Union
+
+
+@dataclass(slots=True)
+class TextDelta:
+    """A piece of the final response."""
+
+    text: str
+
+
+@dataclass(slots=True)
+class CitationEvent:
+    """A piece of the final response with knowledge base attributions."""
+
+    text: str
+    citations: List[Dict]
+
+
+@dataclass(slots=True)
+class TraceEvent:
+    """A raw agent trace together with the usage it reports."""
+
+    trace: Dict
+    input_tokens: int = 0
+    output_tokens: int = 0
+    llm_calls: int = 0
+
+
+@dataclass(slots=True)
+class FilesEvent:
+    """Files produced by the agent, e.g. by the code interpreter."""
+
+    files: List[Dict]
+
+
+@dataclass(slots=True)
+class ReturnControlEvent:
+    """A return-of-control request and the session state sent back for it."""
+
+    return_control: Dict
+    session_state: Dict
+
+
+@dataclass(slots=True)
+class UsageEvent:
+    """Totals for the invocation, emitted once before the final response."""
+
+    input_tokens: int
+    output_tokens: int
+    llm_calls: int
+    duration: float
+
+
+@dataclass(slots=True)
+class FinalResponseEvent:
+    """The complete response text, emitted last."""
+
+    text: str
+
+
+StreamEvent = Union[
+    TextDelta,
+    CitationEvent,
+    TraceEvent,
+    FilesEvent,
+    ReturnControlEvent,
+    UsageEvent,
+    FinalResponseEvent,
+]
@@ -0,0 +1,72 @@
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Literal, Optional, Union
+
+THREAD = "thread"
+PROCESS = "process"
+
+ExecutorSpec = Union[Literal["thread", "process"], Executor]
+
+_shared_executors: Dict[str, Executor] = dict()
+_shared_executors_lock = threading.Lock()
+
+
+def get_executor(spec: Optional[ExecutorSpec]) -> Optional[Executor]:
+    """Return the executor for ``spec``.
+
+    ``"thread"`` and ``"process"`` map to a thread pool and a process pool
+    shared by every agent in the process, created on first use. Executor
+    instances are returned as they are.
+    """
+    if spec is None or isinstance(spec, Executor):
+        return spec
+
+    with _shared_executors_lock:
+        executor = _shared_executors.get(spec)
+        if executor is None:
+            if spec == THREAD:
+                executor = ThreadPoolExecutor(thread_name_prefix="roc-tool")
+            elif spec == PROCESS:
+                executor = ProcessPoolExecutor()
+            else:
+                raise ValueError(
+                    f"Unknown tool executor {spec!r}, use 'thread', 'process' or an Executor"
+                )
+            _shared_executors[spec] = executor
+        return executor
+
+
+def shutdown_executors(wait: bool = True):
+    """Shut down the shared thread and process pools."""
+    with _shared_executors_lock:
+        executors = list(_shared_executors.values())
+        _shared_executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def run_in_executor(
+    executor: ExecutorSpec = THREAD, timeout: Optional[float] = None
+) -> Callable:
+    """Declare where a synchronous return-of-control tool runs.
+
+    Use ``"thread"`` for blocking I/O and ``"process"`` for CPU-bound tools;
+    process pool tools and their results must be picklable, so define them at
+    module level. ``timeout`` bounds the tool in seconds; a tool that times out
+    or is cancelled is reported to the agent with a ``FAILURE`` responseState.
+    Both override the ``tool_executor`` and ``tool_timeout`` of the action
+    group. Work already running in a pool cannot be interrupted, only
+    abandoned, so a timed out tool keeps its worker busy until it returns.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        func.__roc_executor__ = executor
+        func.__roc_timeout__ = timeout
+        return func
+
+    # Handle both @run_in_executor and @run_in_executor()
+    if callable(executor) and not isinstance(executor, Executor):
+        func = executor
+        executor = THREAD
+        return decorator(func)
+    return decorator
@@ -0,0 +1,97 @@
+import json
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import boto3
+from botocore.config import Config
+
+
+DEFAULT_MAX_POOL_CONNECTIONS = 50
+
+
+class ClientRegistry:
+    """Process-wide cache of boto3 sessions, clients and caller identity.
+
+    boto3 sessions are cheap to share but expensive to create: every new
+    session resolves credentials and endpoints again, and every new client
+    opens its own HTTP connection pool. The registry creates each session once
+    per profile and each client once per (profile, region, service, config),
+    so all agents, action groups and knowledge bases in a process reuse them.
+    Client creation is guarded by a lock because boto3 sessions are not
+    thread-safe; the clients themselves are.
+    """
+
+    def __init__(self, max_pool_connections: int = DEFAULT_MAX_POOL_CONNECTIONS):
+        self.max_pool_connections = max_pool_connections
+        self._lock = threading.RLock()
+        self._sessions: Dict[str, boto3.Session] = dict()
+        self._clients: Dict[Tuple[str, Optional[str], str, str], Any] = dict()
+        self._account_ids: Dict[str, str] = dict()
+
+    def session(self, profile: str = "default") -> boto3.Session:
+        session = self._sessions.get(profile)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(profile)
+                if session is None:
+                    session = boto3.Session(profile_name=profile)
+                    self._sessions[profile] = session
+        return session
+
+    def client(
+        self,
+        service_name: str,
+        profile: str = "default",
+        region_name: Optional[str] = None,
+        config: Optional[Dict[str, Any]] = None,
+    ):
+        """Return a cached client, creating it on first use.
+
+        Args:
+            service_name: AWS service name, e.g. ``bedrock-agent-runtime``
+            profile: AWS profile used to create the session
+            region_name: Region override, defaults to the profile region
+            config: botocore ``Config`` options; ``max_pool_connections``
+                defaults to the registry setting
+        """
+        config = {"max_pool_connections": self.max_pool_connections, **(config or {})}
+        key = (
+            profile,
+            region_name,
+            service_name,
+            json.dumps(config, sort_keys=True, default=str),
+        )
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = self.session(profile).client(
+                        service_name,
+                        region_name=region_name,
+                        config=Config(**config),
+                    )
+                    self._clients[key] = client
+        return client
+
+    def account_id(self, profile: str = "default") -> str:
+        account_id = self._account_ids.get(profile)
+        if account_id is None:
+            identity = self.client("sts", profile=profile).get_caller_identity()
+            account_id = identity["Account"]
+            with self._lock:
+                self._account_ids[profile] = account_id
+        return account_id
+
+    def region(self, profile: str = "default") -> str:
+        return self.session(profile).region_name
+
+    def clear(self):
+        """Drop every cached session, client and identity, e.g. after credentials rotate."""
+        with self._lock:
+            self._sessions.clear()
+            self._clients.clear()
+            self._account_ids.clear()
+
+
+client_registry = ClientRegistry()
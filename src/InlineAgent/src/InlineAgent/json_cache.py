@@ -0,0 +1,45 @@
+import json
+import os
+from typing import Any, Dict, Optional, Tuple
+
+# key -> (listed at, value)
+Entries = Dict[str, Tuple[float, Any]]
+
+
+def load_entries(path: Optional[str], field: str) -> Entries:
+    """Read timestamped entries persisted by ``save_entries``.
+
+    A missing or corrupt file gives no entries, which only costs the listing
+    the cache was meant to save.
+    """
+    if not path or not os.path.exists(path):
+        return dict()
+    try:
+        with open(path, "r") as file:
+            cached = json.load(file)
+        return {
+            key: (entry["listed_at"], entry[field]) for key, entry in cached.items()
+        }
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return dict()
+
+
+def save_entries(path: Optional[str], entries: Entries, field: str):
+    """Persist timestamped entries as JSON, storing each value under ``field``.
+
+    The file is replaced atomically, so concurrent readers never see a partial
+    write.
+    """
+    if not path:
+        return
+    cached = {
+        key: {"listed_at": listed_at, field: value}
+        for key, (listed_at, value) in entries.items()
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as file:
+        json.dump(cached, file)
+    os.replace(tmp_path, path)
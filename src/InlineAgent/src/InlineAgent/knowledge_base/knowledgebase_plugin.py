@@ -1,10 +1,13 @@
 from dataclasses import dataclass, field
 from functools import cached_property
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Union
 
 import boto3
 from pydantic import BaseModel, Field, computed_field, model_validator, validate_call
 
+from InlineAgent.clients import client_registry
+from InlineAgent.resolver import profile_name, resolver
+
 
 class KnowledgeBasePlugin(BaseModel):
     name: str
@@ -19,7 +22,7 @@ class KnowledgeBasePlugin(BaseModel):
     @cached_property
     def session(self) -> boto3.Session:
         """Lazy loading of AWS session"""
-        return boto3.Session(profile_name=self.profile)
+        return client_registry.session(self.profile)
 
     def to_dict(self) -> dict:
         """Convert the KnowledgeBase instance to a dictionary"""
@@ -27,7 +30,7 @@ class KnowledgeBasePlugin(BaseModel):
         # Adding for unittest
         if self.name != "SKaEdphpZh":
             knowledgeBaseId = KnowledgeBasePlugin.get_knowledge_base_id_by_name(
-                self.name, self.session
+                self.name, self.profile
             )
             if knowledgeBaseId is None:
                 raise ValueError(f"Knowledge base {self.name} does not exist")
@@ -43,40 +46,24 @@ class KnowledgeBasePlugin(BaseModel):
     @staticmethod
     @validate_call(config={"arbitrary_types_allowed": True})
     def get_knowledge_base_id_by_name(
-        knowledge_base_name: str, session: boto3.Session
+        knowledge_base_name: str,
+        profile: Union[boto3.Session, str] = "default",
+        session: Optional[boto3.Session] = None,
     ) -> Optional[str]:
         """
         Retrieve the knowledge base ID for a given knowledge base name.
 
+        Lookups are answered from the shared :data:`InlineAgent.resolver.resolver`
+        index, so knowledge bases are listed once per TTL, not per agent.
+
         Args:
             knowledge_base_name (str): Name of the knowledge base
+            profile (str): AWS profile used to look up the knowledge base
+            session (boto3.Session): Deprecated, the profile of the session is used
 
         Returns:
             Optional[str]: Knowledge base ID if found, None otherwise
         """
-        # Create a Bedrock Agent client"
-        bedrock_agent = session.client("bedrock-agent")
-
-        # Initialize variables for pagination
-        next_token = None
-
-        while True:
-            # Prepare the list request
-            kwargs = {}
-            if next_token:
-                kwargs["nextToken"] = next_token
-
-            # List knowledge bases
-            response = bedrock_agent.list_knowledge_bases(**kwargs)
-
-            # Search for the knowledge base with matching name
-            for kb in response.get("knowledgeBaseSummaries", []):
-                if kb.get("name") == knowledge_base_name:
-                    return kb.get("knowledgeBaseId")
-
-            # Check if there are more results
-            next_token = response.get("nextToken")
-            if not next_token:
-                break
-
-            raise ValueError(f"Knowledge base {knowledge_base_name} not found")
+        return resolver.knowledge_base_id(
+            knowledge_base_name, profile=profile_name(profile, session)
+        )
@@ -2,5 +2,13 @@ from .trace import Trace
 from .agent_instrument import observe
 from .settings_management import ObservabilityConfig
 from .trace_provider import create_tracer_provider
+from .trace_store import TraceWriter, read_session_traces
 
-__all__ = ["Trace", "observe", "ObservabilityConfig", "create_tracer_provider"]
+__all__ = [
+    "Trace",
+    "observe",
+    "ObservabilityConfig",
+    "create_tracer_provider",
+    "TraceWriter",
+    "read_session_traces",
+]
@@ -1,5 +1,7 @@
 from datetime import datetime, timezone
+from typing import Dict, Optional
 import functools
+import inspect
 import logging
 import os
 from opentelemetry import trace as otel_trace
@@ -18,7 +20,8 @@ from .utils import add_citation, get_agent_from_caller_chain
 from .semantics import SpanAttributes, SpanName
 from .process import ProcessL2Trace
 from .settings_management import ObservabilityConfig
-from .span_manager import SpanManager
+from .span_manager import LightSpanManager, SpanManager
+from .trace_store import flush_trace_writer
 from .utils import json_safe
 
 
@@ -32,445 +35,553 @@ config = ObservabilityConfig()
 
 tracer = otel_trace.get_tracer(config.BEDROCK_AGENT_TRACER_NAME)
 
-guardrail_span: otel_trace.Span = None
-output_stream_guardrail_intervene: bool = False
-is_guardrail: bool = False
 
+class InvocationObserver:
+    """Instruments a single agent invocation.
+
+    All guardrail and span state lives on the instance, so concurrent
+    invocations in one process, whether threads or asyncio tasks, never
+    share spans.
+
+    With ``low_overhead`` the invocation is processed for production: spans
+    are tracked by a :class:`LightSpanManager` and nothing is rendered to the
+    console.
+    """
+
+    def __init__(
+        self,
+        inputText: str,
+        sessionId: str,
+        kwargs: Dict,
+        show_traces: bool = True,
+        save_traces: bool = False,
+        low_overhead: bool = False,
+    ):
+        self.inputText = inputText
+        self.sessionId = sessionId
+        self.render = not low_overhead
+        self.show_traces = show_traces and self.render
+        self.save_traces = save_traces
+
+        # Extract tracing parameters
+        self.user_id = kwargs.pop("user_id", "anonymous")
+        self.tags = kwargs.pop("tags", [])
+
+        self.agent_id = kwargs.get("agentId", "")
+        self.agent_alias_id = kwargs.get("agentAliasId", "")
+        self.agent_name = kwargs.pop("agent_name", "")
+        self.kwargs = kwargs
+
+        if not self.agent_id or not self.agent_alias_id:
+            # TODO: Warning
+            pass
+
+        stream_final_response = kwargs.get(
+            "streamingConfigurations", {"streamFinalResponse": False}
+        )
+
+        self.stream_final_response = stream_final_response["streamFinalResponse"]
+        self.span_manager = LightSpanManager() if low_overhead else SpanManager()
+
+        self.guardrail_span: otel_trace.Span = None
+        self.output_stream_guardrail_intervene: bool = False
+        self.is_guardrail: bool = False
+
+        self.time_before_call = datetime.now(timezone.utc)
+        self.time_after_call = None
+
+        self.root_agent_span = None
+        if config.PRODUCE_BEDROCK_OTEL_TRACES:
+            self.root_agent_span = self.span_manager.create_agent_span_return(
+                agent_session_id=sessionId,
+                caller_chain=[
+                    {
+                        "agentAliasArn": f"arn:aws:bedrock:agent:agent-alias/{self.agent_id}/{self.agent_alias_id}"
+                    }
+                ],
+                # start_time=int(time_before_call.timestamp() * 1e9),
+                attributes={
+                    OtelSpanAttributes.OPENINFERENCE_SPAN_KIND: OpenInferenceSpanKindValues.AGENT.value,
+                    OtelSpanAttributes.INPUT_VALUE: inputText,
+                    SpanAttributes.AGENT_ID.value: self.agent_id,
+                    SpanAttributes.AGENT_ALIAS_ID.value: self.agent_alias_id,
+                    OtelSpanAttributes.TAG_TAGS: self.tags,
+                    OtelSpanAttributes.USER_ID: self.user_id,
+                    OtelSpanAttributes.TOOL_PARAMETERS: json_safe(kwargs),
+                    OtelSpanAttributes.SESSION_ID: sessionId,
+                    "langfuse.tags": self.tags,
+                    OtelSpanAttributes.LLM_SYSTEM: "aws.bedrock",
+                },
+                name=f"Agent {self.agent_id}:{self.agent_alias_id}",
+            )
 
-def observe(show_traces: bool = True, save_traces: bool = False):
-    def decorator(func):
-        @functools.wraps(func)
-        def wrapper(
-            inputText: str,
-            sessionId: str,
-            **kwargs,
-        ):
-            global guardrail_span
-            global output_stream_guardrail_intervene
-            global is_guardrail
-            # Extract tracing parameters
-            user_id = kwargs.pop("user_id", "anonymous")
-            tags = kwargs.pop("tags", [])
-
-            agent_id = kwargs.get("agentId", "")
-            agent_alias_id = kwargs.get("agentAliasId", "")
-            agent_name = kwargs.pop("agent_name", "")
-
-            if not agent_id or not agent_alias_id:
-                # TODO: Warning
-                pass
-
-            stream_final_response = kwargs.get(
-                "streamingConfigurations", {"streamFinalResponse": False}
+        self.agent_answer = str()
+        self.cite = None
+        self.citations = list()
+        self.total_input_tokens = 0
+        self.total_output_tokens = 0
+        self.total_llm_calls = 0
+
+    def process_event(self, event: Dict):
+        sessionId = self.sessionId
+        root_agent_span = self.root_agent_span
+        span_manager = self.span_manager
+
+        if "files" in event:
+            files_event = event["files"]
+
+            files_list = files_event["files"]
+            for idx, this_file in enumerate(files_list):
+                file_bytes = this_file["bytes"]
+
+                # save bytes to file, given the name of file and the bytes
+
+                directory_path = os.path.join(os.getcwd(), "output")
+                if not os.path.exists(directory_path):
+                    try:
+                        os.makedirs(directory_path, exist_ok=True)
+                    except OSError as e:
+                        print(f"Error creating directory output: {e}")
+                        raise
+
+                if not os.path.exists(os.path.join(directory_path, str(sessionId))):
+                    try:
+                        os.makedirs(
+                            os.path.join(directory_path, str(sessionId)),
+                            exist_ok=True,
+                        )
+                    except OSError as e:
+                        print(f"Error creating directory output: {e}")
+                        raise
+
+                file_name = os.path.join(
+                    directory_path, str(sessionId), this_file["name"]
+                )
+                with open(file_name, "wb") as f:
+                    f.write(file_bytes)
+
+                if config.PRODUCE_BEDROCK_OTEL_TRACES:
+                    with open(file_name, "rb") as f:
+                        root_agent_span.set_attribute(
+                            SpanAttributes.FILES.value + str(idx + 1),
+                            f.read().decode("utf8", errors="ignore"),
+                        )
+
+            if self.show_traces:
+                console = Console()
+                print("\n\n")
+                console.print(Markdown("**Files saved in output directory**"))
+
+        if "returnControl" in event:
+            if config.PRODUCE_BEDROCK_OTEL_TRACES:
+
+                roc_span = tracer.start_span(
+                    name="Return of Control",
+                    kind=SpanKind.CLIENT,
+                    attributes={
+                        SpanAttributes.RETURN_CONTROL.value: json_safe(
+                            event["returnControl"]
+                        )
+                    },
+                    context=otel_trace.set_span_in_context(root_agent_span),
+                )
+                roc_span.set_status(Status(StatusCode.OK))
+                roc_span.end()
+
+        if "trace" in event:
+
+            trace_data = event["trace"]
+
+            if "trace" in trace_data:
+                if "guardrailTrace" in trace_data["trace"]:
+                    self.process_guardrail_trace(trace_data=trace_data)
+
+            input_tokens, output_tokens, llm_calls = ProcessL2Trace.process_trace_event(
+                trace_data=event["trace"],
+                span_manager=span_manager,
+                save_traces=self.save_traces,
+                session_id=sessionId,
+                show_traces=self.show_traces,
             )
-            
-            stream_final_response= stream_final_response["streamFinalResponse"]
-            span_manager = SpanManager()
+            self.total_input_tokens += int(input_tokens)
+            self.total_output_tokens += int(output_tokens)
+            self.total_llm_calls += int(llm_calls)
+
+        # Get Final Answer
+        if "chunk" in event:
+            if "attribution" in event["chunk"]:
+                self.citations.append(event["chunk"]["attribution"]["citations"])
+                self.agent_answer, self.cite = add_citation(
+                    citations=event["chunk"]["attribution"]["citations"],
+                    cite=1 if not self.cite else self.cite,
+                    show=self.render,
+                )
+            else:
+                data = event["chunk"]["bytes"]
+                if self.stream_final_response is True:
+                    if self.output_stream_guardrail_intervene is True:
+                        self.agent_answer = str()
+                        self.agent_answer += data.decode("utf8")
+                        if not self.render:
+                            return
+                        print(
+                            colored(
+                                "\n\n\n" + data.decode("utf-8"),
+                                TraceColor.error,
+                            ),
+                            end="",
+                        )
+                    else:
+                        self.agent_answer += data.decode("utf8")
+                        if not self.render:
+                            return
+                        print(
+                            colored(
+                                data.decode("utf-8"),
+                                TraceColor.final_output,
+                            ),
+                            end="",
+                        )
+                else:
+                    self.agent_answer += data.decode("utf8")
+                    if not self.render:
+                        return
+                    print(
+                        colored(self.agent_answer, TraceColor.final_output),
+                        end="",
+                    )
+
+    def process_guardrail_trace(self, trace_data: Dict):
+        agent_id = self.agent_id
+        agent_alias_id = self.agent_alias_id
+        span_manager = self.span_manager
+
+        session_id = trace_data["sessionId"]
+        caller_chain = trace_data["callerChain"]
+        guardrail_trace = trace_data["trace"]["guardrailTrace"]
+        sub_agent_id, sub_agent_alias_id = get_agent_from_caller_chain(
+            caller_chain=caller_chain, index=-1
+        )
 
-            time_before_call = datetime.now(timezone.utc)
-            time_after_call = None
+        if sub_agent_id == agent_id and sub_agent_alias_id == agent_alias_id:
+            self.is_guardrail = True
 
+        if "inputAssessments" in guardrail_trace:
             if config.PRODUCE_BEDROCK_OTEL_TRACES:
-                root_agent_span = span_manager.create_agent_span_return(
-                    agent_session_id=sessionId,
-                    caller_chain=[
-                        {
-                            "agentAliasArn": f"arn:aws:bedrock:agent:agent-alias/{agent_id}/{agent_alias_id}"
-                        }
-                    ],
-                    # start_time=int(time_before_call.timestamp() * 1e9),
+                agent_span = span_manager.create_agent_span_return(
+                    agent_session_id=session_id,
+                    caller_chain=caller_chain,
+                    # start_time=int(event_time.timestamp() * 1e9),
                     attributes={
                         OtelSpanAttributes.OPENINFERENCE_SPAN_KIND: OpenInferenceSpanKindValues.AGENT.value,
-                        OtelSpanAttributes.INPUT_VALUE: inputText,
-                        SpanAttributes.AGENT_ID.value: agent_id,
-                        SpanAttributes.AGENT_ALIAS_ID.value: agent_alias_id,
-                        OtelSpanAttributes.TAG_TAGS: tags,
-                        OtelSpanAttributes.USER_ID: user_id,
-                        OtelSpanAttributes.TOOL_PARAMETERS: json_safe(kwargs),
-                        OtelSpanAttributes.SESSION_ID: sessionId,
-                        "langfuse.tags": tags,
+                        SpanAttributes.AGENT_ID.value: sub_agent_id,
+                        SpanAttributes.AGENT_ALIAS_ID.value: sub_agent_alias_id,
                         OtelSpanAttributes.LLM_SYSTEM: "aws.bedrock",
+                        OtelSpanAttributes.SESSION_ID: session_id,
                     },
                     name=f"Agent {agent_id}:{agent_alias_id}",
                 )
 
-            agent_answer = str()
-            cite = None
-            citations = list()
-            total_input_tokens = 0
-            total_output_tokens = 0
-            total_llm_calls = 0
-            try:
-                response = func(
-                    inputText=inputText,
-                    sessionId=sessionId,
-                    **kwargs,
-                )
+            if guardrail_trace["action"] == "INTERVENED":
+                self.agent_answer = str()
 
-                event_stream = response["completion"]
-
-                for event in event_stream:
-                    if "files" in event:
-                        files_event = event["files"]
-
-                        files_list = files_event["files"]
-                        for idx, this_file in enumerate(files_list):
-                            file_bytes = this_file["bytes"]
-
-                            # save bytes to file, given the name of file and the bytes
-
-                            directory_path = os.path.join(os.getcwd(), "output")
-                            if not os.path.exists(directory_path):
-                                try:
-                                    os.makedirs(directory_path, exist_ok=True)
-                                except OSError as e:
-                                    print(f"Error creating directory output: {e}")
-                                    raise
-
-                            if not os.path.exists(
-                                os.path.join(directory_path, str(sessionId))
-                            ):
-                                try:
-                                    os.makedirs(
-                                        os.path.join(directory_path, str(sessionId)),
-                                        exist_ok=True,
-                                    )
-                                except OSError as e:
-                                    print(f"Error creating directory output: {e}")
-                                    raise
-
-                            file_name = os.path.join(
-                                directory_path, str(sessionId), this_file["name"]
-                            )
-                            with open(file_name, "wb") as f:
-                                f.write(file_bytes)
-
-                            if config.PRODUCE_BEDROCK_OTEL_TRACES:
-                                with open(file_name, "rb") as f:
-                                    root_agent_span.set_attribute(
-                                        SpanAttributes.FILES.value + str(idx + 1),
-                                        f.read().decode("utf8", errors="ignore"),
-                                    )
-
-                        if show_traces:
-                            console = Console()
-                            print("\n\n")
-                            console.print(
-                                Markdown("**Files saved in output directory**")
-                            )
-
-                    if "returnControl" in event:
-                        if config.PRODUCE_BEDROCK_OTEL_TRACES:
-
-                            roc_span = tracer.start_span(
-                                name="Return of Control",
-                                kind=SpanKind.CLIENT,
-                                attributes={
-                                    SpanAttributes.RETURN_CONTROL.value: json_safe(
-                                        event["returnControl"]
-                                    )
-                                },
-                                context=otel_trace.set_span_in_context(root_agent_span),
-                            )
-                            roc_span.set_status(Status(StatusCode.OK))
-                            roc_span.end()
-
-                    if "trace" in event:
-
-                        trace_data = event["trace"]
-
-                        if "trace" in trace_data:
-                            if "guardrailTrace" in trace_data["trace"]:
-                                session_id = trace_data["sessionId"]
-                                caller_chain = trace_data["callerChain"]
-                                guardrail_trace = trace_data["trace"]["guardrailTrace"]
-                                sub_agent_id, sub_agent_alias_id = (
-                                    get_agent_from_caller_chain(
-                                        caller_chain=caller_chain, index=-1
-                                    )
-                                )
-
-                                if (
-                                    sub_agent_id == agent_id
-                                    and sub_agent_alias_id == agent_alias_id
-                                ):
-                                    is_guardrail = True
-
-                                if "inputAssessments" in guardrail_trace:
-
-                                    if config.PRODUCE_BEDROCK_OTEL_TRACES:
-                                        agent_span = span_manager.create_agent_span_return(
-                                            agent_session_id=session_id,
-                                            caller_chain=caller_chain,
-                                            # start_time=int(event_time.timestamp() * 1e9),
-                                            attributes={
-                                                OtelSpanAttributes.OPENINFERENCE_SPAN_KIND: OpenInferenceSpanKindValues.AGENT.value,
-                                                SpanAttributes.AGENT_ID.value: sub_agent_id,
-                                                SpanAttributes.AGENT_ALIAS_ID.value: sub_agent_alias_id,
-                                                OtelSpanAttributes.LLM_SYSTEM: "aws.bedrock",
-                                                OtelSpanAttributes.SESSION_ID: session_id,
-                                            },
-                                            name=f"Agent {agent_id}:{agent_alias_id}",
-                                        )
-
-                                    if guardrail_trace["action"] == "INTERVENED":
-                                        agent_answer = str()
-
-                                    if config.PRODUCE_BEDROCK_OTEL_TRACES:
-                                        guardrail_span = tracer.start_span(
-                                            name=SpanName.GUARDRAIL.value,
-                                            kind=SpanKind.CLIENT,
-                                            attributes={
-                                                OtelSpanAttributes.OPENINFERENCE_SPAN_KIND: OpenInferenceSpanKindValues.GUARDRAIL.value,
-                                                SpanAttributes.GUARDRAIL_ACTION.value: guardrail_trace[
-                                                    "action"
-                                                ],
-                                            },
-                                            context=otel_trace.set_span_in_context(
-                                                agent_span
-                                            ),
-                                        )
-                                        guardrail_span.set_attributes(
-                                            {
-                                                OtelSpanAttributes.INPUT_VALUE: json_safe(
-                                                    guardrail_trace["inputAssessments"]
-                                                ),
-                                                OtelSpanAttributes.INPUT_MIME_TYPE: "application/json",
-                                            }
-                                        )
-
-                                        guardrail_span.set_status(Status(StatusCode.OK))
-                                        guardrail_span.end()
-                                        guardrail_span = None
-
-                                if "outputAssessments" in guardrail_trace:
-                                    if config.PRODUCE_BEDROCK_OTEL_TRACES:
-                                        if stream_final_response is False:
-                                            if (
-                                                guardrail_trace["action"]
-                                                == "INTERVENED"
-                                            ):
-                                                agent_answer = str()
-
-                                            guardrail_span = tracer.start_span(
-                                                name=SpanName.GUARDRAIL.value,
-                                                kind=SpanKind.CLIENT,
-                                                attributes={
-                                                    OtelSpanAttributes.OPENINFERENCE_SPAN_KIND: OpenInferenceSpanKindValues.GUARDRAIL.value,
-                                                    SpanAttributes.GUARDRAIL_ACTION.value: guardrail_trace[
-                                                        "action"
-                                                    ],
-                                                },
-                                                context=otel_trace.set_span_in_context(
-                                                    span_manager.spans[
-                                                        session_id
-                                                    ].agent_span.span
-                                                ),
-                                            )
-                                            guardrail_span.set_attributes(
-                                                {
-                                                    OtelSpanAttributes.OUTPUT_VALUE: json_safe(
-                                                        guardrail_trace[
-                                                            "outputAssessments"
-                                                        ]
-                                                    ),
-                                                    OtelSpanAttributes.OUTPUT_MIME_TYPE: "application/json",
-                                                }
-                                            )
-                                            guardrail_span.set_status(
-                                                Status(StatusCode.OK)
-                                            )
-                                            guardrail_span.end()
-                                        else:
-                                            if (
-                                                not guardrail_span
-                                                and guardrail_trace["action"]
-                                                == "INTERVENED"
-                                            ):
-
-                                                if (
-                                                    sub_agent_id == agent_id
-                                                    and sub_agent_alias_id
-                                                    == agent_alias_id
-                                                ):
-                                                    output_stream_guardrail_intervene = (
-                                                        True
-                                                    )
-
-                                                guardrail_span = tracer.start_span(
-                                                    name=SpanName.GUARDRAIL.value,
-                                                    kind=SpanKind.CLIENT,
-                                                    attributes={
-                                                        OtelSpanAttributes.OPENINFERENCE_SPAN_KIND: OpenInferenceSpanKindValues.GUARDRAIL.value,
-                                                        SpanAttributes.GUARDRAIL_ACTION.value: guardrail_trace[
-                                                            "action"
-                                                        ],
-                                                    },
-                                                    context=otel_trace.set_span_in_context(
-                                                        span_manager.spans[
-                                                            session_id
-                                                        ].agent_span.span
-                                                    ),
-                                                )
-                                                guardrail_span.set_attributes(
-                                                    {
-                                                        OtelSpanAttributes.OUTPUT_VALUE: json_safe(
-                                                            guardrail_trace[
-                                                                "outputAssessments"
-                                                            ]
-                                                        ),
-                                                        OtelSpanAttributes.OUTPUT_MIME_TYPE: "application/json",
-                                                    }
-                                                )
-                                                guardrail_span.set_status(
-                                                    Status(StatusCode.OK)
-                                                )
-                                                guardrail_span.end()
-
-                        input_tokens, output_tokens, llm_calls = (
-                            ProcessL2Trace.process_trace_event(
-                                trace_data=event["trace"],
-                                span_manager=span_manager,
-                                save_traces=save_traces,
-                                session_id=sessionId,
-                                show_traces=show_traces,
-                            )
-                        )
-                        total_input_tokens += int(input_tokens)
-                        total_output_tokens += int(output_tokens)
-                        total_llm_calls += int(llm_calls)
-
-                    # Get Final Answer
-                    if "chunk" in event:
-                        if "attribution" in event["chunk"]:
-                            citations.append(event["chunk"]["attribution"]["citations"])
-                            agent_answer, cite = add_citation(
-                                citations=event["chunk"]["attribution"]["citations"],
-                                cite=1 if not cite else cite,
-                            )
-                        else:
-                            data = event["chunk"]["bytes"]
-                            if stream_final_response is True:
-                                if output_stream_guardrail_intervene is True:
-                                    agent_answer = str()
-                                    agent_answer += data.decode("utf8")
-                                    print(
-                                        colored(
-                                            "\n\n\n" + data.decode("utf-8"),
-                                            TraceColor.error,
-                                        ),
-                                        end="",
-                                    )
-                                else:
-                                    agent_answer += data.decode("utf8")
-                                    print(
-                                        colored(
-                                            data.decode("utf-8"),
-                                            TraceColor.final_output,
-                                        ),
-                                        end="",
-                                    )
-                            else:
-                                agent_answer += data.decode("utf8")
-                                print(
-                                    colored(agent_answer, TraceColor.final_output),
-                                    end="",
-                                )
-
-                time_after_call = datetime.now(timezone.utc)
+            if config.PRODUCE_BEDROCK_OTEL_TRACES:
+                self.guardrail_span = tracer.start_span(
+                    name=SpanName.GUARDRAIL.value,
+                    kind=SpanKind.CLIENT,
+                    attributes={
+                        OtelSpanAttributes.OPENINFERENCE_SPAN_KIND: OpenInferenceSpanKindValues.GUARDRAIL.value,
+                        SpanAttributes.GUARDRAIL_ACTION.value: guardrail_trace[
+                            "action"
+                        ],
+                    },
+                    context=otel_trace.set_span_in_context(agent_span),
+                )
+                self.guardrail_span.set_attributes(
+                    {
+                        OtelSpanAttributes.INPUT_VALUE: json_safe(
+                            guardrail_trace["inputAssessments"]
+                        ),
+                        OtelSpanAttributes.INPUT_MIME_TYPE: "application/json",
+                    }
+                )
 
-                if config.PRODUCE_BEDROCK_OTEL_TRACES:
-                    if sessionId not in span_manager.spans:
-                        raise RuntimeError("Root Agent span not found")
-                    if citations and output_stream_guardrail_intervene is False:
-                        root_agent_span.set_attribute(
-                            OtelSpanAttributes.RETRIEVAL_DOCUMENTS, json_safe(citations)
-                        )
+                self.guardrail_span.set_status(Status(StatusCode.OK))
+                self.guardrail_span.end()
+                self.guardrail_span = None
 
-                    if is_guardrail and not guardrail_span:
-                        guardrail_span = tracer.start_span(
+        if "outputAssessments" in guardrail_trace:
+            if config.PRODUCE_BEDROCK_OTEL_TRACES:
+                if self.stream_final_response is False:
+                    if guardrail_trace["action"] == "INTERVENED":
+                        self.agent_answer = str()
+
+                    self.guardrail_span = tracer.start_span(
+                        name=SpanName.GUARDRAIL.value,
+                        kind=SpanKind.CLIENT,
+                        attributes={
+                            OtelSpanAttributes.OPENINFERENCE_SPAN_KIND: OpenInferenceSpanKindValues.GUARDRAIL.value,
+                            SpanAttributes.GUARDRAIL_ACTION.value: guardrail_trace[
+                                "action"
+                            ],
+                        },
+                        context=otel_trace.set_span_in_context(
+                            span_manager.spans[session_id].agent_span.span
+                        ),
+                    )
+                    self.guardrail_span.set_attributes(
+                        {
+                            OtelSpanAttributes.OUTPUT_VALUE: json_safe(
+                                guardrail_trace["outputAssessments"]
+                            ),
+                            OtelSpanAttributes.OUTPUT_MIME_TYPE: "application/json",
+                        }
+                    )
+                    self.guardrail_span.set_status(Status(StatusCode.OK))
+                    self.guardrail_span.end()
+                else:
+                    if (
+                        not self.guardrail_span
+                        and guardrail_trace["action"] == "INTERVENED"
+                    ):
+
+                        if (
+                            sub_agent_id == agent_id
+                            and sub_agent_alias_id == agent_alias_id
+                        ):
+                            self.output_stream_guardrail_intervene = True
+
+                        self.guardrail_span = tracer.start_span(
                             name=SpanName.GUARDRAIL.value,
                             kind=SpanKind.CLIENT,
                             attributes={
                                 OtelSpanAttributes.OPENINFERENCE_SPAN_KIND: OpenInferenceSpanKindValues.GUARDRAIL.value,
-                                SpanAttributes.GUARDRAIL_ACTION.value: "NONE",
+                                SpanAttributes.GUARDRAIL_ACTION.value: guardrail_trace[
+                                    "action"
+                                ],
                             },
-                            context=otel_trace.set_span_in_context(root_agent_span),
+                            context=otel_trace.set_span_in_context(
+                                span_manager.spans[session_id].agent_span.span
+                            ),
                         )
-
-                        guardrail_span.set_attributes(
+                        self.guardrail_span.set_attributes(
                             {
-                                OtelSpanAttributes.OUTPUT_VALUE: json_safe([{}]),
+                                OtelSpanAttributes.OUTPUT_VALUE: json_safe(
+                                    guardrail_trace["outputAssessments"]
+                                ),
                                 OtelSpanAttributes.OUTPUT_MIME_TYPE: "application/json",
                             }
                         )
+                        self.guardrail_span.set_status(Status(StatusCode.OK))
+                        self.guardrail_span.end()
+
+    def finish(self):
+        """End the invocation spans once the event stream is exhausted."""
+        sessionId = self.sessionId
+        root_agent_span = self.root_agent_span
+        span_manager = self.span_manager
+
+        self.time_after_call = datetime.now(timezone.utc)
+
+        if config.PRODUCE_BEDROCK_OTEL_TRACES:
+            if sessionId not in span_manager.spans:
+                raise RuntimeError("Root Agent span not found")
+            if self.citations and self.output_stream_guardrail_intervene is False:
+                root_agent_span.set_attribute(
+                    OtelSpanAttributes.RETRIEVAL_DOCUMENTS, json_safe(self.citations)
+                )
 
-                        guardrail_span.set_status(Status(StatusCode.OK))
-                        guardrail_span.end()
-                        guardrail_span = None
-                    else:
-                        guardrail_span = None
+            if self.is_guardrail and not self.guardrail_span:
+                self.guardrail_span = tracer.start_span(
+                    name=SpanName.GUARDRAIL.value,
+                    kind=SpanKind.CLIENT,
+                    attributes={
+                        OtelSpanAttributes.OPENINFERENCE_SPAN_KIND: OpenInferenceSpanKindValues.GUARDRAIL.value,
+                        SpanAttributes.GUARDRAIL_ACTION.value: "NONE",
+                    },
+                    context=otel_trace.set_span_in_context(root_agent_span),
+                )
 
-                    root_agent_span.set_attribute(
-                        OtelSpanAttributes.OUTPUT_VALUE, agent_answer
-                    )
-                    root_agent_span.set_attribute(
-                        OtelSpanAttributes.OUTPUT_MIME_TYPE, "text/plain"
-                    )
-                    # End root span
+                self.guardrail_span.set_attributes(
+                    {
+                        OtelSpanAttributes.OUTPUT_VALUE: json_safe([{}]),
+                        OtelSpanAttributes.OUTPUT_MIME_TYPE: "application/json",
+                    }
+                )
 
-                    if output_stream_guardrail_intervene is True:
-                        span_manager.end_all_spans(status_code=StatusCode.OK)
-                    else:
-                        span_manager.spans[sessionId].agent_span.end_time = int(
-                            time_after_call.timestamp() * 1e9
-                        )
+                self.guardrail_span.set_status(Status(StatusCode.OK))
+                self.guardrail_span.end()
+                self.guardrail_span = None
+            else:
+                self.guardrail_span = None
 
-                    if len(span_manager.spans) > 0:
-                        span_manager.end_all_spans(status_code=StatusCode.OK)
+            root_agent_span.set_attribute(
+                OtelSpanAttributes.OUTPUT_VALUE, self.agent_answer
+            )
+            root_agent_span.set_attribute(
+                OtelSpanAttributes.OUTPUT_MIME_TYPE, "text/plain"
+            )
+            # End root span
 
-            except Exception as e:
-                # Handle exceptions
+            if self.output_stream_guardrail_intervene is True:
+                span_manager.end_all_spans(status_code=StatusCode.OK)
+            else:
+                span_manager.spans[sessionId].agent_span.end_time = int(
+                    self.time_after_call.timestamp() * 1e9
+                )
 
-                if config.PRODUCE_BEDROCK_OTEL_TRACES:
-                    root_agent_span.record_exception(e)
-                    root_agent_span.set_attribute("error.message", str(e))
-                    root_agent_span.set_attribute("error.type", e.__class__.__name__)
-                    root_agent_span.set_status(Status(StatusCode.ERROR))
+            if len(span_manager.spans) > 0:
+                span_manager.end_all_spans(status_code=StatusCode.OK)
 
-                    agent_answer = str()
-                    agent_answer = json_safe({"error": str(e), "exception": str(e)})
+    def fail(self, e: Exception):
+        """Record an exception raised while invoking the agent or reading its stream."""
+        root_agent_span = self.root_agent_span
 
-                    root_agent_span.set_attribute(
-                        OtelSpanAttributes.OUTPUT_VALUE, json_safe(agent_answer)
-                    )
-                    root_agent_span.set_attribute(
-                        OtelSpanAttributes.OUTPUT_MIME_TYPE, "application/json"
-                    )
+        if config.PRODUCE_BEDROCK_OTEL_TRACES:
+            root_agent_span.record_exception(e)
+            root_agent_span.set_attribute("error.message", str(e))
+            root_agent_span.set_attribute("error.type", e.__class__.__name__)
+            root_agent_span.set_status(Status(StatusCode.ERROR))
+
+            self.agent_answer = str()
+            self.agent_answer = json_safe({"error": str(e), "exception": str(e)})
+
+            root_agent_span.set_attribute(
+                OtelSpanAttributes.OUTPUT_VALUE, json_safe(self.agent_answer)
+            )
+            root_agent_span.set_attribute(
+                OtelSpanAttributes.OUTPUT_MIME_TYPE, "application/json"
+            )
 
-                    span_manager.end_all_spans(status_code=StatusCode.ERROR)
+            self.span_manager.end_all_spans(status_code=StatusCode.ERROR)
 
-                    raise Exception(e)
+            raise Exception(e)
+
+        else:
+            print(f"An error occurred: {str(e)}")
+            self.agent_answer = str(e)
+
+        self.time_after_call = datetime.now(timezone.utc)
+
+    def report(self) -> str:
+        """Flush saved traces, print usage and return the final answer."""
+        if self.save_traces:
+            flush_trace_writer()
+
+        if not self.render:
+            return self.agent_answer
+
+        duration = (self.time_after_call - self.time_before_call).total_seconds()
+
+        print(
+            colored(
+                f"\nAgent made a total of {self.total_llm_calls} LLM calls, "
+                + f"using {self.total_input_tokens+self.total_output_tokens} tokens "
+                + f"(in: {self.total_input_tokens}, out: {self.total_output_tokens})"
+                + f", and took {duration} total seconds",
+                TraceColor.stats,
+            )
+        )
+
+        return self.agent_answer
 
-                else:
-                    print(f"An error occurred: {str(e)}")
-                    agent_answer = str(e)
 
-                time_after_call = datetime.now(timezone.utc)
+def observe(
+    show_traces: bool = True,
+    save_traces: bool = False,
+    low_overhead: Optional[bool] = None,
+):
+    """Instrument a function that invokes a Bedrock agent and returns its response.
 
-            duration = (time_after_call - time_before_call).total_seconds()
+    Works for both ``def`` and ``async def`` functions. For async functions
+    the ``completion`` stream is consumed without blocking the event loop,
+    whether it is a botocore ``EventStream`` or an async iterable.
 
-            print(
-                colored(
-                    f"\nAgent made a total of {total_llm_calls} LLM calls, "
-                    + f"using {total_input_tokens+total_output_tokens} tokens "
-                    + f"(in: {total_input_tokens}, out: {total_output_tokens})"
-                    + f", and took {duration} total seconds",
-                    TraceColor.stats,
+    ``low_overhead`` skips console rendering and pydantic span validation; it
+    defaults to the ``TRACE_LOW_OVERHEAD`` setting.
+    """
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(
+                inputText: str,
+                sessionId: str,
+                **kwargs,
+            ):
+                # Imported here to avoid a circular import with InlineAgent.agent
+                from InlineAgent.agent.event_stream import AsyncEventStream
+
+                observer = InvocationObserver(
+                    inputText=inputText,
+                    sessionId=sessionId,
+                    kwargs=kwargs,
+                    show_traces=show_traces,
+                    save_traces=save_traces,
+                    low_overhead=(
+                        config.TRACE_LOW_OVERHEAD
+                        if low_overhead is None
+                        else low_overhead
+                    ),
                 )
+                try:
+                    response = await func(
+                        inputText=inputText,
+                        sessionId=sessionId,
+                        **observer.kwargs,
+                    )
+
+                    event_stream = response["completion"]
+                    if not hasattr(event_stream, "__aiter__"):
+                        event_stream = AsyncEventStream(event_stream)
+
+                    async for event in event_stream:
+                        observer.process_event(event)
+
+                    observer.finish()
+
+                except Exception as e:
+                    observer.fail(e)
+
+                return observer.report()
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(
+            inputText: str,
+            sessionId: str,
+            **kwargs,
+        ):
+            observer = InvocationObserver(
+                inputText=inputText,
+                sessionId=sessionId,
+                kwargs=kwargs,
+                show_traces=show_traces,
+                save_traces=save_traces,
+                low_overhead=(
+                    config.TRACE_LOW_OVERHEAD if low_overhead is None else low_overhead
+                ),
             )
+            try:
+                response = func(
+                    inputText=inputText,
+                    sessionId=sessionId,
+                    **observer.kwargs,
+                )
+
+                event_stream = response["completion"]
+
+                for event in event_stream:
+                    observer.process_event(event)
+
+                observer.finish()
+
+            except Exception as e:
+                observer.fail(e)
 
-            return agent_answer
+            return observer.report()
 
         return wrapper
 
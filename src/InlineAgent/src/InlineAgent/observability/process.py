@@ -13,13 +13,13 @@ from openinference.semconv.trace import (
 from InlineAgent.constants import TraceColor
 
 from .utils import (
-    get_agent_from_caller_chain,
     get_agent_id_aliasid,
     json_safe,
 )
 from .semantics import SpanAttributes, SpanName
 from .settings_management import ObservabilityConfig
 from .span_manager import SpanManager
+from .trace_store import get_trace_writer
 from .constants import (
     L2Traces,
     L3OrchestrationTraces,
@@ -45,31 +45,13 @@ class ProcessL2Trace:
     @staticmethod
     def save_trace(trace_data: Dict, session_id: int):
         try:
-            directory_path = os.path.join(os.getcwd(), "trace")
-            if not os.path.exists(directory_path):
-                try:
-                    os.makedirs(directory_path, exist_ok=True)
-                except OSError as e:
-                    print(f"Error creating directory output: {e}")
-                    raise
-
-            try:
-                with open(
-                    os.path.join(directory_path, str(session_id) + ".json"), "r"
-                ) as file:
-                    data = json.load(file)
-            except (FileNotFoundError, json.JSONDecodeError):
-                # If file doesn't exist or is empty, start with empty list
-                data = []
-
-            # Append the new data
-            data.append(trace_data)
-
-            # Write back to file with proper formatting
-            with open(
-                os.path.join(directory_path, str(session_id) + ".json"), "w"
-            ) as file:
-                json.dump(data, file, indent=2, default=str)
+            get_trace_writer(
+                directory=os.path.join(os.getcwd(), config.TRACE_DIRECTORY),
+                compression=config.TRACE_COMPRESSION,
+                fsync=config.TRACE_FSYNC,
+                flush_interval=config.TRACE_FLUSH_INTERVAL,
+                max_buffered_events=config.TRACE_MAX_BUFFERED_EVENTS,
+            ).write(session_id=session_id, trace_data=trace_data)
 
         except Exception as e:
             print(f"An error occurred: {str(e)}")
@@ -400,7 +382,7 @@ class ProcessL4Trace:
                     ]
 
                     model_id = model_invocation_input.get("foundationModel", "")
-                    agent_id, agent_alias_id = get_agent_from_caller_chain(
+                    agent_id, agent_alias_id = span_manager.agent_from_caller_chain(
                         caller_chain=caller_chain, index=-1
                     )
 
@@ -408,7 +390,7 @@ class ProcessL4Trace:
 
                     if len(caller_chain) > 2:
                         collaborator_agent_id, collaborator_agent_alias_id = (
-                            get_agent_from_caller_chain(
+                            span_manager.agent_from_caller_chain(
                                 caller_chain=caller_chain, index=-2
                             )
                         )
@@ -539,17 +521,13 @@ class ProcessL4Trace:
                         llm_calls += 1
 
                     raw_response = model_invocation_output["rawResponse"]["content"]
-                    agent_id, agent_alias_id = get_agent_from_caller_chain(
+                    agent_id, agent_alias_id = span_manager.agent_from_caller_chain(
                         caller_chain=caller_chain, index=-1
                     )
 
                     try:
                         json_model = json.loads(raw_response)
-                        model = (
-                            json.loads(raw_response)["model"]
-                            if "model" in json.loads(raw_response)
-                            else None
-                        )
+                        model = json_model["model"] if "model" in json_model else None
                     except Exception as e:
                         model = None
 
@@ -797,7 +775,7 @@ class ProcessL4Trace:
                     rationale = orchestration_trace["rationale"]
 
                     text = rationale["text"]
-                    agent_id, agent_alias_id = get_agent_from_caller_chain(
+                    agent_id, agent_alias_id = span_manager.agent_from_caller_chain(
                         caller_chain=caller_chain, index=-1
                     )
 
@@ -840,7 +818,7 @@ class ProcessL5InvocationInputTrace:
                             "actionGroupInvocationInput"
                         ]
 
-                        agent_id, agent_alias_id = get_agent_from_caller_chain(
+                        agent_id, agent_alias_id = span_manager.agent_from_caller_chain(
                             caller_chain=caller_chain, index=-1
                         )
 
@@ -913,7 +891,7 @@ class ProcessL5InvocationInputTrace:
                         ]
 
                         current_agent_id, current_agent_alias_id = (
-                            get_agent_from_caller_chain(
+                            span_manager.agent_from_caller_chain(
                                 caller_chain=caller_chain, index=-1
                             )
                         )
@@ -1010,7 +988,7 @@ class ProcessL5InvocationInputTrace:
                             "codeInterpreterInvocationInput"
                         ]
 
-                        agent_id, agent_alias_id = get_agent_from_caller_chain(
+                        agent_id, agent_alias_id = span_manager.agent_from_caller_chain(
                             caller_chain=caller_chain, index=-1
                         )
 
@@ -1081,7 +1059,7 @@ class ProcessL5InvocationInputTrace:
 
                         # TODO: UniqueID for tool
 
-                        agent_id, agent_alias_id = get_agent_from_caller_chain(
+                        agent_id, agent_alias_id = span_manager.agent_from_caller_chain(
                             caller_chain=caller_chain, index=-1
                         )
 
@@ -1138,7 +1116,7 @@ class ProcessL5Obervation:
                             "actionGroupInvocationOutput"
                         ]
 
-                        agent_id, agent_alias_id = get_agent_from_caller_chain(
+                        agent_id, agent_alias_id = span_manager.agent_from_caller_chain(
                             caller_chain=caller_chain, index=-1
                         )
 
@@ -1191,7 +1169,7 @@ class ProcessL5Obervation:
                         ]
 
                         current_agent_id, current_agent_alias_id = (
-                            get_agent_from_caller_chain(
+                            span_manager.agent_from_caller_chain(
                                 caller_chain=caller_chain, index=-1
                             )
                         )
@@ -1271,7 +1249,7 @@ class ProcessL5Obervation:
                             "codeInterpreterInvocationOutput"
                         ]
 
-                        agent_id, agent_alias_id = get_agent_from_caller_chain(
+                        agent_id, agent_alias_id = span_manager.agent_from_caller_chain(
                             caller_chain=caller_chain, index=-1
                         )
 
@@ -1378,7 +1356,7 @@ class ProcessL5Obervation:
                             "knowledgeBaseLookupOutput"
                         ]
 
-                        agent_id, agent_alias_id = get_agent_from_caller_chain(
+                        agent_id, agent_alias_id = span_manager.agent_from_caller_chain(
                             caller_chain=caller_chain, index=-1
                         )
 
@@ -1434,7 +1412,7 @@ class ProcessL5Obervation:
                     if "finalResponse" in observation:
                         final_response = observation["finalResponse"]
 
-                        agent_id, agent_alias_id = get_agent_from_caller_chain(
+                        agent_id, agent_alias_id = span_manager.agent_from_caller_chain(
                             caller_chain, -1
                         )
 
@@ -1,6 +1,6 @@
 from pydantic import HttpUrl, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Literal, Optional
 
 
 class ObservabilityConfig(BaseSettings):
@@ -18,3 +18,9 @@ class ObservabilityConfig(BaseSettings):
     LANGFUSE_SECRET_KEY: Optional[str] = None
     BEDROCK_AGENT_TRACER_NAME: str = Field(default="bedrock-agent-tracer")
     PRODUCE_BEDROCK_OTEL_TRACES: bool = Field(default=False)
+    TRACE_DIRECTORY: str = Field(default="trace")
+    TRACE_COMPRESSION: Literal["none", "gzip", "zstd"] = Field(default="none")
+    TRACE_FSYNC: Literal["never", "flush", "always"] = Field(default="never")
+    TRACE_FLUSH_INTERVAL: float = Field(default=1.0)
+    TRACE_MAX_BUFFERED_EVENTS: int = Field(default=1000)
+    TRACE_LOW_OVERHEAD: bool = Field(default=False)
@@ -1,5 +1,6 @@
 # Class to manage spans
 
+from dataclasses import dataclass, field
 from typing import Dict, Any, Literal, Optional
 
 from opentelemetry import trace
@@ -13,7 +14,7 @@ from pydantic import (
     validate_call,
 )
 
-from .utils import get_agent_from_caller_chain
+from .utils import get_agent_from_caller_chain, get_agent_id_aliasid
 
 
 from pydantic import BaseModel
@@ -46,11 +47,15 @@ class SpanModel(BaseModel):
     @staticmethod
     @validate_call(config=ConfigDict(arbitrary_types_allowed=True))
     def process_end(span: Span, end_time: int):
-        if span.is_recording():
-            if end_time:
-                span.end(end_time=end_time)
-            else:
-                span.end()
+        _end_span(span=span, end_time=end_time)
+
+
+def _end_span(span: Span, end_time: int):
+    if span.is_recording():
+        if end_time:
+            span.end(end_time=end_time)
+        else:
+            span.end()
 
 
 class SpanFamily(BaseModel):
@@ -67,17 +72,46 @@ class SpanFamily(BaseModel):
         extra = "forbid"  # Prevents additional fields
 
 
-class SpanManager(BaseModel):
+class LightSpanModel:
+    """``SpanModel`` without pydantic: setting ``end = True`` ends the span."""
 
-    spans: Optional[Dict[str, SpanFamily]] = {}
-    agent_session_id_dict: Optional[Dict[str, str]] = {}
+    __slots__ = ("span", "end_time", "_end")
 
-    class Config:
-        arbitrary_types_allowed = True
-        extra = "forbid"
-        validate_assignment = True
+    def __init__(self, span: Span, end_time: int = 0, end: Optional[bool] = None):
+        self.span = span
+        self.end_time = end_time
+        self._end = None
+        self.end = end
+
+    @property
+    def end(self) -> Optional[bool]:
+        return self._end
+
+    @end.setter
+    def end(self, value: Optional[bool]):
+        if value is True:
+            _end_span(span=self.span, end_time=self.end_time)
+        self._end = value
+
+
+@dataclass(slots=True)
+class LightSpanFamily:
+    family: str
+    counter: str
+    agent_span: LightSpanModel
+    l2_span: Optional[LightSpanModel] = None
+    l3_span: Dict[str, LightSpanModel] = field(default_factory=dict)
+
+
+class _SpanBookkeeping:
+    """Span hierarchy bookkeeping shared by ``SpanManager`` and ``LightSpanManager``.
+
+    Subclasses provide ``spans``, ``agent_session_id_dict`` and the
+    ``_span_model``/``_span_family``/``agent_from_caller_chain`` factories.
+    """
+
+    __slots__ = ()
 
-    @validate_call(config=ConfigDict(arbitrary_types_allowed=True))
     def create_agent_span_return(
         self,
         agent_session_id: str,
@@ -92,14 +126,14 @@ class SpanManager(BaseModel):
         if agent_session_id in self.spans:
             return self.spans[agent_session_id].agent_span.span
 
-        agent_id, agent_alias_id = get_agent_from_caller_chain(
+        agent_id, agent_alias_id = self.agent_from_caller_chain(
             caller_chain=caller_chain, index=-1
         )
         collaborator_session_id = str()
 
         if len(caller_chain) > 1:
             collaborator_agent_id, collaborator_agent_alias_id = (
-                get_agent_from_caller_chain(caller_chain=caller_chain, index=-2)
+                self.agent_from_caller_chain(caller_chain=caller_chain, index=-2)
             )
             collaborator_session_id = self.agent_session_id_dict[
                 f"{collaborator_agent_id}:{collaborator_agent_alias_id}"
@@ -137,18 +171,13 @@ class SpanManager(BaseModel):
             # start_time=start_time,
         )
 
-        span_family = SpanFamily(
-            family="",
-            counter="",
-            agent_span=SpanModel(span=span),
-        )
+        span_family = self._span_family(agent_span=self._span_model(span))
 
         self.spans[agent_session_id] = span_family
         self.agent_session_id_dict[f"{agent_id}:{agent_alias_id}"] = agent_session_id
 
         return span
 
-    @validate_call(config=ConfigDict(arbitrary_types_allowed=True))
     def delete_agent_span(
         self,
         agent_session_id: str,
@@ -169,7 +198,6 @@ class SpanManager(BaseModel):
 
         del self.spans[agent_session_id]
 
-    @validate_call(config=ConfigDict(arbitrary_types_allowed=True))
     def assign_new_l2_return(
         self,
         agent_session_id: str,
@@ -181,7 +209,7 @@ class SpanManager(BaseModel):
         l3_name: str,
     ) -> Span:
 
-        agent_id, agent_alias_id = get_agent_from_caller_chain(
+        agent_id, agent_alias_id = self.agent_from_caller_chain(
             caller_chain=caller_chain, index=-1
         )
         l2_span = None
@@ -236,10 +264,10 @@ class SpanManager(BaseModel):
             context=trace.set_span_in_context(l2_span),
         )
 
-        self.spans[agent_session_id].l2_span = SpanModel(span=l2_span)
+        self.spans[agent_session_id].l2_span = self._span_model(l2_span)
 
         self.spans[agent_session_id].l3_span.update(
-            {f"{agent_id}:{agent_alias_id}": SpanModel(span=l3_span)}
+            {f"{agent_id}:{agent_alias_id}": self._span_model(l3_span)}
         )
 
         self.spans[agent_session_id].family = family
@@ -247,7 +275,6 @@ class SpanManager(BaseModel):
 
         return l2_span
 
-    @validate_call(config=ConfigDict(arbitrary_types_allowed=True))
     def assign_new_l3_return(
         self,
         agent_session_id: str,
@@ -287,14 +314,13 @@ class SpanManager(BaseModel):
         )
 
         self.spans[agent_session_id].l3_span.update(
-            {collab_agent_trace_id: SpanModel(span=l3_span)}
+            {collab_agent_trace_id: self._span_model(l3_span)}
         )
 
         self.agent_session_id_dict[collab_agent_trace_id] = agent_session_id
 
         return l3_span
 
-    @validate_call(config=ConfigDict(arbitrary_types_allowed=True))
     def delete_l3_span(
         self,
         agent_session_id: str,
@@ -352,3 +378,122 @@ class SpanManager(BaseModel):
             current_span.counter = ""
 
         self.spans = {}
+
+
+class SpanManager(_SpanBookkeeping, BaseModel):
+
+    spans: Optional[Dict[str, SpanFamily]] = {}
+    agent_session_id_dict: Optional[Dict[str, str]] = {}
+
+    class Config:
+        arbitrary_types_allowed = True
+        extra = "forbid"
+        validate_assignment = True
+
+    def _span_model(self, span: Span) -> SpanModel:
+        return SpanModel(span=span)
+
+    def _span_family(self, agent_span: SpanModel) -> SpanFamily:
+        return SpanFamily(family="", counter="", agent_span=agent_span)
+
+    def agent_from_caller_chain(self, caller_chain: list, index: int):
+        return get_agent_from_caller_chain(caller_chain=caller_chain, index=index)
+
+    @validate_call(config=ConfigDict(arbitrary_types_allowed=True))
+    def create_agent_span_return(
+        self,
+        agent_session_id: str,
+        caller_chain: list,
+        # start_time: int,
+        attributes: Dict[str, Any],
+        name: str,
+    ) -> Span:
+        return super().create_agent_span_return(
+            agent_session_id=agent_session_id,
+            caller_chain=caller_chain,
+            attributes=attributes,
+            name=name,
+        )
+
+    @validate_call(config=ConfigDict(arbitrary_types_allowed=True))
+    def delete_agent_span(
+        self,
+        agent_session_id: str,
+    ) -> Span:
+        return super().delete_agent_span(agent_session_id=agent_session_id)
+
+    @validate_call(config=ConfigDict(arbitrary_types_allowed=True))
+    def assign_new_l2_return(
+        self,
+        agent_session_id: str,
+        caller_chain: list,
+        trace_id: str,
+        l2_attributes: Dict[str, Any],
+        l3_attributes: Dict[str, Any],
+        l2_name: str,
+        l3_name: str,
+    ) -> Span:
+        return super().assign_new_l2_return(
+            agent_session_id=agent_session_id,
+            caller_chain=caller_chain,
+            trace_id=trace_id,
+            l2_attributes=l2_attributes,
+            l3_attributes=l3_attributes,
+            l2_name=l2_name,
+            l3_name=l3_name,
+        )
+
+    @validate_call(config=ConfigDict(arbitrary_types_allowed=True))
+    def assign_new_l3_return(
+        self,
+        agent_session_id: str,
+        collab_agent_trace_id: str,
+        trace_id: str,
+        attributes: Dict[str, Any],
+        name: str,
+    ) -> Span:
+        return super().assign_new_l3_return(
+            agent_session_id=agent_session_id,
+            collab_agent_trace_id=collab_agent_trace_id,
+            trace_id=trace_id,
+            attributes=attributes,
+            name=name,
+        )
+
+    @validate_call(config=ConfigDict(arbitrary_types_allowed=True))
+    def delete_l3_span(
+        self,
+        agent_session_id: str,
+        collab_agent_trace_id: str,
+        trace_id: str,
+        status=StatusCode.OK,
+    ) -> Span:
+        return super().delete_l3_span(
+            agent_session_id=agent_session_id,
+            collab_agent_trace_id=collab_agent_trace_id,
+            trace_id=trace_id,
+            status=status,
+        )
+
+
+class LightSpanManager(_SpanBookkeeping):
+    """Drop-in ``SpanManager`` for the low-overhead trace mode.
+
+    Spans are tracked in ``__slots__`` objects and arguments are not
+    validated, which keeps pydantic off the per-event hot path.
+    """
+
+    __slots__ = ("spans", "agent_session_id_dict")
+
+    def __init__(self):
+        self.spans: Dict[str, LightSpanFamily] = {}
+        self.agent_session_id_dict: Dict[str, str] = {}
+
+    def _span_model(self, span: Span) -> LightSpanModel:
+        return LightSpanModel(span)
+
+    def _span_family(self, agent_span: LightSpanModel) -> LightSpanFamily:
+        return LightSpanFamily(family="", counter="", agent_span=agent_span)
+
+    def agent_from_caller_chain(self, caller_chain: list, index: int):
+        return get_agent_id_aliasid(caller_chain[index]["agentAliasArn"])
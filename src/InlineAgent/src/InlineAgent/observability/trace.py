@@ -72,6 +72,26 @@ class Trace:
 
         return int(input_tokens), int(output_tokens), int(llm_calls)
 
+    @staticmethod
+    def get_usage(trace: Dict):
+        """Return (input_tokens, output_tokens, llm_calls) of a trace without printing it."""
+        for trace_type in (
+            "orchestrationTrace",
+            "routingClassifierTrace",
+            "preProcessingTrace",
+            "postProcessingTrace",
+        ):
+            if trace_type in trace:
+                if "modelInvocationOutput" not in trace[trace_type]:
+                    return 0, 0, 0
+                usage = trace[trace_type]["modelInvocationOutput"]["metadata"]["usage"]
+                return (
+                    int(usage.get("inputTokens", 0)),
+                    int(usage.get("outputTokens", 0)),
+                    1,
+                )
+        return 0, 0, 0
+
     @staticmethod
     def add_citation(citations: List, cite=1) -> str:
 
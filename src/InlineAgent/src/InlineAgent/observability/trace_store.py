@@ -0,0 +1,256 @@
+import atexit
+import gzip
+import io
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Literal, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+Compression = Literal["none", "gzip", "zstd"]
+FsyncPolicy = Literal["never", "flush", "always"]
+
+logger = logging.getLogger(__name__)
+
+_EXTENSIONS = {"none": ".jsonl", "gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+
+
+def _check_compression(compression: Compression):
+    if compression not in _EXTENSIONS:
+        raise ValueError(
+            f"compression must be one of {list(_EXTENSIONS)}, got {compression}"
+        )
+    if compression == "zstd" and zstandard is None:
+        raise ImportError(
+            "zstd trace compression requires the `zstandard` package: pip install zstandard"
+        )
+
+
+def trace_file_path(
+    session_id: str, directory: str = "trace", compression: Compression = "none"
+) -> str:
+    return os.path.join(directory, str(session_id) + _EXTENSIONS[compression])
+
+
+class TraceWriter:
+    """Append-only JSON Lines writer for agent trace events.
+
+    Events are serialized on the calling thread and appended to
+    ``<directory>/<session_id>.jsonl`` by a background thread in batches, so
+    saving a trace costs O(1) per event instead of rewriting the whole session
+    file. Batches are flushed every ``flush_interval`` seconds or once
+    ``max_buffered_events`` are queued. With compression each batch is written
+    as a separate gzip member or zstd frame, which both formats read back as
+    one stream.
+
+    ``fsync`` controls durability: ``never`` leaves it to the OS, ``flush``
+    fsyncs after every batch and ``always`` writes and fsyncs each event
+    synchronously.
+    """
+
+    def __init__(
+        self,
+        directory: str = "trace",
+        compression: Compression = "none",
+        fsync: FsyncPolicy = "never",
+        flush_interval: float = 1.0,
+        max_buffered_events: int = 1000,
+    ):
+        _check_compression(compression)
+        if fsync not in ("never", "flush", "always"):
+            raise ValueError(
+                f"fsync must be one of ['never', 'flush', 'always'], got {fsync}"
+            )
+
+        self.directory = directory
+        self.compression = compression
+        self.fsync = fsync
+        self.flush_interval = flush_interval
+        self.max_buffered_events = max_buffered_events
+
+        self._queue: queue.Queue = queue.Queue()
+        self._write_lock = threading.Lock()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+
+    def write(self, session_id: str, trace_data: Dict):
+        if self._closed:
+            raise RuntimeError("TraceWriter is closed")
+
+        line = json.dumps(trace_data, default=str) + "\n"
+        if self.fsync == "always":
+            self._append({str(session_id): [line]})
+            return
+
+        self._ensure_thread()
+        self._queue.put((str(session_id), line))
+
+    def flush(self, timeout: Optional[float] = 30.0) -> bool:
+        """Block until every event written so far is on disk.
+
+        Returns False if the writer thread did not get there within ``timeout``
+        seconds, e.g. because the thread is gone.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return self._thread is None
+        done = threading.Event()
+        self._queue.put((_FLUSH_REQUEST, done))
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 30.0):
+        if self._closed:
+            return
+        self.flush(timeout)
+        self._closed = True
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._thread_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="InlineAgentTraceWriter", daemon=True
+                    )
+                    self._thread.start()
+
+    def _run(self):
+        batch: Dict[str, List[str]] = defaultdict(list)
+        buffered = 0
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                item = None
+
+            waiter = None
+            if isinstance(item, tuple) and item[0] is _FLUSH_REQUEST:
+                _, waiter = item
+            elif item is not None and item is not _STOP:
+                session_id, line = item
+                batch[session_id].append(line)
+                buffered += 1
+
+            if (
+                item is None
+                or item is _STOP
+                or waiter is not None
+                or buffered >= self.max_buffered_events
+                or time.monotonic() >= deadline
+            ):
+                if batch:
+                    self._write_batch(batch)
+                    batch = defaultdict(list)
+                    buffered = 0
+                deadline = time.monotonic() + self.flush_interval
+
+            if waiter is not None:
+                waiter.set()
+            if item is _STOP:
+                return
+
+    def _write_batch(self, batch: Dict[str, List[str]]):
+        # A failed write drops the batch instead of stopping the thread, which
+        # would leave every later flush waiting
+        try:
+            self._append(batch)
+        except Exception:
+            logger.exception(
+                "Failed to write %d trace events to %s",
+                sum(len(lines) for lines in batch.values()),
+                self.directory,
+            )
+
+    def _append(self, batch: Dict[str, List[str]]):
+        with self._write_lock:
+            os.makedirs(self.directory, exist_ok=True)
+            for session_id, lines in batch.items():
+                data = "".join(lines).encode("utf8")
+                if self.compression == "gzip":
+                    data = gzip.compress(data)
+                elif self.compression == "zstd":
+                    data = zstandard.ZstdCompressor().compress(data)
+
+                path = trace_file_path(session_id, self.directory, self.compression)
+                with open(path, "ab") as file:
+                    file.write(data)
+                    if self.fsync != "never":
+                        file.flush()
+                        os.fsync(file.fileno())
+
+
+_FLUSH_REQUEST = object()
+_STOP = object()
+
+
+def read_session_traces(session_id: str, directory: str = "trace") -> List[Dict]:
+    """Reconstruct the trace events saved for a session, in write order.
+
+    Reads the legacy ``<session_id>.json`` array as well as plain, gzip and
+    zstd JSON Lines files written by :class:`TraceWriter`.
+    """
+    events = list()
+
+    legacy_path = os.path.join(directory, str(session_id) + ".json")
+    if os.path.exists(legacy_path):
+        with open(legacy_path, "r") as file:
+            events.extend(json.load(file))
+
+    for compression in _EXTENSIONS:
+        path = trace_file_path(session_id, directory, compression)
+        if not os.path.exists(path):
+            continue
+
+        if compression == "gzip":
+            file = gzip.open(path, "rt", encoding="utf8")
+        elif compression == "zstd":
+            _check_compression(compression)
+            reader = zstandard.ZstdDecompressor().stream_reader(
+                open(path, "rb"), read_across_frames=True, closefd=True
+            )
+            file = io.TextIOWrapper(reader, encoding="utf8")
+        else:
+            file = open(path, "r", encoding="utf8")
+
+        with file:
+            for line in file:
+                if line.strip():
+                    events.append(json.loads(line))
+
+    return events
+
+
+_trace_writer: Optional[TraceWriter] = None
+_trace_writer_lock = threading.Lock()
+
+
+def get_trace_writer(**kwargs) -> TraceWriter:
+    """Return the process-wide :class:`TraceWriter`, creating it on first use.
+
+    Keyword arguments are only used when the writer is created.
+    """
+    global _trace_writer
+    if _trace_writer is None:
+        with _trace_writer_lock:
+            if _trace_writer is None:
+                _trace_writer = TraceWriter(**kwargs)
+                atexit.register(_trace_writer.close)
+    return _trace_writer
+
+
+def flush_trace_writer():
+    """Flush the process-wide :class:`TraceWriter` if one has been created."""
+    if _trace_writer is not None:
+        _trace_writer.flush()
@@ -28,7 +28,14 @@ def get_agent_id_aliasid(arn: str):
     return agent_id, agent_alias_id
 
 
-def add_citation(citations: List, cite=1) -> str:
+def add_citation(citations: List, cite=1, show: bool = True) -> str:
+
+    if not show:
+        agent_answer = "".join(
+            citation["generatedResponsePart"]["textResponsePart"]["text"]
+            for citation in citations
+        )
+        return agent_answer, cite + len(citations)
 
     agent_answer = str()
 
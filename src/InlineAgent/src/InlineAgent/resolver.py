@@ -0,0 +1,193 @@
+import os
+import threading
+import time
+import warnings
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+import boto3
+
+from InlineAgent.clients import ClientRegistry, client_registry
+from InlineAgent.json_cache import load_entries, save_entries
+
+DEFAULT_TTL = 300.0
+DEFAULT_MIN_RELIST_INTERVAL = 30.0
+
+KNOWLEDGE_BASE = "knowledge_base"
+AGENT = "agent"
+
+
+class NameResolver:
+    """Process-wide name to ID index for knowledge bases and agents.
+
+    Knowledge bases and collaborators are configured by name, but the
+    Bedrock APIs want IDs, and the control plane only offers paginated
+    ``list_*`` calls to look them up. The resolver lists each resource type
+    once per profile and region, answers every lookup from that index, and
+    lists again once the index is older than ``ttl`` seconds, or when a name is
+    missing from an index older than ``min_relist_interval`` seconds, so that a
+    misspelled name does not list the control plane on every lookup. Concurrent
+    lookups of the same index share one listing. Call ``invalidate`` to find a
+    resource created within ``min_relist_interval`` of the last listing.
+
+    With ``cache_path`` the indexes are also persisted as JSON, so a cold
+    process starts from the last listing instead of the control plane as long
+    as it is younger than ``ttl``.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        cache_path: Optional[str] = None,
+        registry: ClientRegistry = client_registry,
+        min_relist_interval: float = DEFAULT_MIN_RELIST_INTERVAL,
+    ):
+        self.ttl = ttl
+        self.min_relist_interval = min_relist_interval
+        self.cache_path = cache_path
+        self.registry = registry
+
+        self._lock = threading.Lock()
+        self._refresh_locks: Dict[str, threading.Lock] = dict()
+        # index key -> (listed at, {name: id})
+        self._indexes: Dict[str, Tuple[float, Dict[str, str]]] = dict()
+        self._load_cache()
+
+    def knowledge_base_id(self, name: str, profile: str = "default") -> Optional[str]:
+        """Return the ID of the knowledge base called ``name``, or None."""
+        return self._resolve(KNOWLEDGE_BASE, name, profile)
+
+    def agent_id(self, name: str, profile: str = "default") -> Optional[str]:
+        """Return the ID of the agent called ``name``, or None."""
+        return self._resolve(AGENT, name, profile)
+
+    def prefetch(
+        self,
+        knowledge_bases: Iterable[str] = (),
+        agents: Iterable[str] = (),
+        profile: str = "default",
+    ) -> Dict[str, Dict[str, Optional[str]]]:
+        """Resolve many names with at most one listing per resource type.
+
+        Returns:
+            ``{"knowledge_bases": {name: id}, "agents": {name: id}}`` with None
+            for names that do not exist
+        """
+        resolved = dict()
+        for kind, names, result_key in (
+            (KNOWLEDGE_BASE, knowledge_bases, "knowledge_bases"),
+            (AGENT, agents, "agents"),
+        ):
+            names = list(names)
+            index = self._index(kind, profile, required=names)
+            resolved[result_key] = {name: index.get(name) for name in names}
+        return resolved
+
+    def invalidate(self, profile: Optional[str] = None):
+        """Forget cached indexes, for every profile or only ``profile``."""
+        with self._lock:
+            if profile is None:
+                self._indexes.clear()
+            else:
+                for key in [
+                    key for key in self._indexes if key.split(":", 2)[1] == profile
+                ]:
+                    del self._indexes[key]
+        self._save_cache()
+
+    def _resolve(self, kind: str, name: str, profile: str) -> Optional[str]:
+        return self._index(kind, profile, required=[name]).get(name)
+
+    def _index(
+        self, kind: str, profile: str, required: Iterable[str]
+    ) -> Dict[str, str]:
+        key = f"{kind}:{profile}:{self.registry.region(profile)}"
+
+        entry = self._indexes.get(key)
+        if self._is_complete(entry, required):
+            return entry[1]
+
+        with self._refresh_lock(key):
+            # Another thread may have listed while we waited
+            entry = self._indexes.get(key)
+            if self._is_complete(entry, required):
+                return entry[1]
+
+            index = self._list(kind, profile)
+            with self._lock:
+                self._indexes[key] = (time.time(), index)
+            self._save_cache()
+            return index
+
+    def _is_complete(
+        self, entry: Optional[Tuple[float, Dict[str, str]]], required: Iterable[str]
+    ) -> bool:
+        if entry is None:
+            return False
+        age = time.time() - entry[0]
+        if age > self.ttl:
+            return False
+        # Missing names are answered from the index until it may be listed again
+        return age < self.min_relist_interval or all(
+            name in entry[1] for name in required
+        )
+
+    def _refresh_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._refresh_locks.setdefault(key, threading.Lock())
+
+    def _list(self, kind: str, profile: str) -> Dict[str, str]:
+        bedrock_agent = self.registry.client("bedrock-agent", profile=profile)
+
+        index = dict()
+        if kind == KNOWLEDGE_BASE:
+            kwargs = {}
+            while True:
+                response = bedrock_agent.list_knowledge_bases(**kwargs)
+                for kb in response.get("knowledgeBaseSummaries", []):
+                    index[kb["name"]] = kb["knowledgeBaseId"]
+
+                next_token = response.get("nextToken")
+                if not next_token:
+                    break
+                kwargs["nextToken"] = next_token
+        else:
+            paginator = bedrock_agent.get_paginator("list_agents")
+            for page in paginator.paginate():
+                for agent in page["agentSummaries"]:
+                    index[agent["agentName"]] = agent["agentId"]
+
+        return index
+
+    def _load_cache(self):
+        self._indexes = load_entries(self.cache_path, "index")
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        with self._lock:
+            save_entries(self.cache_path, self._indexes, "index")
+
+
+def profile_name(
+    profile: Union[boto3.Session, str], session: Optional[boto3.Session] = None
+) -> str:
+    """Profile to resolve names with, for lookups that used to take a session.
+
+    Args:
+        profile: AWS profile, or a boto3 session in place of it
+        session: boto3 session, as passed by callers of the former ``session``
+            parameter
+    """
+    if session is None and isinstance(profile, boto3.Session):
+        session = profile
+    if session is None:
+        return profile
+    warnings.warn(
+        "Passing a boto3 session is deprecated, pass the profile name instead",
+        DeprecationWarning,
+        stacklevel=3,
+    )
+    return session.profile_name
+
+
+resolver = NameResolver(cache_path=os.environ.get("INLINE_AGENT_RESOLVER_CACHE"))
@@ -0,0 +1,243 @@
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, NamedTuple, Optional, Tuple
+
+_MISSING = object()
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class SQLiteCacheBackend:
+    """Tool results shared by every process that opens the same SQLite file.
+
+    Values are stored as JSON, so only JSON-serializable results are shared;
+    other results stay in the in-process cache. Each tool keeps at most its
+    ``maxsize`` most recently written results.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS tool_results ("
+                "name TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, written_at REAL NOT NULL, "
+                "PRIMARY KEY (name, key))"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, name: str, key: str) -> Tuple[Any, float]:
+        """Return ``(value, expires_at)``, with ``_MISSING`` for no live entry."""
+        row = (
+            self._connection()
+            .execute(
+                "SELECT value, expires_at FROM tool_results WHERE name = ? AND key = ?",
+                (name, key),
+            )
+            .fetchone()
+        )
+        if row is None or row[1] <= time.time():
+            return _MISSING, 0.0
+        return json.loads(row[0]), row[1]
+
+    def set(self, name: str, key: str, value: Any, expires_at: float, maxsize: int):
+        try:
+            payload = json.dumps(value)
+        except (TypeError, ValueError):
+            return
+
+        now = time.time()
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO tool_results VALUES (?, ?, ?, ?, ?)",
+                (name, key, payload, expires_at, now),
+            )
+            connection.execute(
+                "DELETE FROM tool_results WHERE name = ? AND (expires_at <= ? OR key "
+                "NOT IN (SELECT key FROM tool_results WHERE name = ? "
+                "ORDER BY written_at DESC LIMIT ?))",
+                (name, now, name, maxsize),
+            )
+
+    def clear(self, name: str):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM tool_results WHERE name = ?", (name,))
+
+
+class ToolResultCache:
+    """LRU cache with a time to live for the results of one tool.
+
+    Entries are keyed on the normalized keyword arguments of the call, so
+    argument order and omitted defaults do not matter. With a ``backend`` the
+    results are also written to, and looked up in, a store shared with other
+    processes.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 128,
+        ttl: float = 60.0,
+        backend: Optional[SQLiteCacheBackend] = None,
+    ):
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be at least 1, got {maxsize}")
+
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        # key -> (expires at, result), least recently used first
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    @staticmethod
+    def make_key(arguments: dict) -> str:
+        return json.dumps(arguments, sort_keys=True, default=repr)
+
+    def get(self, key: str) -> Any:
+        """Return the cached result for ``key`` or ``_MISSING``."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+        if self.backend is not None:
+            value, expires_at = self.backend.get(self.name, key)
+            if value is not _MISSING:
+                with self._lock:
+                    self.hits += 1
+                    self._store(key, value, expires_at)
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return _MISSING
+
+    def set(self, key: str, value: Any):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._store(key, value, expires_at)
+        if self.backend is not None:
+            self.backend.set(self.name, key, value, expires_at, self.maxsize)
+
+    def _store(self, key: str, value: Any, expires_at: float):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+        if self.backend is not None:
+            self.backend.clear(self.name)
+
+
+def cache_result(
+    ttl: float = 60.0,
+    maxsize: int = 128,
+    backend: Optional[SQLiteCacheBackend] = None,
+    name: Optional[str] = None,
+):
+    """Cache the results of a tool that is pure for ``ttl`` seconds.
+
+    Use it for return-of-control tools the model tends to call repeatedly with
+    the same parameters, such as quotes or lookups. Works on both plain and
+    coroutine functions; exceptions are not cached. The wrapped tool exposes
+    ``cache_info()`` and ``cache_clear()``.
+
+    Args:
+        ttl: Seconds a result stays valid
+        maxsize: Results kept for this tool, least recently used evicted first
+        backend: Store shared between processes, e.g. :class:`SQLiteCacheBackend`
+        name: Cache namespace, defaults to the function name
+    """
+
+    def decorator(func: Callable) -> Callable:
+        cache = ToolResultCache(
+            name=name or func.__name__, maxsize=maxsize, ttl=ttl, backend=backend
+        )
+        sig = inspect.signature(func)
+
+        def make_key(args, kwargs) -> str:
+            try:
+                bound = sig.bind(*args, **kwargs)
+                bound.apply_defaults()
+                arguments = bound.arguments
+            except TypeError:
+                # Let the call itself raise
+                arguments = {"args": args, "kwargs": kwargs}
+            return cache.make_key(arguments)
+
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                key = make_key(args, kwargs)
+                result = cache.get(key)
+                if result is _MISSING:
+                    result = await func(*args, **kwargs)
+                    cache.set(key, result)
+                return result
+
+        else:
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                key = make_key(args, kwargs)
+                result = cache.get(key)
+                if result is _MISSING:
+                    result = func(*args, **kwargs)
+                    cache.set(key, result)
+                return result
+
+        wrapper.__result_cache__ = cache
+        wrapper.cache_info = cache.info
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    # Handle both @cache_result and @cache_result()
+    if callable(ttl):
+        func = ttl
+        ttl = 60.0
+        return decorator(func)
+    return decorator
@@ -1,3 +1,5 @@
 from .mcp import MCPStdio, MCPServer, MCPHttp
+from .mcp_catalog import ToolCatalogCache
+from .mcp_pool import MCPSessionPool
 
-__all__ = ["MCPStdio", "MCPServer", "MCPHttp"]
+__all__ = ["MCPStdio", "MCPServer", "MCPHttp", "MCPSessionPool", "ToolCatalogCache"]
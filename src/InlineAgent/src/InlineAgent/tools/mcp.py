@@ -1,126 +1,203 @@
+import asyncio
+import shlex
 from abc import ABC, abstractmethod
 from contextlib import AsyncExitStack
 
 from termcolor import colored
 
-from pydantic import validate_call
+from pydantic import ConfigDict, validate_call
 from mcp import ClientSession, ListToolsResult, StdioServerParameters
 from mcp.client.stdio import stdio_client
 from mcp.client.sse import sse_client
-from typing import Any, Callable, Dict, List
+from mcp.types import ServerNotification, Tool, ToolListChangedNotification
+from typing import Any, Callable, Dict, List, Optional
 
 from InlineAgent.types.action_group import FunctionDefination
 from InlineAgent.constants import TraceColor
+from InlineAgent.tool_cache import cache_result
+from InlineAgent.tools.mcp_catalog import ToolCatalogCache, tool_catalog_cache
+from InlineAgent.tools.mcp_pool import Connect, MCPSessionPool, PoolClientSession
 
 
 class MCPServer(ABC):
 
-    @validate_call
-    async def set_available_tools(self, tools_to_use: set) -> List[FunctionDefination]:
+    @property
+    def session(self) -> Optional[ClientSession]:
+        return self.pool.session if self.pool else None
+
+    @property
+    def catalog_key(self) -> str:
+        """Key of this server's tool catalog in ``catalog_cache``."""
+        initialize_result = getattr(self.session, "initialize_result", None)
+        return ToolCatalogCache.key(self.server_id, initialize_result)
+
+    async def list_tools(self, refresh: bool = False) -> List[Tool]:
         """
-        Retrieve a list of available tools from the MCP server.
+        Return the tools of the MCP server.
+
+        The catalog is fetched with a single ``list_tools`` call and kept in
+        ``catalog_cache``; ``refresh`` skips the cache.
         """
         if not self.session:
             raise RuntimeError("Not connected to MCP server")
 
-        tools: ListToolsResult = await self.session.list_tools()
-        tools_list = tools.tools
-
-        function = {}
-        for tool in tools_list:
-            if len(tools_to_use) != 0:
-                if tool.name in tools_to_use:
-                    function = {
-                        "description": tool.description,
-                        "name": tool.name,
-                        "parameters": {},
-                        "requireConfirmation": "DISABLED",
-                    }
-                    # Process input schema properties
-                    if "properties" in tool.inputSchema:
-
-                        for param_name, param_details in tool.inputSchema[
-                            "properties"
-                        ].items():
-                            function["parameters"][param_name] = {
-                                "description": param_details.get(
-                                    "description", param_name
-                                ),
-                                "type": param_details.get("type", "string"),
-                                "required": param_name
-                                in tool.inputSchema.get("required", []),
-                            }
-
-                        if len(function["parameters"]) > 5:
-
-                            raise ValueError(
-                                f"Tool {tool.name} has more than 5 parameters. This is not supported by Bedrock Agents."
-                            )
-
-                    if "functions" not in self.function_schema:
-                        self.function_schema["functions"] = list()
-
-                    self.function_schema["functions"].append(function)
-            else:
-                function = {
-                    "description": tool.description,
-                    "name": tool.name,
-                    "parameters": {},
-                    "requireConfirmation": "DISABLED",
+        key = self.catalog_key
+        tools = None if refresh else self.catalog_cache.get(key)
+        if tools is None:
+            response: ListToolsResult = await self.session.list_tools()
+            tools = response.tools
+            self.catalog_cache.put(key, tools)
+        self.tools = tools
+        return tools
+
+    @staticmethod
+    def function_definition(tool: Tool) -> Dict[str, Any]:
+        """Convert an MCP tool to a Bedrock Agents function definition."""
+        function = {
+            "description": tool.description,
+            "name": tool.name,
+            "parameters": {},
+            "requireConfirmation": "DISABLED",
+        }
+        # Process input schema properties
+        if "properties" in tool.inputSchema:
+
+            for param_name, param_details in tool.inputSchema["properties"].items():
+                function["parameters"][param_name] = {
+                    "description": param_details.get("description", param_name),
+                    "type": param_details.get("type", "string"),
+                    "required": param_name in tool.inputSchema.get("required", []),
                 }
-                # Process input schema properties
-                if "properties" in tool.inputSchema:
 
-                    for param_name, param_details in tool.inputSchema[
-                        "properties"
-                    ].items():
-                        function["parameters"][param_name] = {
-                            "description": param_details.get("description", param_name),
-                            "type": param_details.get("type", "string"),
-                            "required": param_name
-                            in tool.inputSchema.get("required", []),
-                        }
+            if len(function["parameters"]) > 5:
+
+                raise ValueError(
+                    f"Tool {tool.name} has more than 5 parameters. This is not supported by Bedrock Agents."
+                )
 
-                    if len(function["parameters"]) > 5:
+        return function
 
-                        raise ValueError(
-                            f"Tool {tool.name} has more than 5 parameters. This is not supported by Bedrock Agents."
-                        )
+    def _tools_in_use(self, tools_to_use: set) -> List[Tool]:
+        return [
+            tool
+            for tool in self.tools
+            if len(tools_to_use) == 0 or tool.name in tools_to_use
+        ]
 
-                if "functions" not in self.function_schema:
-                    self.function_schema["functions"] = list()
+    @validate_call
+    async def set_available_tools(self, tools_to_use: set) -> List[FunctionDefination]:
+        """
+        Build the function schema from the tools of the MCP server.
+        """
+        if self.tools is None:
+            await self.list_tools()
+
+        functions = list()
+        definitions = dict()
+        for tool in self._tools_in_use(tools_to_use):
+            # Only tools that changed since the last catalog are converted again
+            previous = self._definitions.get(tool.name)
+            if previous is not None and previous[0] == tool:
+                function = previous[1]
+            else:
+                function = self.function_definition(tool)
+            definitions[tool.name] = (tool, function)
+            functions.append(function)
 
-                self.function_schema["functions"].append(function)
+        self._definitions = definitions
+        # Updated in place so action groups holding the dict see the change
+        self.function_schema["functions"] = functions
 
     @validate_call
     async def set_callable_tool(self, tools_to_use: set) -> Dict[str, Callable]:
         """
         Get callable function
         """
-        if not self.session:
-            raise RuntimeError("Not connected to MCP server")
-
-        tools = await self.session.list_tools()
-        tools_list = tools.tools
+        if self.tools is None:
+            await self.list_tools()
 
         # Helper factory function to create a callable with the correct tool name
         def create_callable(tool_name):
             async def callable(*args, **kwargs):
-                response = await self.session.call_tool(
-                    tool_name, arguments=kwargs
-                )
+                response = await self.pool.call_tool(tool_name, arguments=kwargs)
                 return response.content[0].text
+
+            callable.__name__ = tool_name
+            if tool_name in self.result_cache:
+                return cache_result(name=tool_name, **self.result_cache[tool_name])(
+                    callable
+                )
             return callable
 
-        for tool in tools_list:
-            if len(tools_to_use) != 0:
-                if tool.name in tools_to_use:
-                    self.callable_tools[tool.name] = create_callable(tool.name)
-            else:
-                self.callable_tools[tool.name] = create_callable(tool.name)
+        names = {tool.name for tool in self._tools_in_use(tools_to_use)}
+        for name in list(self.callable_tools):
+            if name not in names:
+                del self.callable_tools[name]
+        for name in names:
+            if name not in self.callable_tools:
+                self.callable_tools[name] = create_callable(name)
+
+    async def refresh_tools(self):
+        """Fetch the tool catalog again and update the schema and callables."""
+        await self.list_tools(refresh=True)
+        await self.set_available_tools(tools_to_use=self.tools_to_use)
+        await self.set_callable_tool(tools_to_use=self.tools_to_use)
+
+    async def _handle_message(self, message) -> None:
+        """Refresh the tools when the server sends ``tools/list_changed``."""
+        if isinstance(message, ServerNotification) and isinstance(
+            message.root, ToolListChangedNotification
+        ):
+            self.catalog_cache.invalidate(self.catalog_key)
+            # Runs in the session's receive loop, which must keep reading to
+            # get the list_tools response, so the refresh is a separate task.
+            # Every pooled connection sends the notification; one refresh
+            # covers them all.
+            if self._refresh_task is None or self._refresh_task.done():
+                self._refresh_task = asyncio.create_task(self.refresh_tools())
+
+    async def _initialize(
+        self,
+        server_id: str,
+        connect: Connect,
+        tools_to_use: set,
+        catalog_cache: Optional[ToolCatalogCache],
+        result_cache: Optional[Dict[str, Dict[str, Any]]],
+        pool_size: int,
+        max_pool_size: Optional[int],
+    ):
+        self.server_id = server_id
+        self.result_cache = result_cache or dict()
+        self.tools_to_use = tools_to_use
+        self.catalog_cache = catalog_cache or tool_catalog_cache
+        self.tools: Optional[List[Tool]] = None
+        self._definitions = dict()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+        self.pool = MCPSessionPool(
+            connect=connect, size=pool_size, max_size=max_pool_size
+        )
+        await self.pool.start()
+
+        # List available tools
+        tools = await self.list_tools()
+        print(
+            colored(
+                f"\nConnected to server with tools:{[tool.name for tool in tools]}",
+                TraceColor.invocation_output,
+            )
+        )
+
+        await self.set_available_tools(tools_to_use=tools_to_use)
+        await self.set_callable_tool(tools_to_use=tools_to_use)
 
     async def cleanup(self):
         """Clean up resources"""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+        if self.pool:
+            await self.pool.close()
         await self.exit_stack.aclose()
 
 
@@ -130,46 +207,61 @@ class MCPStdio(MCPServer):
     """
 
     @classmethod
-    @validate_call
+    @validate_call(config=ConfigDict(arbitrary_types_allowed=True))
     async def create(
-        cls, server_params: StdioServerParameters, tools_to_use: set = set()
+        cls,
+        server_params: StdioServerParameters,
+        tools_to_use: set = set(),
+        pool_size: int = 1,
+        max_pool_size: Optional[int] = None,
+        catalog_cache: Optional[ToolCatalogCache] = None,
+        result_cache: Optional[Dict[str, Dict[str, Any]]] = None,
     ):
+        """Connect to a stdio MCP server.
+
+        ``pool_size`` server subprocesses are started up front and up to
+        ``max_pool_size`` while all of them are busy; tool calls are
+        load-balanced across them (see :class:`MCPSessionPool`).
+
+        The tool catalog comes from ``catalog_cache`` (by default the
+        process-wide :class:`ToolCatalogCache`) when the same server version
+        was listed recently, and is refreshed when the server sends
+        ``tools/list_changed``.
+
+        ``result_cache`` maps tool names to :func:`cache_result` options, e.g.
+        ``{"get_quote": {"ttl": 30}}``, to cache the results of those tools.
+        """
         # Initialize session and client objects
         self = cls()
-        self.session = None
+        self.pool = None
         self.exit_stack = AsyncExitStack()
         self.function_schema = dict()
         self.callable_tools = dict()
 
-        stdio_transport = await self.exit_stack.enter_async_context(
-            stdio_client(server_params)
-        )
-        self.stdio, self.write = stdio_transport
-        self.session = await self.exit_stack.enter_async_context(
-            ClientSession(self.stdio, self.write)
-        )
-
-        await self.session.initialize()
-
-        # List available tools
-        response = await self.session.list_tools()
-        tools = response.tools
-        print(
-            colored(
-                f"\nConnected to server with tools:{[tool.name for tool in tools]}",
-                TraceColor.invocation_output,
+        async def connect(stack: AsyncExitStack) -> ClientSession:
+            read, write = await stack.enter_async_context(stdio_client(server_params))
+            session = await stack.enter_async_context(
+                PoolClientSession(read, write, message_handler=self._handle_message)
             )
+            await session.initialize()
+            return session
+
+        await self._initialize(
+            server_id=shlex.join([server_params.command, *server_params.args]),
+            connect=connect,
+            tools_to_use=tools_to_use,
+            catalog_cache=catalog_cache,
+            result_cache=result_cache,
+            pool_size=pool_size,
+            max_pool_size=max_pool_size,
         )
 
-        await self.set_available_tools(tools_to_use=tools_to_use)
-        await self.set_callable_tool(tools_to_use=tools_to_use)
-
         return self
 
 
 class MCPHttp(MCPServer):
     @classmethod
-    @validate_call
+    @validate_call(config=ConfigDict(arbitrary_types_allowed=True))
     async def create(
         cls,
         url: str,
@@ -177,41 +269,56 @@ class MCPHttp(MCPServer):
         timeout: float = 5,
         sse_read_timeout: float = 60 * 5,
         tools_to_use: set = set(),
+        pool_size: int = 1,
+        max_pool_size: Optional[int] = None,
+        catalog_cache: Optional[ToolCatalogCache] = None,
+        result_cache: Optional[Dict[str, Dict[str, Any]]] = None,
     ):
+        """Connect to an MCP server over SSE.
+
+        ``pool_size`` SSE connections are opened up front and up to
+        ``max_pool_size`` while all of them are busy; tool calls are
+        load-balanced across them (see :class:`MCPSessionPool`).
+
+        The tool catalog comes from ``catalog_cache`` (by default the
+        process-wide :class:`ToolCatalogCache`) when the same server version
+        was listed recently, and is refreshed when the server sends
+        ``tools/list_changed``.
+
+        ``result_cache`` maps tool names to :func:`cache_result` options, e.g.
+        ``{"get_quote": {"ttl": 30}}``, to cache the results of those tools.
+        """
 
         # Initialize session and client objects
         self = cls()
-        self.session = None
+        self.pool = None
         self.exit_stack = AsyncExitStack()
         self.function_schema = dict()
         self.callable_tools = dict()
 
-        stdio_transport = await self.exit_stack.enter_async_context(
-            sse_client(
-                url=url,
-                headers=headers,
-                timeout=timeout,
-                sse_read_timeout=sse_read_timeout,
+        async def connect(stack: AsyncExitStack) -> ClientSession:
+            read, write = await stack.enter_async_context(
+                sse_client(
+                    url=url,
+                    headers=headers,
+                    timeout=timeout,
+                    sse_read_timeout=sse_read_timeout,
+                )
             )
-        )
-        self.stdio, self.write = stdio_transport
-        self.session = await self.exit_stack.enter_async_context(
-            ClientSession(self.stdio, self.write)
-        )
-
-        await self.session.initialize()
-
-        # List available tools
-        response = await self.session.list_tools()
-        tools = response.tools
-        print(
-            colored(
-                f"\nConnected to server with tools:{[tool.name for tool in tools]}",
-                TraceColor.invocation_output,
+            session = await stack.enter_async_context(
+                PoolClientSession(read, write, message_handler=self._handle_message)
             )
+            await session.initialize()
+            return session
+
+        await self._initialize(
+            server_id=url,
+            connect=connect,
+            tools_to_use=tools_to_use,
+            catalog_cache=catalog_cache,
+            result_cache=result_cache,
+            pool_size=pool_size,
+            max_pool_size=max_pool_size,
         )
 
-        await self.set_available_tools(tools_to_use=tools_to_use)
-        await self.set_callable_tool(tools_to_use=tools_to_use)
-
         return self
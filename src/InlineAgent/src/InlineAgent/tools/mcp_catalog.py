@@ -0,0 +1,86 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from mcp.types import InitializeResult, Tool
+
+from InlineAgent.json_cache import load_entries, save_entries
+
+DEFAULT_TTL = 300.0
+
+
+class ToolCatalogCache:
+    """Tool lists of MCP servers, keyed by server and server version.
+
+    ``list_tools`` is a full round trip that returns every tool schema, which
+    is slow for servers with hundreds of tools and repeated for every client
+    created for the same server. Catalogs are kept for ``ttl`` seconds under a
+    key built from the server command or URL and the name, version and
+    protocol version the server reported in ``initialize``, so an upgraded
+    server never gets a stale catalog.
+
+    With ``cache_path`` the catalogs are also persisted as JSON, so a cold
+    process can skip ``list_tools`` entirely.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL, cache_path: Optional[str] = None):
+        self.ttl = ttl
+        self.cache_path = cache_path
+
+        self._lock = threading.Lock()
+        # catalog key -> (listed at, [tool as dict])
+        self._catalogs: Dict[str, Tuple[float, List[dict]]] = dict()
+        self._load_cache()
+
+    @staticmethod
+    def key(server: str, initialize_result: Optional[InitializeResult]) -> str:
+        """Cache key for the server at ``server`` (a command line or URL)."""
+        version = None
+        if initialize_result is not None:
+            version = [
+                initialize_result.serverInfo.name,
+                initialize_result.serverInfo.version,
+                str(initialize_result.protocolVersion),
+            ]
+        return hashlib.sha256(json.dumps([server, version]).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[Tool]]:
+        """Return the cached tools for ``key``, or None if missing or expired."""
+        entry = self._catalogs.get(key)
+        if entry is None or time.time() - entry[0] > self.ttl:
+            return None
+        return [Tool.model_validate(tool) for tool in entry[1]]
+
+    def put(self, key: str, tools: List[Tool]):
+        with self._lock:
+            self._catalogs[key] = (
+                time.time(),
+                [tool.model_dump(mode="json", exclude_none=True) for tool in tools],
+            )
+        self._save_cache()
+
+    def invalidate(self, key: Optional[str] = None):
+        """Forget every catalog, or only the one for ``key``."""
+        with self._lock:
+            if key is None:
+                self._catalogs.clear()
+            else:
+                self._catalogs.pop(key, None)
+        self._save_cache()
+
+    def _load_cache(self):
+        self._catalogs = load_entries(self.cache_path, "tools")
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        with self._lock:
+            save_entries(self.cache_path, self._catalogs, "tools")
+
+
+tool_catalog_cache = ToolCatalogCache(
+    cache_path=os.environ.get("INLINE_AGENT_MCP_CATALOG_CACHE")
+)
@@ -0,0 +1,236 @@
+import asyncio
+import itertools
+import time
+from contextlib import AsyncExitStack
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import anyio
+from mcp import ClientSession
+from mcp.types import CallToolResult, InitializeResult
+
+# Opens the transport and an initialized ClientSession on the given stack
+Connect = Callable[[AsyncExitStack], Awaitable[ClientSession]]
+
+# Errors that mean the connection is gone rather than that the call failed
+CONNECTION_ERRORS = (
+    OSError,
+    EOFError,
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+)
+
+
+class PoolClientSession(ClientSession):
+    """``ClientSession`` that fails pending requests when its transport ends.
+
+    A plain ``ClientSession`` leaves requests waiting forever if the server
+    process exits or the stream drops. Here they raise ``anyio.EndOfStream``
+    so the pool can retry them on another connection. The ``initialize``
+    result is kept because it identifies the server version.
+    """
+
+    closed = False
+    initialize_result: Optional[InitializeResult] = None
+
+    async def initialize(self) -> InitializeResult:
+        self.initialize_result = await super().initialize()
+        return self.initialize_result
+
+    async def _receive_loop(self) -> None:
+        try:
+            await super()._receive_loop()
+        finally:
+            self.closed = True
+            response_streams = getattr(self, "_response_streams", {})
+            for stream in list(response_streams.values()):
+                await stream.aclose()
+            response_streams.clear()
+
+
+class PooledSession:
+    """One MCP connection owned by a dedicated task.
+
+    The stdio and SSE transports are anyio task groups, which must be entered
+    and exited by the same task. Running each connection in its own task lets
+    the pool open and close connections from whichever task needs them.
+    """
+
+    def __init__(self, connect: Connect):
+        self._connect = connect
+        self.session: Optional[ClientSession] = None
+        self.in_flight = 0
+        self.last_checked = 0.0
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+
+    @property
+    def healthy(self) -> bool:
+        return (
+            self.session is not None
+            and not getattr(self.session, "closed", False)
+            and not self._closing.is_set()
+        )
+
+    async def open(self):
+        self._task = asyncio.create_task(self._run())
+        await self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    async def _run(self):
+        try:
+            async with AsyncExitStack() as stack:
+                self.session = await self._connect(stack)
+                self.last_checked = time.monotonic()
+                self._ready.set()
+                await self._closing.wait()
+        except Exception as e:
+            self._error = e
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def close(self):
+        self._closing.set()
+        if self._task is not None:
+            # The task ends cancelled if the transport failed underneath it
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+class MCPSessionPool:
+    """Load-balances ``call_tool`` over several sessions to one MCP server.
+
+    ``size`` connections are opened up front. While every open connection has
+    a call in flight, up to ``max_size`` more are opened on demand, which for
+    stdio servers means extra subprocesses and for HTTP servers extra SSE
+    streams. Calls go to the connection with the fewest calls in flight.
+
+    Connections idle for longer than ``health_check_interval`` seconds are
+    pinged before use, and dead connections are replaced. A call that fails
+    because its connection dropped is retried once on a fresh one.
+    """
+
+    def __init__(
+        self,
+        connect: Connect,
+        size: int = 1,
+        max_size: Optional[int] = None,
+        health_check_interval: float = 30.0,
+        ping_timeout: float = 5.0,
+    ):
+        if size < 1:
+            raise ValueError(f"size must be at least 1, got {size}")
+        if max_size is not None and max_size < size:
+            raise ValueError(f"max_size must be at least size, got {max_size}")
+
+        self._connect = connect
+        self.size = size
+        self.max_size = max_size or size
+        self.health_check_interval = health_check_interval
+        self.ping_timeout = ping_timeout
+
+        self.connections: List[PooledSession] = list()
+        self._pending = 0
+        self._round_robin = itertools.count()
+        self._closed = False
+
+    @property
+    def session(self) -> Optional[ClientSession]:
+        """A session for requests that need no balancing, e.g. ``list_tools``."""
+        for connection in self.connections:
+            if connection.healthy:
+                return connection.session
+        return None
+
+    async def start(self):
+        await asyncio.gather(*[self._open() for _ in range(self.size)])
+
+    async def call_tool(
+        self, name: str, arguments: Optional[Dict[str, Any]] = None
+    ) -> CallToolResult:
+        for attempt in range(2):
+            connection = await self._acquire()
+            try:
+                result = await connection.session.call_tool(name, arguments=arguments)
+                connection.last_checked = time.monotonic()
+                return result
+            except CONNECTION_ERRORS:
+                if attempt:
+                    raise
+                await self._discard(connection)
+            finally:
+                connection.in_flight -= 1
+
+    async def close(self):
+        self._closed = True
+        connections, self.connections = self.connections, list()
+        await asyncio.gather(
+            *[connection.close() for connection in connections],
+            return_exceptions=True,
+        )
+
+    async def _open(self) -> PooledSession:
+        self._pending += 1
+        try:
+            connection = PooledSession(self._connect)
+            await connection.open()
+        finally:
+            self._pending -= 1
+        self.connections.append(connection)
+        return connection
+
+    async def _discard(self, connection: PooledSession):
+        if connection in self.connections:
+            self.connections.remove(connection)
+        await connection.close()
+
+    async def _acquire(self) -> PooledSession:
+        if self._closed:
+            raise RuntimeError("MCP session pool is closed")
+
+        while True:
+            for connection in [c for c in self.connections if not c.healthy]:
+                await self._discard(connection)
+
+            if not self.connections and not self._pending:
+                connection = await self._open()
+            elif (
+                self.connections
+                and min(c.in_flight for c in self.connections) > 0
+                and len(self.connections) + self._pending < self.max_size
+            ):
+                connection = await self._open()
+            elif not self.connections:
+                # Another task is opening the only connection
+                await asyncio.sleep(0.01)
+                continue
+            else:
+                least_busy = min(c.in_flight for c in self.connections)
+                candidates = [c for c in self.connections if c.in_flight == least_busy]
+                connection = candidates[next(self._round_robin) % len(candidates)]
+
+            connection.in_flight += 1
+            if await self._check(connection):
+                return connection
+            connection.in_flight -= 1
+            await self._discard(connection)
+
+    async def _check(self, connection: PooledSession) -> bool:
+        if not connection.healthy:
+            return False
+        if (
+            connection.in_flight > 1
+            or time.monotonic() - connection.last_checked < self.health_check_interval
+        ):
+            return True
+        try:
+            await asyncio.wait_for(
+                connection.session.send_ping(), timeout=self.ping_timeout
+            )
+        except Exception:
+            return False
+        connection.last_checked = time.monotonic()
+        return True
@@ -1,7 +1,12 @@
+import os
+import random
+import tempfile
 from typing import Any, Dict, Literal
 import unittest
+from unittest import mock
 
-from InlineAgent.action_group import ActionGroupBuilder
+from InlineAgent.action_group import ActionGroup, ActionGroupBuilder
+from InlineAgent.agent import require_confirmation
 
 
 def spider_run(website_url: str, mode: Literal["scrape", "crawl"] = "scrape"):
@@ -286,3 +291,151 @@ class TestActionGroupBuilder(unittest.TestCase):
         self.assertEqual(
             ActionGroupBuilder.create_function_schema(spider_run), spider_run_schema
         )
+
+
+def legacy_clean_string(line: str) -> str:
+    clean_line = str()
+    prev_char: str = None
+    for character in line:
+
+        if character == " ":
+            prev_char = " "
+        else:
+            if prev_char == " ":
+                clean_line += " " + character
+            else:
+                clean_line += character
+            prev_char = character
+    return clean_line
+
+
+def make_tool(name: str, doc: str):
+    def tool(value: str, count: int = 1):
+        pass
+
+    tool.__name__ = name
+    tool.__qualname__ = name
+    tool.__doc__ = doc
+    return tool
+
+
+class TestFunctionSchemaCache(unittest.TestCase):
+    def setUp(self):
+        ActionGroupBuilder.clear_schema_cache()
+        self.addCleanup(ActionGroupBuilder.clear_schema_cache)
+
+    def parse_docstring_spy(self):
+        patcher = mock.patch.object(
+            ActionGroupBuilder,
+            "parse_docstring",
+            wraps=ActionGroupBuilder.parse_docstring,
+        )
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_clean_string_matches_legacy_parser(self):
+        rng = random.Random(0)
+        for _ in range(500):
+            line = "".join(
+                rng.choice([" ", " ", "a", "b", "\t", "\n", ":", "("])
+                for _ in range(rng.randint(0, 40))
+            )
+            self.assertEqual(
+                ActionGroupBuilder.clean_string(line), legacy_clean_string(line)
+            )
+
+    def test_schema_is_parsed_once_per_function(self):
+        parse_docstring = self.parse_docstring_spy()
+
+        first = ActionGroupBuilder.create_function_schema(spider_run)
+        second = ActionGroupBuilder.create_function_schema(spider_run)
+
+        self.assertEqual(first, spider_run_schema)
+        self.assertEqual(second, spider_run_schema)
+        self.assertEqual(parse_docstring.call_count, 1)
+
+    def test_returned_schema_is_a_copy(self):
+        schema = ActionGroupBuilder.create_function_schema(spider_run)
+        schema["parameters"]["mode"]["required"] = True
+        schema["name"] = "changed"
+
+        self.assertEqual(
+            ActionGroupBuilder.create_function_schema(spider_run), spider_run_schema
+        )
+
+    def test_cache_is_invalidated_by_docstring_and_keys(self):
+        parse_docstring = self.parse_docstring_spy()
+        tool = make_tool("tool", "First description")
+
+        ActionGroupBuilder.create_function_schema(tool)
+        tool.__doc__ = "Second description"
+        schema = ActionGroupBuilder.create_function_schema(tool)
+        ActionGroupBuilder.create_function_schema(tool, argument_key="Args:")
+
+        self.assertEqual(schema["description"], "Second description")
+        self.assertEqual(parse_docstring.call_count, 3)
+
+    def test_functions_sharing_code_are_cached_separately(self):
+        first = make_tool("first", "First tool")
+        second = make_tool("second", "Second tool")
+        self.assertIs(first.__code__, second.__code__)
+
+        self.assertEqual(
+            ActionGroupBuilder.create_function_schema(first)["name"], "first"
+        )
+        self.assertEqual(
+            ActionGroupBuilder.create_function_schema(second)["description"],
+            "Second tool",
+        )
+
+    def test_confirmation_wrapper_is_cached_separately(self):
+        confirmed = require_confirmation(spider_run)
+
+        self.assertEqual(
+            ActionGroupBuilder.create_function_schema(spider_run)[
+                "requireConfirmation"
+            ],
+            "DISABLED",
+        )
+        self.assertEqual(
+            ActionGroupBuilder.create_function_schema(confirmed)["requireConfirmation"],
+            "ENABLED",
+        )
+
+    def test_export_and_load_function_schemas(self):
+        tools = [make_tool(f"tool_{i}", f"Tool number {i}") for i in range(5)]
+        action_group = ActionGroup(name="Tools", tools=tools)
+        expected = [ActionGroupBuilder.create_function_schema(tool) for tool in tools]
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "schemas", "tools.json")
+            self.assertEqual(
+                ActionGroupBuilder.export_function_schemas([action_group], path), 5
+            )
+
+            ActionGroupBuilder.clear_schema_cache()
+            self.assertEqual(ActionGroupBuilder.load_function_schemas(path), 5)
+
+        parse_docstring = self.parse_docstring_spy()
+        self.assertEqual(
+            [ActionGroupBuilder.create_function_schema(tool) for tool in tools],
+            expected,
+        )
+        self.assertEqual(parse_docstring.call_count, 0)
+
+        # A changed docstring no longer matches the exported fingerprint
+        tools[0].__doc__ = "Changed"
+        self.assertEqual(
+            ActionGroupBuilder.create_function_schema(tools[0])["description"],
+            "Changed",
+        )
+        self.assertEqual(parse_docstring.call_count, 1)
+
+    def test_load_rejects_unknown_version(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tools.json")
+            with open(path, "w") as file:
+                file.write('{"version": 99, "schemas": {}}')
+
+            with self.assertRaises(ValueError):
+                ActionGroupBuilder.load_function_schemas(path)
@@ -0,0 +1,227 @@
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+from InlineAgent.agent import (
+    AsyncBedrockAgentRuntime,
+    AsyncEventStream,
+    FinalResponseEvent,
+    InlineAgent,
+    ReturnControlEvent,
+    TextDelta,
+    TraceEvent,
+    UsageEvent,
+)
+from InlineAgent.clients import client_registry
+
+
+recorded_completion = [
+    {"chunk": {"bytes": b"The weather "}},
+    {"chunk": {"bytes": b"in Seattle "}},
+    {"chunk": {"bytes": b"is sunny."}},
+]
+
+
+recorded_return_control = [
+    {
+        "trace": {
+            "trace": {
+                "orchestrationTrace": {
+                    "modelInvocationOutput": {
+                        "metadata": {"usage": {"inputTokens": 100, "outputTokens": 20}}
+                    }
+                }
+            }
+        }
+    },
+    {
+        "returnControl": {
+            "invocationInputs": [
+                {
+                    "functionInvocationInput": {
+                        "actionGroup": "WeatherActionGroup",
+                        "parameters": [
+                            {"name": "location", "type": "string", "value": "Seattle"}
+                        ],
+                        "function": "get_current_weather",
+                        "actionInvocationType": "RESULT",
+                        "agentId": "INLINE_AGENT",
+                    }
+                }
+            ],
+            "invocationId": "MOCK_INVOCATION_ID",
+        }
+    },
+]
+
+
+def get_current_weather(location: str):
+    return f"{location} is sunny."
+
+
+class SlowEventStream:
+    """Replays recorded events, blocking like a network read before each one."""
+
+    def __init__(self, events, delay: float = 0.0):
+        self.events = events
+        self.delay = delay
+        self.closed = False
+
+    def __iter__(self):
+        for event in self.events:
+            time.sleep(self.delay)
+            yield event
+
+    def close(self):
+        self.closed = True
+
+
+class StubBedrockAgentRuntime:
+    """Replays one recorded completion per invoke_inline_agent call."""
+
+    def __init__(self, *completions, delay: float = 0.0):
+        self.completions = completions
+        self.delay = delay
+        self.calls = []
+
+    def invoke_inline_agent(self, **kwargs):
+        self.calls.append(kwargs)
+        events = self.completions[min(len(self.calls), len(self.completions)) - 1]
+        return {
+            "completion": SlowEventStream(events, delay=self.delay),
+            "ResponseMetadata": {"RequestId": "MOCK_REQUEST_ID", "RetryAttempts": 0},
+        }
+
+
+class TestAsyncEventStream(unittest.IsolatedAsyncioTestCase):
+    async def test_replays_events(self):
+        stream = AsyncEventStream(SlowEventStream(recorded_completion))
+
+        events = [event async for event in stream]
+
+        self.assertEqual(events, recorded_completion)
+
+    async def test_close(self):
+        event_stream = SlowEventStream(recorded_completion)
+        stream = AsyncEventStream(event_stream)
+
+        await stream.close()
+
+        self.assertTrue(event_stream.closed)
+
+    async def test_does_not_block_event_loop(self):
+        stream = AsyncEventStream(SlowEventStream(recorded_completion, delay=0.1))
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker_task = asyncio.create_task(ticker())
+        _ = [event async for event in stream]
+        ticker_task.cancel()
+
+        self.assertGreater(ticks, 10)
+
+    async def test_runtime_invoke_inline_agent(self):
+        client = StubBedrockAgentRuntime(recorded_completion)
+        runtime = AsyncBedrockAgentRuntime(client=client)
+
+        response = await runtime.invoke_inline_agent(sessionId="MOCK", inputText="Hi")
+        events = [event async for event in runtime.stream(response["completion"])]
+
+        self.assertEqual(client.calls, [{"sessionId": "MOCK", "inputText": "Hi"}])
+        self.assertEqual(events, recorded_completion)
+
+
+class TestInlineAgentInvoke(unittest.IsolatedAsyncioTestCase):
+    def get_agent(self):
+        return InlineAgent(
+            foundation_model="MOCK_ID",
+            instruction="You are a friendly assistant that is responsible for getting the current weather.",
+            agent_name="MockAgent",
+        )
+
+    async def test_invoke(self):
+        client = StubBedrockAgentRuntime(recorded_completion)
+        agent = self.get_agent()
+
+        with mock.patch.object(client_registry, "client", return_value=client):
+            with mock.patch("builtins.print"):
+                answer = await agent.invoke(
+                    input_text="What is the weather in Seattle?",
+                    session_id="MOCK_SESSION",
+                    enable_trace=False,
+                )
+
+        self.assertEqual(answer, "The weather in Seattle is sunny.")
+        self.assertEqual(client.calls[0]["sessionId"], "MOCK_SESSION")
+
+    async def test_concurrent_invoke(self):
+        delay = 0.1
+        client = StubBedrockAgentRuntime(recorded_completion, delay=delay)
+        agent = self.get_agent()
+        sessions = 8
+
+        with mock.patch.object(client_registry, "client", return_value=client):
+            with mock.patch("builtins.print"):
+                start = time.perf_counter()
+                answers = await asyncio.gather(
+                    *[
+                        agent.invoke(
+                            input_text="What is the weather in Seattle?",
+                            session_id=f"MOCK_SESSION_{idx}",
+                            enable_trace=False,
+                        )
+                        for idx in range(sessions)
+                    ]
+                )
+                duration = time.perf_counter() - start
+
+        self.assertEqual(answers, ["The weather in Seattle is sunny."] * sessions)
+        serial_duration = sessions * len(recorded_completion) * delay
+        self.assertLess(duration, serial_duration / 2)
+
+    async def test_invoke_stream(self):
+        client = StubBedrockAgentRuntime(recorded_return_control, recorded_completion)
+        agent = self.get_agent()
+        agent.tool_map = {"get_current_weather": get_current_weather}
+
+        with mock.patch.object(client_registry, "client", return_value=client):
+            with mock.patch("builtins.print") as mock_print:
+                events = [
+                    event
+                    async for event in agent.invoke_stream(
+                        input_text="What is the weather in Seattle?",
+                        session_id="MOCK_SESSION",
+                    )
+                ]
+
+        self.assertEqual(
+            [type(event) for event in events],
+            [TraceEvent, ReturnControlEvent]
+            + [TextDelta] * len(recorded_completion)
+            + [UsageEvent, FinalResponseEvent],
+        )
+        self.assertEqual(events[0].input_tokens, 100)
+        self.assertEqual(
+            events[1].session_state["returnControlInvocationResults"][0][
+                "functionResult"
+            ]["responseBody"]["TEXT"]["body"],
+            "Seattle is sunny.",
+        )
+        self.assertEqual(
+            client.calls[1]["inlineSessionState"], events[1].session_state
+        )
+        self.assertNotIn("inlineSessionState", agent.get_invoke_params())
+        self.assertEqual(events[-2].input_tokens, 100)
+        self.assertEqual(events[-2].llm_calls, 1)
+        self.assertEqual(events[-1].text, "The weather in Seattle is sunny.")
+        mock_print.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
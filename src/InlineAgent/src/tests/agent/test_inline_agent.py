@@ -584,6 +584,53 @@ class TestInlineAgent(unittest.TestCase):
 
         self.assertEqual(agent.action_groups, data_test___init___8)
 
+    def test_get_invoke_params_cache_1(self):
+        agent = InlineAgent(
+            foundation_model="MOCK_ID",
+            instruction="You are a friendly assistant that is responsible for getting the current weather.",
+            user_input=True,
+            agent_name="MockAgent",
+        )
+
+        invoke_params = agent.get_invoke_params()
+        self.assertIs(agent.get_invoke_params(), invoke_params)
+
+        agent.instruction = "You are a friendly assistant."
+        self.assertEqual(
+            agent.get_invoke_params()["instruction"], "You are a friendly assistant."
+        )
+
+        agent.action_groups.append({"actionGroupName": "MockActionGroup"})
+        agent.invalidate_invoke_params()
+        self.assertEqual(len(agent.get_invoke_params()["actionGroups"]), 2)
+
+    def test_get_invoke_params_cache_2(self):
+        collaborator = InlineAgent(
+            foundation_model="MOCK_ID",
+            instruction="You are a collaborator.",
+            user_input=True,
+            agent_name="MockCollaborator",
+        )
+        supervisor = InlineAgent(
+            foundation_model="MOCK_ID",
+            instruction="You are a supervisor.",
+            agent_name="MockSupervisor",
+            agent_collaboration="SUPERVISOR",
+            collaborators=[collaborator],
+        )
+
+        invoke_params = supervisor.get_invoke_params()
+        self.assertIs(supervisor.get_invoke_params(), invoke_params)
+        self.assertEqual(
+            invoke_params["collaborators"][0]["instruction"], "You are a collaborator."
+        )
+
+        collaborator.instruction = "You are an updated collaborator."
+        self.assertEqual(
+            supervisor.get_invoke_params()["collaborators"][0]["instruction"],
+            "You are an updated collaborator.",
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
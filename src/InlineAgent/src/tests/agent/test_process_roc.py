@@ -3,6 +3,7 @@ import json
 import unittest
 from unittest import mock
 import asyncio
+import time
 from InlineAgent.agent import ProcessROC
 from InlineAgent.agent.confirmation import require_confirmation
 
@@ -469,6 +470,125 @@ class TestProcessROC(unittest.IsolatedAsyncioTestCase):
         )
         self.assertEqual(functionResult, output_invoke_roc_function_without_confirm)
 
+    async def test_concurrent_tools_1(self):
+        async def slow_async_lookup(place: str):
+            await asyncio.sleep(0.2)
+            return f"async {place}"
+
+        def slow_sync_lookup(place: str):
+            time.sleep(0.2)
+            return f"sync {place}"
+
+        tools = {
+            "slow_async_lookup": slow_async_lookup,
+            "slow_sync_lookup": slow_sync_lookup,
+        }
+        functions = ["slow_sync_lookup", "slow_async_lookup"] * 2
+        roc_event = {
+            "invocationInputs": [
+                {
+                    "functionInvocationInput": {
+                        "actionGroup": "LookupActionGroup",
+                        "parameters": [
+                            {"name": "place", "type": "string", "value": str(idx)}
+                        ],
+                        "function": function,
+                        "actionInvocationType": "RESULT",
+                        "agentId": "INLINE_AGENT",
+                    }
+                }
+                for idx, function in enumerate(functions)
+            ],
+            "invocationId": "MOCKID",
+        }
+
+        with mock.patch("builtins.print"):
+            start = time.perf_counter()
+            session_state_output = await ProcessROC.process_roc(
+                inlineSessionState=dict(),
+                roc_event=roc_event,
+                tool_map=tools,
+            )
+            duration = time.perf_counter() - start
+
+        self.assertLess(duration, 0.6)
+        self.assertEqual(
+            [
+                result["functionResult"]["responseBody"]["TEXT"]["body"]
+                for result in session_state_output["returnControlInvocationResults"]
+            ],
+            ["sync 0", "async 1", "sync 2", "async 3"],
+        )
+
+    async def test_concurrent_tools_2(self):
+        running = 0
+        max_running = 0
+
+        async def lookup(place: str):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.05)
+            running -= 1
+            return place
+
+        roc_event = {
+            "invocationInputs": [
+                {
+                    "functionInvocationInput": {
+                        "actionGroup": "LookupActionGroup",
+                        "parameters": [
+                            {"name": "place", "type": "string", "value": str(idx)}
+                        ],
+                        "function": "lookup",
+                        "actionInvocationType": "RESULT",
+                        "agentId": "INLINE_AGENT",
+                    }
+                }
+                for idx in range(6)
+            ],
+            "invocationId": "MOCKID",
+        }
+
+        with mock.patch("builtins.print"):
+            await ProcessROC.process_roc(
+                inlineSessionState=dict(),
+                roc_event=roc_event,
+                tool_map={"lookup": lookup},
+                max_concurrency=2,
+            )
+
+        self.assertEqual(max_running, 2)
+
+    async def test_tool_timeout(self):
+        async def hanging_lookup(place: str):
+            await asyncio.sleep(10)
+
+        roc_event = copy.deepcopy(event_without_confirmation_two_tool_invoke)[
+            "returnControl"
+        ]
+        roc_event["invocationInputs"][0]["functionInvocationInput"][
+            "function"
+        ] = "hanging_lookup"
+        tools = copy.deepcopy(tools_without_confirmation)
+        tools["hanging_lookup"] = hanging_lookup
+
+        with mock.patch("builtins.print"):
+            session_state_output = await ProcessROC.process_roc(
+                inlineSessionState=dict(),
+                roc_event=roc_event,
+                tool_map=tools,
+                tool_timeout=0.1,
+            )
+
+        results = session_state_output["returnControlInvocationResults"]
+        self.assertEqual(results[0]["functionResult"]["responseState"], "FAILURE")
+        self.assertEqual(
+            results[1], output_without_confirmation_two_tool_invoke[
+                "returnControlInvocationResults"
+            ][1]
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
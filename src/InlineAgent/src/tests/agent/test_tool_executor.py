@@ -0,0 +1,201 @@
+import asyncio
+import os
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from InlineAgent.action_group import ActionGroup, ActionGroups
+from InlineAgent.agent import ProcessROC, run_in_executor, shutdown_executors
+
+
+@run_in_executor("process", timeout=10)
+def process_id() -> str:
+    """Return the ID of the process the tool runs in."""
+    return str(os.getpid())
+
+
+@run_in_executor
+def thread_name() -> str:
+    """Return the name of the thread the tool runs in."""
+    return threading.current_thread().name
+
+
+def blocking_lookup() -> str:
+    """Block like a slow HTTP call."""
+    time.sleep(0.3)
+    return "Seattle"
+
+
+@run_in_executor(timeout=0.1)
+def slow_lookup() -> str:
+    """Block for longer than the tool timeout."""
+    time.sleep(0.3)
+    return "Seattle"
+
+
+def roc_event(*functions, action_group="LookupActionGroup"):
+    return {
+        "invocationInputs": [
+            {
+                "functionInvocationInput": {
+                    "actionGroup": action_group,
+                    "parameters": [],
+                    "function": function,
+                    "actionInvocationType": "RESULT",
+                    "agentId": "INLINE_AGENT",
+                }
+            }
+            for function in functions
+        ],
+        "invocationId": "MOCKID",
+    }
+
+
+def function_results(session_state):
+    return [
+        result["functionResult"]
+        for result in session_state["returnControlInvocationResults"]
+    ]
+
+
+class TestToolExecutor(unittest.IsolatedAsyncioTestCase):
+    def tearDown(self):
+        shutdown_executors()
+
+    async def process_roc(self, roc_event, tools, **kwargs):
+        with mock.patch("builtins.print"):
+            return await ProcessROC.process_roc(
+                inlineSessionState=dict(), roc_event=roc_event, tool_map=tools, **kwargs
+            )
+
+    async def test_process_tool_runs_in_another_process(self):
+        state = await self.process_roc(
+            roc_event("process_id"), {"process_id": process_id}
+        )
+
+        (result,) = function_results(state)
+        self.assertNotIn("responseState", result)
+        self.assertNotEqual(result["responseBody"]["TEXT"]["body"], str(os.getpid()))
+
+    async def test_thread_tool_runs_in_shared_pool(self):
+        state = await self.process_roc(
+            roc_event("thread_name"), {"thread_name": thread_name}
+        )
+
+        (result,) = function_results(state)
+        self.assertTrue(result["responseBody"]["TEXT"]["body"].startswith("roc-tool"))
+
+    async def test_action_group_executor(self):
+        with ThreadPoolExecutor(thread_name_prefix="quotes") as executor:
+            state = await self.process_roc(
+                roc_event("name", action_group="Quotes"),
+                {"name": lambda: threading.current_thread().name},
+                action_group_executors={"Quotes": (executor, None)},
+            )
+
+        (result,) = function_results(state)
+        self.assertTrue(result["responseBody"]["TEXT"]["body"].startswith("quotes"))
+
+    async def test_event_loop_is_not_blocked(self):
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(heartbeat())
+        await self.process_roc(
+            roc_event("blocking_lookup"),
+            {"blocking_lookup": blocking_lookup},
+            action_group_executors={"LookupActionGroup": ("thread", None)},
+        )
+        task.cancel()
+
+        self.assertGreater(ticks, 10)
+
+    async def test_tool_timeout_is_a_failure(self):
+        start = time.perf_counter()
+        state = await self.process_roc(
+            roc_event("slow_lookup", "blocking_lookup"),
+            {"slow_lookup": slow_lookup, "blocking_lookup": blocking_lookup},
+            # The decorator's timeout wins over the action group's
+            action_group_executors={"LookupActionGroup": ("thread", 5)},
+        )
+
+        slow, blocking = function_results(state)
+        self.assertEqual(slow["responseState"], "FAILURE")
+        self.assertIn(
+            "timed out after 0.1 seconds", slow["responseBody"]["TEXT"]["body"]
+        )
+        self.assertNotIn("responseState", blocking)
+        self.assertLess(time.perf_counter() - start, 0.6)
+
+    async def test_action_group_timeout(self):
+        state = await self.process_roc(
+            roc_event("blocking_lookup"),
+            {"blocking_lookup": blocking_lookup},
+            tool_timeout=5,
+            action_group_executors={"LookupActionGroup": (None, 0.1)},
+        )
+
+        (result,) = function_results(state)
+        self.assertEqual(result["responseState"], "FAILURE")
+
+    async def test_cancelled_tool_is_a_failure(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+
+        async def shutdown_soon():
+            await asyncio.sleep(0.05)
+            # The second lookup is still queued behind the first
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        shutdown = asyncio.create_task(shutdown_soon())
+        state = await self.process_roc(
+            roc_event("blocking_lookup", "blocking_lookup"),
+            {"blocking_lookup": blocking_lookup},
+            executor=executor,
+        )
+        await shutdown
+
+        first, second = function_results(state)
+        self.assertNotIn("responseState", first)
+        self.assertEqual(second["responseState"], "FAILURE")
+        self.assertIn("was cancelled", second["responseBody"]["TEXT"]["body"])
+
+    async def test_cancelling_the_invocation_propagates(self):
+        task = asyncio.create_task(
+            self.process_roc(
+                roc_event("blocking_lookup"), {"blocking_lookup": blocking_lookup}
+            )
+        )
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+
+class TestActionGroupToolExecutors(unittest.TestCase):
+    def test_tool_executors(self):
+        action_groups = ActionGroups(
+            action_groups=[
+                ActionGroup(
+                    name="Quotes",
+                    tools=[blocking_lookup],
+                    tool_executor="process",
+                    tool_timeout=30,
+                ),
+                ActionGroup(name="Lookups", tools=[slow_lookup]),
+            ]
+        )
+
+        self.assertEqual(action_groups.tool_executors, {"Quotes": ("process", 30)})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,366 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from unittest import mock
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+
+from InlineAgent.observability import agent_instrument, process, span_manager
+from InlineAgent.observability.agent_instrument import observe
+from InlineAgent.observability.span_manager import LightSpanManager, SpanManager
+from InlineAgent.observability.semantics import SpanName
+
+AGENT_ID = "AGENT"
+AGENT_ALIAS_ID = "ALIAS"
+ALIAS_ARN = (
+    f"arn:aws:bedrock:us-east-1:123456789012:agent-alias/{AGENT_ID}/{AGENT_ALIAS_ID}"
+)
+
+
+def make_events(session_id: str, answer: str, intervene: bool):
+    events = list()
+    if intervene:
+        events.append(
+            {
+                "trace": {
+                    "sessionId": session_id,
+                    "callerChain": [{"agentAliasArn": ALIAS_ARN}],
+                    "trace": {
+                        "guardrailTrace": {
+                            "action": "INTERVENED",
+                            "outputAssessments": [{"topicPolicy": {}}],
+                        }
+                    },
+                }
+            }
+        )
+        # The guardrail message replaces the streamed answer in a single chunk
+        events.append({"chunk": {"bytes": answer.encode("utf8")}})
+        return events
+
+    for word in answer.split(" "):
+        events.append({"chunk": {"bytes": (word + " ").encode("utf8")}})
+    return events
+
+
+class SlowIterator:
+    """Yields events with a small pause so concurrent invocations interleave."""
+
+    def __init__(self, events, delay=0.001):
+        self.events = iter(events)
+        self.delay = delay
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        time.sleep(self.delay)
+        return next(self.events)
+
+
+class AsyncSlowIterator:
+    def __init__(self, events, delay=0.001):
+        self.events = iter(events)
+        self.delay = delay
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(self.delay)
+        try:
+            return next(self.events)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+def agent_kwargs():
+    return {
+        "agentId": AGENT_ID,
+        "agentAliasId": AGENT_ALIAS_ID,
+        "streamingConfigurations": {"streamFinalResponse": True},
+    }
+
+
+class TestObserveConcurrency(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(self.exporter))
+        tracer = provider.get_tracer("test")
+
+        for patcher in (
+            mock.patch.object(agent_instrument, "tracer", tracer),
+            mock.patch.object(span_manager, "tracer", tracer),
+            mock.patch.object(
+                agent_instrument.config, "PRODUCE_BEDROCK_OTEL_TRACES", True
+            ),
+            mock.patch("builtins.print"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def cases(self, n=16):
+        return [(f"session-{i}", f"answer number {i}", i % 2 == 0) for i in range(n)]
+
+    def assert_isolated(self, cases, answers):
+        spans = self.exporter.get_finished_spans()
+        roots = {
+            span.attributes.get("session.id"): span
+            for span in spans
+            if span.parent is None
+        }
+        guardrails = [span for span in spans if span.name == SpanName.GUARDRAIL.value]
+
+        self.assertEqual(len(roots), len(cases))
+        for (session_id, answer, intervene), result in zip(cases, answers):
+            self.assertEqual(result.strip(), answer)
+            root = roots[session_id]
+            self.assertEqual(root.attributes["output.value"].strip(), answer)
+
+            children = [
+                span
+                for span in guardrails
+                if span.parent.span_id == root.context.span_id
+            ]
+            self.assertEqual(len(children), 1 if intervene else 0, session_id)
+
+    def test_threads_do_not_share_guardrail_state(self):
+        cases = self.cases()
+        barrier = threading.Barrier(len(cases))
+
+        @observe(show_traces=False)
+        def invoke(inputText, sessionId, **kwargs):
+            _, answer, intervene = next(c for c in cases if c[0] == sessionId)
+            barrier.wait()
+            return {
+                "completion": SlowIterator(make_events(sessionId, answer, intervene))
+            }
+
+        with ThreadPoolExecutor(max_workers=len(cases)) as pool:
+            futures = [
+                pool.submit(
+                    invoke, inputText="hi", sessionId=session_id, **agent_kwargs()
+                )
+                for session_id, _, _ in cases
+            ]
+            answers = [future.result() for future in futures]
+
+        self.assert_isolated(cases, answers)
+
+    async def test_async_invocations_do_not_share_guardrail_state(self):
+        cases = self.cases()
+
+        @observe(show_traces=False)
+        async def invoke(inputText, sessionId, **kwargs):
+            _, answer, intervene = next(c for c in cases if c[0] == sessionId)
+            await asyncio.sleep(0)
+            return {
+                "completion": AsyncSlowIterator(
+                    make_events(sessionId, answer, intervene)
+                )
+            }
+
+        answers = await asyncio.gather(
+            *[
+                invoke(inputText="hi", sessionId=session_id, **agent_kwargs())
+                for session_id, _, _ in cases
+            ]
+        )
+
+        self.assert_isolated(cases, answers)
+
+    async def test_async_wrapper_reads_sync_event_stream_off_loop(self):
+        cases = self.cases(4)
+
+        @observe(show_traces=False)
+        async def invoke(inputText, sessionId, **kwargs):
+            _, answer, intervene = next(c for c in cases if c[0] == sessionId)
+            return {
+                "completion": SlowIterator(make_events(sessionId, answer, intervene))
+            }
+
+        answers = await asyncio.gather(
+            *[
+                invoke(inputText="hi", sessionId=session_id, **agent_kwargs())
+                for session_id, _, _ in cases
+            ]
+        )
+
+        self.assert_isolated(cases, answers)
+
+    def test_intervention_does_not_leak_into_next_invocation(self):
+        cases = [
+            ("session-a", "blocked", True),
+            ("session-b", "allowed answer", False),
+        ]
+
+        @observe(show_traces=False)
+        def invoke(inputText, sessionId, **kwargs):
+            _, answer, intervene = next(c for c in cases if c[0] == sessionId)
+            return {"completion": make_events(sessionId, answer, intervene)}
+
+        answers = [
+            invoke(inputText="hi", sessionId=session_id, **agent_kwargs())
+            for session_id, _, _ in cases
+        ]
+
+        self.assert_isolated(cases, answers)
+
+
+def orchestration_events(session_id: str):
+    trace_id = "0" * 36 + "-0"
+
+    def trace(orchestration):
+        return {
+            "trace": {
+                "agentVersion": "DRAFT",
+                "sessionId": session_id,
+                "eventTime": datetime.now(timezone.utc),
+                "callerChain": [{"agentAliasArn": ALIAS_ARN}],
+                "trace": {"orchestrationTrace": orchestration},
+            }
+        }
+
+    return [
+        trace(
+            {
+                "modelInvocationInput": {
+                    "traceId": trace_id,
+                    "text": "prompt",
+                    "inferenceConfiguration": {
+                        "maximumLength": 2048,
+                        "temperature": 0,
+                        "topP": 1,
+                        "topK": 250,
+                        "stopSequences": [],
+                    },
+                }
+            }
+        ),
+        trace(
+            {
+                "modelInvocationOutput": {
+                    "traceId": trace_id,
+                    "rawResponse": {"content": '{"model": "model"}'},
+                    "metadata": {"usage": {"inputTokens": 10, "outputTokens": 5}},
+                }
+            }
+        ),
+        trace(
+            {
+                "invocationInput": {
+                    "traceId": trace_id,
+                    "invocationType": "ACTION_GROUP",
+                    "actionGroupInvocationInput": {
+                        "actionGroupName": "Tools",
+                        "function": "lookup",
+                        "parameters": [],
+                    },
+                }
+            }
+        ),
+        trace(
+            {
+                "observation": {
+                    "traceId": trace_id,
+                    "actionGroupInvocationOutput": {"text": "result"},
+                }
+            }
+        ),
+        trace(
+            {
+                "observation": {
+                    "traceId": trace_id,
+                    "finalResponse": {"text": "Done"},
+                }
+            }
+        ),
+        {"chunk": {"bytes": b"Done"}},
+    ]
+
+
+class TestLowOverheadMode(unittest.TestCase):
+    def setUp(self):
+        self.exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(self.exporter))
+        tracer = provider.get_tracer("test")
+
+        for patcher in (
+            mock.patch.object(agent_instrument, "tracer", tracer),
+            mock.patch.object(span_manager, "tracer", tracer),
+            mock.patch.object(
+                agent_instrument.config, "PRODUCE_BEDROCK_OTEL_TRACES", True
+            ),
+            mock.patch.object(process.config, "PRODUCE_BEDROCK_OTEL_TRACES", True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def invoke(self, low_overhead: bool):
+        @observe(low_overhead=low_overhead)
+        def invoke(inputText, sessionId, **kwargs):
+            return {"completion": orchestration_events(sessionId)}
+
+        self.exporter.clear()
+        answer = invoke(
+            inputText="hi",
+            sessionId="session",
+            agentId=AGENT_ID,
+            agentAliasId=AGENT_ALIAS_ID,
+        )
+        spans = self.exporter.get_finished_spans()
+        names = {span.context.span_id: span.name for span in spans}
+        return answer, sorted(
+            (span.name, names.get(span.parent.span_id) if span.parent else None)
+            for span in spans
+        )
+
+    def test_low_overhead_produces_same_spans(self):
+        with mock.patch("builtins.print"):
+            expected_answer, expected_spans = self.invoke(low_overhead=False)
+
+        with mock.patch("builtins.print") as mock_print:
+            answer, spans = self.invoke(low_overhead=True)
+
+        mock_print.assert_not_called()
+        self.assertEqual(answer, expected_answer)
+        self.assertEqual(spans, expected_spans)
+        self.assertEqual(len(spans), 4)
+
+    def test_observer_uses_light_span_manager(self):
+        observer = agent_instrument.InvocationObserver(
+            inputText="hi",
+            sessionId="session",
+            kwargs={"agentId": AGENT_ID, "agentAliasId": AGENT_ALIAS_ID},
+            low_overhead=True,
+        )
+        self.assertIsInstance(observer.span_manager, LightSpanManager)
+        self.assertFalse(observer.show_traces)
+
+        with mock.patch.object(agent_instrument.config, "TRACE_LOW_OVERHEAD", True):
+
+            @observe()
+            def invoke(inputText, sessionId, **kwargs):
+                return {"completion": [{"chunk": {"bytes": b"ok"}}]}
+
+            with mock.patch("builtins.print") as mock_print:
+                self.assertEqual(invoke(inputText="hi", sessionId="other"), "ok")
+            mock_print.assert_not_called()
+
+        observer = agent_instrument.InvocationObserver(
+            inputText="hi", sessionId="session", kwargs={}
+        )
+        self.assertIsInstance(observer.span_manager, SpanManager)
+
+
+if __name__ == "__main__":
+    unittest.main()
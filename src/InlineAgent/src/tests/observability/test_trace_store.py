@@ -0,0 +1,140 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from InlineAgent.observability import TraceWriter, read_session_traces
+from InlineAgent.observability.trace_store import trace_file_path, zstandard
+
+
+def trace_event(idx: int):
+    return {
+        "sessionId": "MOCK_SESSION",
+        "trace": {"orchestrationTrace": {"rationale": {"text": f"Step {idx}"}}},
+    }
+
+
+class TestTraceWriter(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write_and_read(self, **kwargs):
+        writer = TraceWriter(directory=self.directory.name, **kwargs)
+        for idx in range(250):
+            writer.write(session_id="MOCK_SESSION", trace_data=trace_event(idx))
+        writer.close()
+        return read_session_traces("MOCK_SESSION", directory=self.directory.name)
+
+    def test_append_only_jsonl(self):
+        events = self.write_and_read(max_buffered_events=50)
+
+        self.assertEqual(events, [trace_event(idx) for idx in range(250)])
+        with open(trace_file_path("MOCK_SESSION", self.directory.name)) as file:
+            self.assertEqual(len(file.readlines()), 250)
+
+    def test_gzip(self):
+        events = self.write_and_read(compression="gzip", max_buffered_events=50)
+
+        self.assertEqual(events, [trace_event(idx) for idx in range(250)])
+
+    @unittest.skipIf(zstandard is None, "zstandard is not installed")
+    def test_zstd(self):
+        events = self.write_and_read(compression="zstd", max_buffered_events=50)
+
+        self.assertEqual(events, [trace_event(idx) for idx in range(250)])
+
+    def test_fsync_always(self):
+        writer = TraceWriter(directory=self.directory.name, fsync="always")
+        writer.write(session_id="MOCK_SESSION", trace_data=trace_event(0))
+
+        self.assertEqual(
+            read_session_traces("MOCK_SESSION", directory=self.directory.name),
+            [trace_event(0)],
+        )
+        writer.close()
+
+    def test_flush(self):
+        writer = TraceWriter(directory=self.directory.name, flush_interval=60)
+        writer.write(session_id="MOCK_SESSION", trace_data=trace_event(0))
+        writer.flush()
+
+        self.assertEqual(
+            read_session_traces("MOCK_SESSION", directory=self.directory.name),
+            [trace_event(0)],
+        )
+        writer.close()
+
+    def test_concurrent_sessions(self):
+        writer = TraceWriter(directory=self.directory.name, max_buffered_events=10)
+
+        def write_session(session_id):
+            for idx in range(100):
+                writer.write(session_id=session_id, trace_data=trace_event(idx))
+
+        threads = [
+            threading.Thread(target=write_session, args=(f"SESSION_{idx}",))
+            for idx in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        writer.close()
+
+        for idx in range(4):
+            self.assertEqual(
+                read_session_traces(f"SESSION_{idx}", directory=self.directory.name),
+                [trace_event(idx) for idx in range(100)],
+            )
+
+    def test_legacy_json(self):
+        with open(os.path.join(self.directory.name, "MOCK_SESSION.json"), "w") as file:
+            json.dump([trace_event(0)], file, indent=2)
+        writer = TraceWriter(directory=self.directory.name)
+        writer.write(session_id="MOCK_SESSION", trace_data=trace_event(1))
+        writer.close()
+
+        self.assertEqual(
+            read_session_traces("MOCK_SESSION", directory=self.directory.name),
+            [trace_event(0), trace_event(1)],
+        )
+
+    def test_write_error(self):
+        writer = TraceWriter(directory=self.directory.name, flush_interval=60)
+        with mock.patch.object(
+            writer, "_append", side_effect=OSError("No space left on device")
+        ), self.assertLogs("InlineAgent.observability.trace_store", "ERROR"):
+            writer.write(session_id="MOCK_SESSION", trace_data=trace_event(0))
+            self.assertTrue(writer.flush(timeout=5))
+
+        writer.write(session_id="MOCK_SESSION", trace_data=trace_event(1))
+        self.assertTrue(writer.flush(timeout=5))
+        writer.close()
+
+        self.assertEqual(
+            read_session_traces("MOCK_SESSION", directory=self.directory.name),
+            [trace_event(1)],
+        )
+
+    def test_unwritable_directory(self):
+        path = os.path.join(self.directory.name, "notadir")
+        open(path, "w").close()
+        writer = TraceWriter(directory=os.path.join(path, "sub"))
+        with self.assertLogs("InlineAgent.observability.trace_store", "ERROR"):
+            writer.write(session_id="MOCK_SESSION", trace_data=trace_event(0))
+            self.assertTrue(writer.flush(timeout=5))
+        writer.close(timeout=5)
+        self.assertFalse(writer._thread.is_alive())
+
+    def test_invalid_options(self):
+        with self.assertRaises(ValueError):
+            TraceWriter(directory=self.directory.name, compression="lz4")
+        with self.assertRaises(ValueError):
+            TraceWriter(directory=self.directory.name, fsync="sometimes")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import threading
+import unittest
+from unittest import mock
+
+from InlineAgent.clients import ClientRegistry
+
+
+class TestClientRegistry(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch("InlineAgent.clients.boto3.Session")
+        self.boto3_session = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.boto3_session.side_effect = self.create_session
+
+    def create_session(self, profile_name):
+        session = mock.MagicMock(region_name="Mock-Region")
+        session.client.side_effect = lambda *args, **kwargs: mock.MagicMock()
+        return session
+
+    def test_session_is_cached_per_profile(self):
+        registry = ClientRegistry()
+
+        self.assertIs(registry.session("default"), registry.session("default"))
+        self.assertIsNot(registry.session("default"), registry.session("other"))
+        self.assertEqual(self.boto3_session.call_count, 2)
+
+    def test_client_is_cached_per_key(self):
+        registry = ClientRegistry()
+
+        client = registry.client("bedrock-agent-runtime")
+
+        self.assertIs(client, registry.client("bedrock-agent-runtime"))
+        self.assertIsNot(client, registry.client("bedrock-agent"))
+        self.assertIsNot(
+            client, registry.client("bedrock-agent-runtime", region_name="us-west-2")
+        )
+        self.assertIsNot(
+            client,
+            registry.client("bedrock-agent-runtime", config={"read_timeout": 600}),
+        )
+        self.assertEqual(registry.session().client.call_count, 4)
+
+    def test_max_pool_connections(self):
+        registry = ClientRegistry(max_pool_connections=128)
+
+        registry.client("bedrock-agent-runtime")
+
+        config = registry.session().client.call_args.kwargs["config"]
+        self.assertEqual(config.max_pool_connections, 128)
+
+    def test_account_id_is_cached(self):
+        registry = ClientRegistry()
+        sts = registry.client("sts")
+        sts.get_caller_identity.return_value = {"Account": "Mock-Account"}
+
+        self.assertEqual(registry.account_id(), "Mock-Account")
+        self.assertEqual(registry.account_id(), "Mock-Account")
+        self.assertEqual(registry.region(), "Mock-Region")
+        sts.get_caller_identity.assert_called_once()
+
+    def test_concurrent_client_creation(self):
+        registry = ClientRegistry()
+        clients = []
+
+        def create_client():
+            clients.append(registry.client("bedrock-agent-runtime"))
+
+        threads = [threading.Thread(target=create_client) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertTrue(all(client is clients[0] for client in clients))
+        registry.session().client.assert_called_once()
+
+    def test_clear(self):
+        registry = ClientRegistry()
+        client = registry.client("bedrock-agent-runtime")
+
+        registry.clear()
+
+        self.assertIsNot(client, registry.client("bedrock-agent-runtime"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,280 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import boto3
+
+from InlineAgent.agent import CollaboratorAgent
+from InlineAgent.knowledge_base.knowledgebase_plugin import KnowledgeBasePlugin
+from InlineAgent.resolver import NameResolver
+
+
+class StubBedrockAgent:
+    """Pages knowledge bases and agents the way the control plane does."""
+
+    def __init__(self, knowledge_bases, agents, page_size=2, latency=0.0):
+        self.knowledge_bases = knowledge_bases
+        self.agents = agents
+        self.page_size = page_size
+        self.latency = latency
+        self.kb_calls = 0
+        self.agent_calls = 0
+
+    def list_knowledge_bases(self, nextToken=None):
+        self.kb_calls += 1
+        time.sleep(self.latency)
+        start = int(nextToken or 0)
+        end = start + self.page_size
+        response = {
+            "knowledgeBaseSummaries": [
+                {"name": name, "knowledgeBaseId": kb_id}
+                for name, kb_id in list(self.knowledge_bases.items())[start:end]
+            ]
+        }
+        if end < len(self.knowledge_bases):
+            response["nextToken"] = str(end)
+        return response
+
+    def get_paginator(self, operation_name):
+        assert operation_name == "list_agents"
+        return self
+
+    def paginate(self):
+        self.agent_calls += 1
+        time.sleep(self.latency)
+        items = list(self.agents.items())
+        for start in range(0, len(items), self.page_size):
+            yield {
+                "agentSummaries": [
+                    {"agentName": name, "agentId": agent_id}
+                    for name, agent_id in items[start : start + self.page_size]
+                ]
+            }
+
+
+class StubRegistry:
+    def __init__(self, bedrock_agent):
+        self.bedrock_agent = bedrock_agent
+
+    def client(self, service_name, profile="default"):
+        return self.bedrock_agent
+
+    def region(self, profile="default"):
+        return "us-east-1"
+
+
+class TestNameResolver(unittest.TestCase):
+    def setUp(self):
+        self.bedrock_agent = StubBedrockAgent(
+            knowledge_bases={f"kb-{i}": f"KBID{i}" for i in range(5)},
+            agents={f"agent-{i}": f"AGENTID{i}" for i in range(5)},
+        )
+        self.registry = StubRegistry(self.bedrock_agent)
+
+    def test_knowledge_base_on_later_page_is_found(self):
+        resolver = NameResolver(registry=self.registry)
+
+        self.assertEqual(resolver.knowledge_base_id("kb-4"), "KBID4")
+        self.assertEqual(self.bedrock_agent.kb_calls, 3)
+
+    def test_lookups_share_one_listing(self):
+        resolver = NameResolver(registry=self.registry)
+
+        for i in range(5):
+            self.assertEqual(resolver.knowledge_base_id(f"kb-{i}"), f"KBID{i}")
+            self.assertEqual(resolver.agent_id(f"agent-{i}"), f"AGENTID{i}")
+
+        self.assertEqual(self.bedrock_agent.kb_calls, 3)
+        self.assertEqual(self.bedrock_agent.agent_calls, 1)
+
+    def test_missing_name_lists_again_and_returns_none(self):
+        resolver = NameResolver(registry=self.registry)
+        with mock.patch("InlineAgent.resolver.time.time", return_value=1000.0):
+            resolver.agent_id("agent-0")
+
+        self.bedrock_agent.agents["created-later"] = "NEWID"
+        with mock.patch("InlineAgent.resolver.time.time", return_value=1031.0):
+            self.assertIsNone(resolver.agent_id("missing"))
+            self.assertEqual(self.bedrock_agent.agent_calls, 2)
+            self.assertEqual(resolver.agent_id("created-later"), "NEWID")
+
+    def test_missing_name_does_not_relist_every_lookup(self):
+        resolver = NameResolver(registry=self.registry)
+
+        with mock.patch("InlineAgent.resolver.time.time", return_value=1000.0):
+            for _ in range(10):
+                self.assertIsNone(resolver.agent_id("misspelled"))
+        self.assertEqual(self.bedrock_agent.agent_calls, 1)
+
+        with mock.patch("InlineAgent.resolver.time.time", return_value=1029.0):
+            self.assertIsNone(resolver.agent_id("misspelled"))
+        self.assertEqual(self.bedrock_agent.agent_calls, 1)
+
+        with mock.patch("InlineAgent.resolver.time.time", return_value=1031.0):
+            self.assertIsNone(resolver.agent_id("misspelled"))
+            self.assertIsNone(resolver.agent_id("misspelled"))
+        self.assertEqual(self.bedrock_agent.agent_calls, 2)
+
+    def test_invalidate_finds_new_resource(self):
+        resolver = NameResolver(registry=self.registry)
+        resolver.agent_id("agent-0")
+        self.bedrock_agent.agents["created-later"] = "NEWID"
+
+        self.assertIsNone(resolver.agent_id("created-later"))
+        resolver.invalidate()
+        self.assertEqual(resolver.agent_id("created-later"), "NEWID")
+
+    def test_index_is_refreshed_after_ttl(self):
+        resolver = NameResolver(ttl=60, registry=self.registry)
+
+        with mock.patch("InlineAgent.resolver.time.time", return_value=1000.0):
+            resolver.agent_id("agent-0")
+        with mock.patch("InlineAgent.resolver.time.time", return_value=1059.0):
+            resolver.agent_id("agent-0")
+        self.assertEqual(self.bedrock_agent.agent_calls, 1)
+
+        self.bedrock_agent.agents["agent-0"] = "RECREATED"
+        with mock.patch("InlineAgent.resolver.time.time", return_value=1061.0):
+            self.assertEqual(resolver.agent_id("agent-0"), "RECREATED")
+        self.assertEqual(self.bedrock_agent.agent_calls, 2)
+
+    def test_prefetch_resolves_many_names(self):
+        resolver = NameResolver(registry=self.registry)
+
+        resolved = resolver.prefetch(
+            knowledge_bases=["kb-0", "kb-3"],
+            agents=["agent-1", "agent-2", "missing"],
+        )
+
+        self.assertEqual(
+            resolved,
+            {
+                "knowledge_bases": {"kb-0": "KBID0", "kb-3": "KBID3"},
+                "agents": {
+                    "agent-1": "AGENTID1",
+                    "agent-2": "AGENTID2",
+                    "missing": None,
+                },
+            },
+        )
+        self.assertEqual(self.bedrock_agent.kb_calls, 3)
+        self.assertEqual(self.bedrock_agent.agent_calls, 1)
+
+        resolver.knowledge_base_id("kb-1")
+        resolver.agent_id("agent-4")
+        self.assertEqual(self.bedrock_agent.kb_calls, 3)
+        self.assertEqual(self.bedrock_agent.agent_calls, 1)
+
+    def test_concurrent_lookups_list_once(self):
+        self.bedrock_agent.latency = 0.05
+        resolver = NameResolver(registry=self.registry)
+        barrier = threading.Barrier(8)
+        results = list()
+
+        def lookup(i):
+            barrier.wait()
+            results.append(resolver.agent_id(f"agent-{i % 5}"))
+
+        threads = [threading.Thread(target=lookup, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(results), 8)
+        self.assertEqual(self.bedrock_agent.agent_calls, 1)
+
+    def test_disk_cache_survives_restart(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache_path = os.path.join(directory, "cache", "resolver.json")
+
+            NameResolver(cache_path=cache_path, registry=self.registry).agent_id(
+                "agent-2"
+            )
+            self.assertEqual(self.bedrock_agent.agent_calls, 1)
+
+            cold = NameResolver(cache_path=cache_path, registry=self.registry)
+            self.assertEqual(cold.agent_id("agent-2"), "AGENTID2")
+            self.assertEqual(self.bedrock_agent.agent_calls, 1)
+
+            expired = NameResolver(ttl=0, cache_path=cache_path, registry=self.registry)
+            expired.agent_id("agent-2")
+            self.assertEqual(self.bedrock_agent.agent_calls, 2)
+
+            cold.invalidate()
+            self.assertEqual(
+                NameResolver(cache_path=cache_path, registry=self.registry)._indexes,
+                {},
+            )
+
+    def test_corrupt_disk_cache_is_ignored(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache_path = os.path.join(directory, "resolver.json")
+            with open(cache_path, "w") as file:
+                file.write("{not json")
+
+            resolver = NameResolver(cache_path=cache_path, registry=self.registry)
+            self.assertEqual(resolver.agent_id("agent-0"), "AGENTID0")
+
+
+class TestResolverIntegration(unittest.TestCase):
+    def setUp(self):
+        self.bedrock_agent = StubBedrockAgent(
+            knowledge_bases={"first": "KB1", "second": "KB2", "third": "KB3"},
+            agents={"Collaborator": "COLLABID"},
+        )
+        self.resolver = NameResolver(registry=StubRegistry(self.bedrock_agent))
+        for target in (
+            "InlineAgent.knowledge_base.knowledgebase_plugin.resolver",
+            "InlineAgent.agent.collaborator_agent_instance.resolver",
+        ):
+            patcher = mock.patch(target, self.resolver)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_get_knowledge_base_id_by_name(self):
+        self.assertEqual(
+            KnowledgeBasePlugin.get_knowledge_base_id_by_name("third"), "KB3"
+        )
+        self.assertIsNone(KnowledgeBasePlugin.get_knowledge_base_id_by_name("missing"))
+
+    def test_get_agent_id_by_name(self):
+        self.assertEqual(
+            CollaboratorAgent.get_agent_id_by_name("Collaborator"), "COLLABID"
+        )
+        with self.assertRaises(ValueError):
+            CollaboratorAgent.get_agent_id_by_name("missing")
+
+    def test_session_is_still_accepted(self):
+        session = mock.create_autospec(boto3.Session, instance=True)
+        session.profile_name = "default"
+
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(
+                KnowledgeBasePlugin.get_knowledge_base_id_by_name("third", session),
+                "KB3",
+            )
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(
+                CollaboratorAgent.get_agent_id_by_name(
+                    agent_name="Collaborator", session=session
+                ),
+                "COLLABID",
+            )
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(
+                CollaboratorAgent.get_agent_arn_by_name(
+                    agent_name="Collaborator",
+                    region="us-east-1",
+                    account_id="123456789012",
+                    session=session,
+                ),
+                "arn:aws:bedrock:us-east-1:123456789012:agent/COLLABID",
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,251 @@
+import inspect
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from mcp import StdioServerParameters
+
+from InlineAgent.action_group import ActionGroupBuilder
+from InlineAgent.agent import ProcessROC, require_confirmation
+from InlineAgent.tool_cache import SQLiteCacheBackend, cache_result
+from InlineAgent.tools import MCPStdio
+
+# Loaded by path: `python -m unittest discover tests` imports this module
+# without a parent package, so tests.tools cannot be imported from here
+ECHO_SERVER = os.path.join(os.path.dirname(__file__), "tools", "echo_mcp_server.py")
+
+
+def roc_event(function: str, places):
+    return {
+        "invocationInputs": [
+            {
+                "functionInvocationInput": {
+                    "actionGroup": "LookupActionGroup",
+                    "parameters": [{"name": "place", "type": "string", "value": place}],
+                    "function": function,
+                    "actionInvocationType": "RESULT",
+                    "agentId": "INLINE_AGENT",
+                }
+            }
+            for place in places
+        ],
+        "invocationId": "MOCKID",
+    }
+
+
+class TestCacheResult(unittest.TestCase):
+    def setUp(self):
+        self.calls = list()
+
+    def make_tool(self, **kwargs):
+        @cache_result(**kwargs)
+        def get_quote(symbol: str, currency: str = "USD") -> str:
+            """Get the latest quote for a stock.
+
+            Parameters:
+                symbol (str): Ticker symbol
+                currency (str): Currency of the quote
+            """
+            self.calls.append((symbol, currency))
+            return f"{symbol}:{currency}:{len(self.calls)}"
+
+        return get_quote
+
+    def test_equivalent_calls_share_a_result(self):
+        get_quote = self.make_tool()
+
+        first = get_quote("AMZN")
+        self.assertEqual(get_quote(symbol="AMZN"), first)
+        self.assertEqual(get_quote(currency="USD", symbol="AMZN"), first)
+        self.assertNotEqual(get_quote("AMZN", currency="EUR"), first)
+
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(get_quote.cache_info(), (2, 2, 128, 2))
+
+    def test_results_expire_after_ttl(self):
+        get_quote = self.make_tool(ttl=60)
+
+        with mock.patch("InlineAgent.tool_cache.time.time", return_value=1000.0):
+            first = get_quote("AMZN")
+        with mock.patch("InlineAgent.tool_cache.time.time", return_value=1059.0):
+            self.assertEqual(get_quote("AMZN"), first)
+        with mock.patch("InlineAgent.tool_cache.time.time", return_value=1061.0):
+            self.assertNotEqual(get_quote("AMZN"), first)
+
+        self.assertEqual(len(self.calls), 2)
+
+    def test_least_recently_used_result_is_evicted(self):
+        get_quote = self.make_tool(maxsize=2)
+
+        get_quote("A")
+        get_quote("B")
+        get_quote("A")
+        get_quote("C")
+        get_quote("A")
+        get_quote("B")
+
+        self.assertEqual(self.calls, [(s, "USD") for s in ("A", "B", "C", "B")])
+        self.assertEqual(get_quote.cache_info().currsize, 2)
+
+    def test_exceptions_are_not_cached(self):
+        attempts = list()
+
+        @cache_result
+        def flaky(place: str) -> str:
+            attempts.append(place)
+            if len(attempts) == 1:
+                raise ConnectionError("try again")
+            return place
+
+        with self.assertRaises(ConnectionError):
+            flaky("Seattle")
+        self.assertEqual(flaky("Seattle"), "Seattle")
+        self.assertEqual(len(attempts), 2)
+
+    def test_cache_clear(self):
+        get_quote = self.make_tool()
+        get_quote("AMZN")
+
+        get_quote.cache_clear()
+        get_quote("AMZN")
+
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(get_quote.cache_info(), (0, 1, 128, 1))
+
+    def test_function_schema_is_unchanged(self):
+        @require_confirmation
+        def get_quote(symbol: str, currency: str = "USD") -> str:
+            """Get the latest quote for a stock.
+
+            Parameters:
+                symbol (str): Ticker symbol
+                currency (str): Currency of the quote
+            """
+
+        cached = cache_result(get_quote)
+        ActionGroupBuilder.clear_schema_cache()
+
+        self.assertEqual(
+            ActionGroupBuilder.create_function_schema(cached),
+            ActionGroupBuilder.create_function_schema(get_quote),
+        )
+        self.assertEqual(
+            ActionGroupBuilder.create_function_schema(cached)["requireConfirmation"],
+            "ENABLED",
+        )
+
+
+class TestSQLiteCacheBackend(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "cache", "tools.sqlite")
+        self.calls = list()
+
+    def make_tool(self, **kwargs):
+        # Each tool stands in for the same tool in another worker process
+        @cache_result(backend=SQLiteCacheBackend(self.path), **kwargs)
+        def lookup(place: str):
+            self.calls.append(place)
+            return {"place": place, "call": len(self.calls)}
+
+        return lookup
+
+    def test_results_are_shared_between_workers(self):
+        worker_1 = self.make_tool()
+        worker_2 = self.make_tool()
+
+        result = worker_1("Seattle")
+        self.assertEqual(worker_2("Seattle"), result)
+
+        self.assertEqual(self.calls, ["Seattle"])
+        self.assertEqual(worker_2.cache_info().hits, 1)
+
+    def test_shared_results_expire(self):
+        worker_1 = self.make_tool(ttl=60)
+        worker_2 = self.make_tool(ttl=60)
+
+        with mock.patch("InlineAgent.tool_cache.time.time", return_value=1000.0):
+            worker_1("Seattle")
+        with mock.patch("InlineAgent.tool_cache.time.time", return_value=1061.0):
+            worker_2("Seattle")
+
+        self.assertEqual(self.calls, ["Seattle", "Seattle"])
+
+    def test_shared_store_keeps_maxsize_results(self):
+        worker_1 = self.make_tool(maxsize=2)
+        now = time.time()
+        for offset, place in enumerate(("A", "B", "C")):
+            with mock.patch(
+                "InlineAgent.tool_cache.time.time", return_value=now + offset
+            ):
+                worker_1(place)
+
+        worker_2 = self.make_tool(maxsize=2)
+        worker_2("A")
+        worker_2("C")
+
+        self.assertEqual(self.calls, ["A", "B", "C", "A"])
+
+    def test_results_that_are_not_json_stay_local(self):
+        @cache_result(backend=SQLiteCacheBackend(self.path))
+        def lookup(place: str):
+            self.calls.append(place)
+            return {place}
+
+        self.assertEqual(lookup("Seattle"), {"Seattle"})
+        self.assertEqual(lookup("Seattle"), {"Seattle"})
+        self.assertEqual(self.calls, ["Seattle"])
+
+
+class TestCachedROCTools(unittest.IsolatedAsyncioTestCase):
+    async def test_repeated_roc_calls_hit_the_cache(self):
+        calls = list()
+
+        @cache_result(ttl=60)
+        async def lookup(place: str) -> str:
+            calls.append(place)
+            return place.upper()
+
+        self.assertTrue(inspect.iscoroutinefunction(lookup))
+
+        for _ in range(3):
+            state = await ProcessROC.process_roc(
+                inlineSessionState={},
+                roc_event=roc_event("lookup", ["seattle", "berlin"]),
+                tool_map={"lookup": lookup},
+            )
+            self.assertEqual(
+                [
+                    result["functionResult"]["responseBody"]["TEXT"]["body"]
+                    for result in state["returnControlInvocationResults"]
+                ],
+                ["SEATTLE", "BERLIN"],
+            )
+
+        self.assertEqual(calls, ["seattle", "berlin"])
+        self.assertEqual(lookup.cache_info().hits, 4)
+
+    async def test_mcp_result_cache(self):
+        with mock.patch("builtins.print"):
+            client = await MCPStdio.create(
+                server_params=StdioServerParameters(
+                    command=sys.executable, args=[ECHO_SERVER]
+                ),
+                pool_size=2,
+                result_cache={"pid": {"ttl": 60}},
+            )
+        self.addAsyncCleanup(client.cleanup)
+
+        pids = {await client.callable_tools["pid"]() for _ in range(4)}
+
+        self.assertEqual(len(pids), 1)
+        self.assertEqual(client.callable_tools["pid"].cache_info().hits, 3)
+        self.assertFalse(hasattr(client.callable_tools["echo"], "cache_info"))
+
+
+if __name__ == "__main__":
+    unittest.main()
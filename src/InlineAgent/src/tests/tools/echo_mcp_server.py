@@ -0,0 +1,44 @@
+"""Stdio MCP server used by the tool tests.
+
+``echo`` blocks the server for ``delay`` seconds, like a CPU-bound tool, so a
+single server process handles one call at a time. ``add_tool`` registers a new
+tool and sends ``tools/list_changed``.
+"""
+
+import os
+import time
+
+from mcp.server.fastmcp import Context, FastMCP
+
+server = FastMCP("echo")
+
+
+@server.tool()
+def echo(text: str, delay: float = 0.0) -> str:
+    """Echo text back after blocking for delay seconds."""
+    time.sleep(delay)
+    return text
+
+
+@server.tool()
+def pid() -> str:
+    """Return the server process ID."""
+    return str(os.getpid())
+
+
+@server.tool()
+def crash() -> str:
+    """Exit the server process without answering."""
+    os._exit(1)
+
+
+@server.tool()
+async def add_tool(name: str, ctx: Context) -> str:
+    """Register a tool that returns its own name."""
+    server.add_tool(lambda: name, name=name, description=f"Return {name}.")
+    await ctx.session.send_tool_list_changed()
+    return name
+
+
+if __name__ == "__main__":
+    server.run()
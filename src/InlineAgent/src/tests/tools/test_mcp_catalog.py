@@ -0,0 +1,142 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from mcp.types import Implementation, InitializeResult, ServerCapabilities, Tool
+
+from InlineAgent.tools import MCPStdio, ToolCatalogCache
+from InlineAgent.tools.mcp_pool import PoolClientSession
+
+from .test_mcp_pool import echo_server_params
+
+
+def initialize_result(version: str) -> InitializeResult:
+    return InitializeResult(
+        protocolVersion="2024-11-05",
+        capabilities=ServerCapabilities(),
+        serverInfo=Implementation(name="echo", version=version),
+    )
+
+
+class TestToolCatalogCache(unittest.TestCase):
+    def setUp(self):
+        self.tools = [
+            Tool(name="echo", description="Echo.", inputSchema={"type": "object"})
+        ]
+
+    def test_key_includes_server_and_version(self):
+        key = ToolCatalogCache.key("python server.py", initialize_result("1.0"))
+
+        self.assertEqual(
+            key, ToolCatalogCache.key("python server.py", initialize_result("1.0"))
+        )
+        self.assertNotEqual(
+            key, ToolCatalogCache.key("python server.py", initialize_result("1.1"))
+        )
+        self.assertNotEqual(
+            key, ToolCatalogCache.key("python other.py", initialize_result("1.0"))
+        )
+
+    def test_catalog_expires_after_ttl(self):
+        cache = ToolCatalogCache(ttl=60)
+
+        with mock.patch("InlineAgent.tools.mcp_catalog.time.time", return_value=1000.0):
+            cache.put("key", self.tools)
+        with mock.patch("InlineAgent.tools.mcp_catalog.time.time", return_value=1059.0):
+            self.assertEqual(cache.get("key"), self.tools)
+        with mock.patch("InlineAgent.tools.mcp_catalog.time.time", return_value=1061.0):
+            self.assertIsNone(cache.get("key"))
+
+    def test_disk_cache_survives_restart(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache_path = os.path.join(directory, "cache", "tools.json")
+
+            ToolCatalogCache(cache_path=cache_path).put("key", self.tools)
+            self.assertEqual(
+                ToolCatalogCache(cache_path=cache_path).get("key"), self.tools
+            )
+
+            ToolCatalogCache(cache_path=cache_path).invalidate("key")
+            self.assertIsNone(ToolCatalogCache(cache_path=cache_path).get("key"))
+
+    def test_corrupt_disk_cache_is_ignored(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache_path = os.path.join(directory, "tools.json")
+            with open(cache_path, "w") as file:
+                file.write("{not json")
+
+            self.assertIsNone(ToolCatalogCache(cache_path=cache_path).get("key"))
+
+
+class TestMCPToolCatalog(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.list_tools_calls = 0
+        list_tools = PoolClientSession.list_tools
+
+        async def counting_list_tools(session):
+            self.list_tools_calls += 1
+            return await list_tools(session)
+
+        patcher = mock.patch.object(
+            PoolClientSession, "list_tools", counting_list_tools
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def create(self, **kwargs) -> MCPStdio:
+        with mock.patch("builtins.print"):
+            client = await MCPStdio.create(server_params=echo_server_params(), **kwargs)
+        self.addAsyncCleanup(client.cleanup)
+        return client
+
+    async def test_create_lists_tools_once(self):
+        client = await self.create(
+            catalog_cache=ToolCatalogCache(), tools_to_use={"echo"}
+        )
+
+        self.assertEqual(self.list_tools_calls, 1)
+        self.assertEqual(list(client.callable_tools), ["echo"])
+        self.assertEqual(
+            [function["name"] for function in client.function_schema["functions"]],
+            ["echo"],
+        )
+
+    async def test_cached_catalog_skips_list_tools(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache_path = os.path.join(directory, "tools.json")
+
+            first = await self.create(
+                catalog_cache=ToolCatalogCache(cache_path=cache_path)
+            )
+            second = await self.create(
+                catalog_cache=ToolCatalogCache(cache_path=cache_path)
+            )
+
+        self.assertEqual(self.list_tools_calls, 1)
+        self.assertEqual(first.function_schema, second.function_schema)
+        self.assertEqual(await second.callable_tools["echo"](text="hi"), "hi")
+
+    async def test_list_changed_refreshes_tools(self):
+        cache = ToolCatalogCache()
+        client = await self.create(catalog_cache=cache)
+        echo_definition = client.function_schema["functions"][0]
+
+        await client.callable_tools["add_tool"](name="greet")
+        for _ in range(100):
+            if "greet" in client.callable_tools:
+                break
+            await asyncio.sleep(0.05)
+
+        self.assertEqual(self.list_tools_calls, 2)
+        self.assertEqual(await client.callable_tools["greet"](), "greet")
+        functions = client.function_schema["functions"]
+        self.assertIn("greet", [function["name"] for function in functions])
+        # Unchanged tools keep their definition
+        self.assertIs(functions[0], echo_definition)
+        self.assertIn("greet", [tool.name for tool in cache.get(client.catalog_key)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import asyncio
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+import anyio
+from mcp import StdioServerParameters
+
+from InlineAgent.tools import MCPSessionPool, MCPStdio
+
+ECHO_SERVER = os.path.join(os.path.dirname(__file__), "echo_mcp_server.py")
+
+
+def echo_server_params() -> StdioServerParameters:
+    return StdioServerParameters(command=sys.executable, args=[ECHO_SERVER])
+
+
+class TestMCPSessionPool(unittest.IsolatedAsyncioTestCase):
+    async def create(self, **kwargs) -> MCPStdio:
+        with mock.patch("builtins.print"):
+            client = await MCPStdio.create(server_params=echo_server_params(), **kwargs)
+        self.addAsyncCleanup(client.cleanup)
+        return client
+
+    async def timed_calls(self, client: MCPStdio, calls: int, delay: float) -> float:
+        echo = client.callable_tools["echo"]
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *[echo(text=str(idx), delay=delay) for idx in range(calls)]
+        )
+        elapsed = time.perf_counter() - start
+        self.assertEqual(results, [str(idx) for idx in range(calls)])
+        return elapsed
+
+    async def test_throughput_scales_with_pool_size(self):
+        single = await self.create(pool_size=1)
+        pooled = await self.create(pool_size=4)
+        self.assertEqual(len(pooled.pool.connections), 4)
+
+        single_time = await self.timed_calls(single, calls=8, delay=0.1)
+        pooled_time = await self.timed_calls(pooled, calls=8, delay=0.1)
+
+        # 8 blocking calls take ~0.8s on one server and ~0.2s on four
+        self.assertGreater(single_time, 0.75)
+        self.assertGreater(single_time / pooled_time, 2.5)
+
+    async def test_calls_are_spread_across_servers(self):
+        client = await self.create(pool_size=3)
+
+        async def pid_while_busy():
+            # Keep every server busy so pid calls cannot share one
+            return await asyncio.gather(
+                client.callable_tools["echo"](text="x", delay=0.2),
+                client.pool.call_tool("pid"),
+            )
+
+        results = await asyncio.gather(*[pid_while_busy() for _ in range(3)])
+        self.assertGreater(len({pid.content[0].text for _, pid in results}), 1)
+
+    async def test_pool_grows_on_demand_up_to_max_size(self):
+        client = await self.create(pool_size=1, max_pool_size=3)
+        self.assertEqual(len(client.pool.connections), 1)
+
+        await self.timed_calls(client, calls=6, delay=0.2)
+
+        self.assertEqual(len(client.pool.connections), 3)
+
+    async def test_dead_server_is_replaced(self):
+        client = await self.create(pool_size=1)
+        client.pool.health_check_interval = 0
+        first_pid = (await client.pool.call_tool("pid")).content[0].text
+
+        # The crash is retried once on a fresh server, which crashes too
+        with self.assertRaises(anyio.EndOfStream):
+            await asyncio.wait_for(client.pool.call_tool("crash"), timeout=10)
+
+        second_pid = (await client.pool.call_tool("pid")).content[0].text
+        self.assertNotEqual(first_pid, second_pid)
+        self.assertEqual(len(client.pool.connections), 1)
+
+    async def test_invalid_sizes(self):
+        async def connect(stack):
+            raise AssertionError("not called")
+
+        with self.assertRaises(ValueError):
+            MCPSessionPool(connect=connect, size=0)
+        with self.assertRaises(ValueError):
+            MCPSessionPool(connect=connect, size=2, max_size=1)
+
+    async def test_closed_pool_rejects_calls(self):
+        client = await self.create()
+        await client.pool.close()
+
+        self.assertIsNone(client.session)
+        with self.assertRaises(RuntimeError):
+            await client.pool.call_tool("pid")
+
+
+if __name__ == "__main__":
+    unittest.main()
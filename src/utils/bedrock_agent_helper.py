@@ -7,6 +7,7 @@ The AgentsForAmazonBedrock class provides a convenient interface for working wit
 It includes methods for creating, updating, and invoking Agents, as well as managing
 IAM roles and Lambda functions for action groups.
 """
+import asyncio
 import copy
 
 import boto3
@@ -18,7 +19,7 @@ from dateutil.tz import tzutc
 import os
 import datetime
 from io import BytesIO
-from typing import List, Dict, Tuple
+from typing import Dict, Iterable, List, Tuple, Union
 import re
 from boto3.session import Session
 from botocore.config import Config
@@ -27,6 +28,8 @@ import inspect
 from typing import Callable
 from textwrap import dedent
 
+from src.utils import dynamodb_loader, lambda_dispatcher, waiters
+
 # import matplotlib.pyplot as plt
 # import matplotlib.image as mpimg
 # from IPython.display import display, Markdown
@@ -197,8 +200,10 @@ class AgentsForAmazonBedrock:
                 AssumeRolePolicyDocument=_assume_role_policy_document_json,
             )
 
-            # Pause to make sure role is created
-            time.sleep(10)
+            # Make sure the role is created, create_lambda retries until it can be assumed
+            self._iam_client.get_waiter("role_exists").wait(
+                RoleName=_lambda_function_role_name
+            )
         except:
             _lambda_iam_role = self._iam_client.get_role(
                 RoleName=_lambda_function_role_name
@@ -270,9 +275,14 @@ class AgentsForAmazonBedrock:
                             "dynamodb:Query",
                             "dynamodb:UpdateItem",
                         ],
-                        "Resource": "arn:aws:dynamodb:{}:{}:table/{}".format(
-                            self._region, self._account_id, dynamodb_table_name
-                        ),
+                        "Resource": [
+                            "arn:aws:dynamodb:{}:{}:table/{}".format(
+                                self._region, self._account_id, dynamodb_table_name
+                            ),
+                            "arn:aws:dynamodb:{}:{}:table/{}/index/*".format(
+                                self._region, self._account_id, dynamodb_table_name
+                            ),
+                        ],
                     }
                 ],
             }
@@ -457,6 +467,8 @@ class AgentsForAmazonBedrock:
             Must be a local file, and use underscores, not hyphens.
             additional_function_iam_policy (Dict, Optional): Additional IAM policy to attach to the Lambda function. Defaults to None.
             sub_agent_arns (List[str], Optional): List of ARNs of the sub-agents that this Lambda is allowed to invoke.
+            dynamo_args (List, Optional): Table name, partition key and sort key of a DynamoDB table to create
+            for the Lambda, optionally followed by a list of attributes to create a GSI for (see create_dynamodb).
 
         Returns:
             str: ARN of the new Lambda function
@@ -487,22 +499,37 @@ class AgentsForAmazonBedrock:
                 agent_name, sub_agent_arns, dynamodb_table_name=dynamo_args[0]
             )
             # create DynamoDB Table to be used on Lambda Code
-            self.create_dynamodb(dynamo_args[0], dynamo_args[1], dynamo_args[2])
+            self.create_dynamodb(
+                dynamo_args[0],
+                dynamo_args[1],
+                dynamo_args[2],
+                index_attributes=dynamo_args[3] if len(dynamo_args) > 3 else None,
+            )
             env_variables["Variables"]["dynamodb_table"] = dynamo_args[0]
             env_variables["Variables"]["dynamodb_pk"] = dynamo_args[1]
             env_variables["Variables"]["dynamodb_sk"] = dynamo_args[2]
+            if len(dynamo_args) > 3:
+                env_variables["Variables"]["dynamodb_indexes"] = ",".join(
+                    dynamo_args[3]
+                )
         else:
             lambda_role = self._create_lambda_iam_role(agent_name, sub_agent_arns)
 
-        # Create Lambda Function
-        _lambda_function = self._lambda_client.create_function(
-            FunctionName=lambda_function_name,
-            Runtime=PYTHON_RUNTIME,
-            Timeout=PYTHON_TIMEOUT,
-            Role=lambda_role,
-            Code={"ZipFile": zip_content},
-            Handler=f"{_base_filename}.lambda_handler",
-            Environment=env_variables,
+        # Create Lambda Function, retrying while a new role has not propagated yet
+        _lambda_function = waiters.retry_call(
+            lambda: self._lambda_client.create_function(
+                FunctionName=lambda_function_name,
+                Runtime=PYTHON_RUNTIME,
+                Timeout=PYTHON_TIMEOUT,
+                Role=lambda_role,
+                Code={"ZipFile": zip_content},
+                Handler=f"{_base_filename}.lambda_handler",
+                Environment=env_variables,
+            ),
+            retry_if=lambda e: isinstance(
+                e, self._lambda_client.exceptions.InvalidParameterValueException
+            )
+            and "role" in str(e).lower(),
         )
 
         self._allow_agent_lambda(_agent_id, lambda_function_name)
@@ -621,9 +648,9 @@ class AgentsForAmazonBedrock:
 
             if verbose:
                 print(f"Deleting agent: {_agent_id}...")
-            time.sleep(5)
+            self._wait_agent_aliases_deleted(_agent_id)
             self._bedrock_agent_client.delete_agent(agentId=_agent_id)
-            time.sleep(5)
+            self.wait_agent_status_update(_agent_id)
 
         # TODO: add delete_lambda_flag parameter to optionall take care of
         # deleting the lambda function associated with the agent.
@@ -734,8 +761,8 @@ class AgentsForAmazonBedrock:
                 AssumeRolePolicyDocument=_assume_role_policy_document_json,
             )
 
-            # Pause to make sure role is created
-            time.sleep(10)
+            # Make sure the role is created, _create_agent retries until it can be assumed
+            self._iam_client.get_waiter("role_exists").wait(RoleName=_agent_role_name)
 
             _bedrock_agent_bedrock_allow_policy_statement = DEFAULT_AGENT_IAM_POLICY
             _bedrock_policy_json = json.dumps(
@@ -783,9 +810,6 @@ class AgentsForAmazonBedrock:
                     RoleName=_agent_role_name,
                 )
 
-                # Pause to make sure role is updated
-                time.sleep(10)
-
             # TODO: scope down GR access to a single GR passed as param
             # # Support Guardrail access
             # _gr_policy_doc = {
@@ -810,50 +834,167 @@ class AgentsForAmazonBedrock:
 
             return _agent_role["Role"]["Arn"]
 
-    def wait_agent_status_update(self, agent_id):
-        response = self._bedrock_agent_client.get_agent(agentId=agent_id)
-        agent_status = response["agent"]["agentStatus"]
-        _waited_at_least_once = False
-        while agent_status.endswith("ING"):
-            print(f"Waiting for agent status to change. Current status {agent_status}")
-            time.sleep(5)
-            _waited_at_least_once = True
-            try:
-                response = self._bedrock_agent_client.get_agent(agentId=agent_id)
-                agent_status = response["agent"]["agentStatus"]
-            except self._bedrock_agent_client.exceptions.ResourceNotFoundException:
-                agent_status = "DELETED"
-        if _waited_at_least_once:
-            print(f"Agent id {agent_id} current status: {agent_status}")
+    def _get_agent_status(self, agent_id: str) -> str:
+        try:
+            response = self._bedrock_agent_client.get_agent(agentId=agent_id)
+            return response["agent"]["agentStatus"]
+        except self._bedrock_agent_client.exceptions.ResourceNotFoundException:
+            return "DELETED"
 
-    def wait_agent_alias_status_update(self, agent_id, agent_alias_id, verbose=False):
-        response = self._bedrock_agent_client.get_agent_alias(
-            agentId=agent_id, agentAliasId=agent_alias_id
+    def _get_agent_alias_status(self, agent_id: str, agent_alias_id: str) -> str:
+        try:
+            response = self._bedrock_agent_client.get_agent_alias(
+                agentId=agent_id, agentAliasId=agent_alias_id
+            )
+            return response["agentAlias"]["agentAliasStatus"]
+        except self._bedrock_agent_client.exceptions.ResourceNotFoundException:
+            return "DELETED"
+
+    def _wait_agent_aliases_deleted(self, agent_id: str, timeout: float = 300):
+        # Aliases that failed to delete are settled too, delete_agent reports them
+        waiters.wait_until(
+            lambda: self._bedrock_agent_client.list_agent_aliases(
+                agentId=agent_id, maxResults=100
+            )["agentAliasSummaries"],
+            lambda aliases: all(
+                waiters.is_settled(alias["agentAliasStatus"]) for alias in aliases
+            ),
+            timeout=timeout,
+            description=f"aliases of agent {agent_id} to be deleted",
         )
-        agent_alias_status = response["agentAlias"]["agentAliasStatus"]
-        while agent_alias_status.endswith("ING"):
+
+    def wait_agent_status_update(self, agent_id, timeout: float = 600) -> str:
+        """Waits until the agent is not CREATING, PREPARING, UPDATING or DELETING.
+
+        Polls with exponential backoff, so an agent that is already settled costs a
+        single request.
+
+        Args:
+            agent_id (str): Id of the agent
+            timeout (float, Optional): Seconds to wait before raising WaiterTimeout
+
+        Returns:
+            str: The final status, DELETED if the agent no longer exists
+        """
+        _statuses = []
+
+        def _on_poll(agent_status):
+            if not _statuses or _statuses[-1] != agent_status:
+                print(
+                    f"Waiting for agent status to change. Current status {agent_status}"
+                )
+            _statuses.append(agent_status)
+
+        agent_status = waiters.wait_until(
+            lambda: self._get_agent_status(agent_id),
+            waiters.is_settled,
+            timeout=timeout,
+            description=f"agent {agent_id}",
+            on_poll=_on_poll,
+        )
+        if _statuses:
+            print(f"Agent id {agent_id} current status: {agent_status}")
+        return agent_status
+
+    def wait_agent_alias_status_update(
+        self, agent_id, agent_alias_id, verbose=False, timeout: float = 600
+    ) -> str:
+        """Waits until the agent alias is not CREATING, UPDATING or DELETING.
+
+        Args:
+            agent_id (str): Id of the agent
+            agent_alias_id (str): Id of the alias
+            verbose (bool, Optional): Print the status while waiting
+            timeout (float, Optional): Seconds to wait before raising WaiterTimeout
+
+        Returns:
+            str: The final status, DELETED if the alias no longer exists
+        """
+
+        def _on_poll(agent_alias_status):
             if verbose:
                 print(
                     f"Waiting for agent ALIAS status to change. Current status {agent_alias_status}"
                 )
-            time.sleep(5)
-            try:
-                response = self._bedrock_agent_client.get_agent_alias(
-                    agentId=agent_id, agentAliasId=agent_alias_id
-                )
-                agent_alias_status = response["agentAlias"]["agentAliasStatus"]
-            except self._bedrock_agent_client.exceptions.ResourceNotFoundException:
-                agent_status = "DELETED"
+
+        agent_alias_status = waiters.wait_until(
+            lambda: self._get_agent_alias_status(agent_id, agent_alias_id),
+            waiters.is_settled,
+            timeout=timeout,
+            description=f"alias {agent_alias_id} of agent {agent_id}",
+            on_poll=_on_poll,
+        )
         if verbose:
             print(
                 f"Agent id {agent_id}, Alias {agent_alias_id} current status: {agent_alias_status}"
             )
+        return agent_alias_status
+
+    async def wait_agents_async(
+        self, agent_ids: List[str], timeout: float = 600
+    ) -> Dict[str, str]:
+        """Waits for several agents at once, e.g. collaborators that are being prepared.
+
+        Args:
+            agent_ids (List[str]): Ids of the agents
+            timeout (float, Optional): Seconds to wait for each agent
+
+        Returns:
+            Dict[str, str]: The final status of every agent, by id
+        """
+        statuses = await asyncio.gather(
+            *(
+                waiters.wait_until_async(
+                    lambda agent_id=agent_id: self._get_agent_status(agent_id),
+                    waiters.is_settled,
+                    timeout=timeout,
+                    description=f"agent {agent_id}",
+                )
+                for agent_id in agent_ids
+            )
+        )
+        return dict(zip(agent_ids, statuses))
+
+    async def wait_agent_aliases_async(
+        self, agent_aliases: List[Tuple[str, str]], timeout: float = 600
+    ) -> Dict[Tuple[str, str], str]:
+        """Waits for several agent aliases at once.
+
+        Args:
+            agent_aliases (List[Tuple[str, str]]): (agent id, alias id) pairs
+            timeout (float, Optional): Seconds to wait for each alias
+
+        Returns:
+            Dict[Tuple[str, str], str]: The final status of every alias, by pair
+        """
+        statuses = await asyncio.gather(
+            *(
+                waiters.wait_until_async(
+                    lambda agent_id=agent_id, agent_alias_id=agent_alias_id: (
+                        self._get_agent_alias_status(agent_id, agent_alias_id)
+                    ),
+                    waiters.is_settled,
+                    timeout=timeout,
+                    description=f"alias {agent_alias_id} of agent {agent_id}",
+                )
+                for agent_id, agent_alias_id in agent_aliases
+            )
+        )
+        return dict(zip(agent_aliases, statuses))
 
     def associate_sub_agents(self, supervisor_agent_id, sub_agents_list):
+        # Be sure the collaborators and their aliases are ready to be associated.
+        # Aliases that are already settled cost a single request each, and
+        # asyncio.run would fail inside the event loop of a notebook
+        for sub_agent in sub_agents_list:
+            sub_agent_id, sub_agent_alias_id = sub_agent["sub_agent_alias_arn"].split(
+                "/"
+            )[-2:]
+            self.wait_agent_alias_status_update(sub_agent_id, sub_agent_alias_id)
+        self.wait_agent_status_update(
+            supervisor_agent_id
+        )  # Be sure agent is not still in CREATING state
         for sub_agent in sub_agents_list:
-            self.wait_agent_status_update(
-                supervisor_agent_id
-            )  # Be sure agent is not still in CREATING state
             association_response = (
                 self._bedrock_agent_client.associate_agent_collaborator(
                     agentId=supervisor_agent_id,
@@ -864,9 +1005,10 @@ class AgentsForAmazonBedrock:
                     relayConversationHistory=sub_agent["relay_conversation_history"],
                 )
             )
-            self.wait_agent_status_update(supervisor_agent_id)
-            self._bedrock_agent_client.prepare_agent(agentId=supervisor_agent_id)
-            self.wait_agent_status_update(supervisor_agent_id)
+        # Prepare once for all collaborators
+        self.wait_agent_status_update(supervisor_agent_id)
+        self._bedrock_agent_client.prepare_agent(agentId=supervisor_agent_id)
+        self.wait_agent_status_update(supervisor_agent_id)
 
         supervisor_agent_alias = self._bedrock_agent_client.create_agent_alias(
             agentAliasName="multi-agent", agentId=supervisor_agent_id
@@ -875,6 +1017,9 @@ class AgentsForAmazonBedrock:
         supervisor_agent_alias_arn = supervisor_agent_alias["agentAlias"][
             "agentAliasArn"
         ]
+        self.wait_agent_alias_status_update(
+            supervisor_agent_id, supervisor_agent_alias_id
+        )
         return supervisor_agent_alias_id, supervisor_agent_alias_arn
 
     def build_sub_agent_list(self, sub_agent_names: List[str]) -> List:
@@ -1022,7 +1167,8 @@ class AgentsForAmazonBedrock:
             return "Agent not found"
 
         _resp = self._bedrock_agent_client.prepare_agent(agentId=_agent_id)
-        time.sleep(5)  # make sure agent is ready to be invoked as soon as we return
+        # make sure agent is ready to be invoked as soon as we return
+        self.wait_agent_status_update(_agent_id)
         return
 
     def create_agent_alias(self, agent_id: str, alias_name: str) -> Tuple[str, str]:
@@ -1063,7 +1209,8 @@ class AgentsForAmazonBedrock:
         # check the response and if successful, prepare the agent
         if _agent_action_group_resp["ResponseMetadata"]["HTTPStatusCode"] == 200:
             _resp = self._bedrock_agent_client.prepare_agent(agentId=_agent_id)
-            time.sleep(5)  # make sure agent is ready to be invoked as soon as we return
+            # make sure agent is ready to be invoked as soon as we return
+            self.wait_agent_status_update(_agent_id)
         else:
             print(f"Error adding code interpreter to agent: {_agent_action_group_resp}")
         return
@@ -1155,7 +1302,8 @@ class AgentsForAmazonBedrock:
             description=agent_action_group_description,
         )
         _resp = self._bedrock_agent_client.prepare_agent(agentId=agent_id)
-        time.sleep(5)  # make sure agent is ready to be invoked as soon as we return
+        # make sure agent is ready to be invoked as soon as we return
+        self.wait_agent_status_update(agent_id)
         return
 
     def get_function_defs(self, agent_name: str) -> List[dict]:
@@ -1273,32 +1421,37 @@ class AgentsForAmazonBedrock:
                 supervisor_agent_name, model_ids
             )
 
-        time.sleep(20)
-
-        _response = self._bedrock_agent_client.create_agent(
-            agentName=supervisor_agent_name,
-            agentResourceRoleArn=_supervisor_role_arn,
-            description=supervisor_description.replace(
-                "\n", ""
-            ),  # console doesn't like newlines for subsequent editing
-            idleSessionTTLInSeconds=1800,
-            foundationModel=model_ids[0],
-            promptOverrideConfiguration={
-                "promptConfigurations": [
-                    {
-                        "promptType": "ROUTING_CLASSIFIER",
-                        "foundationModel": ROUTER_MODEL,
-                        "parserMode": "DEFAULT",
-                        "promptCreationMode": "DEFAULT",
-                        "promptState": "ENABLED",
-                    }
-                ]
-            },
-            instruction=supervisor_instructions,
+        # Retry while the new role has not propagated yet
+        _response = waiters.retry_call(
+            lambda: self._bedrock_agent_client.create_agent(
+                agentName=supervisor_agent_name,
+                agentResourceRoleArn=_supervisor_role_arn,
+                description=supervisor_description.replace(
+                    "\n", ""
+                ),  # console doesn't like newlines for subsequent editing
+                idleSessionTTLInSeconds=1800,
+                foundationModel=model_ids[0],
+                promptOverrideConfiguration={
+                    "promptConfigurations": [
+                        {
+                            "promptType": "ROUTING_CLASSIFIER",
+                            "foundationModel": ROUTER_MODEL,
+                            "parserMode": "DEFAULT",
+                            "promptCreationMode": "DEFAULT",
+                            "promptState": "ENABLED",
+                        }
+                    ]
+                },
+                instruction=supervisor_instructions,
+            ),
+            retry_if=lambda e: isinstance(
+                e, self._bedrock_agent_client.exceptions.ValidationException
+            )
+            and "role" in str(e).lower(),
         )
         _supervisor_agent_arn = _response["agent"]["agentArn"]
         _supervisor_agent_id = _response["agent"]["agentId"]
-        time.sleep(15)
+        self.wait_agent_status_update(_supervisor_agent_id)
 
         # Associate the KB with the supervisor agent
         if kb_arn is not None:
@@ -2748,15 +2901,42 @@ class AgentsForAmazonBedrock:
             **_agent_details
         )
 
-        time.sleep(3)
+        self.wait_agent_status_update(_agent_id)
 
         # Prepare Agent
         self._bedrock_agent_client.prepare_agent(agentId=_agent_id)
 
         return _update_agent_response
 
-    def create_dynamodb(self, table_name, pk_item, sk_item):
+    def create_dynamodb(
+        self, table_name, pk_item, sk_item, index_attributes: List[str] = None
+    ):
+        """Creates a DynamoDB table with a string partition and sort key.
+
+        Args:
+            table_name (str): Name of the table
+            pk_item (str): Name of the partition key
+            sk_item (str): Name of the sort key
+            index_attributes (List[str], Optional): Attributes to query by. Each gets a GSI named
+            <attribute>-index with pk_item as partition key and the attribute as sort key, so
+            a query for one value reads only the matching items instead of filtering the whole
+            partition. Items without the attribute are left out of its index.
+        """
+        index_attributes = index_attributes or []
         try:
+            table_args = {}
+            if index_attributes:
+                table_args["GlobalSecondaryIndexes"] = [
+                    {
+                        "IndexName": f"{attribute}-index",
+                        "KeySchema": [
+                            {"AttributeName": pk_item, "KeyType": "HASH"},
+                            {"AttributeName": attribute, "KeyType": "RANGE"},
+                        ],
+                        "Projection": {"ProjectionType": "ALL"},
+                    }
+                    for attribute in index_attributes
+                ]
             table = self._dynamodb_resource.create_table(
                 TableName=table_name,
                 KeySchema=[
@@ -2764,10 +2944,11 @@ class AgentsForAmazonBedrock:
                     {"AttributeName": sk_item, "KeyType": "RANGE"},
                 ],
                 AttributeDefinitions=[
-                    {"AttributeName": pk_item, "AttributeType": "S"},
-                    {"AttributeName": sk_item, "AttributeType": "S"},
+                    {"AttributeName": attribute, "AttributeType": "S"}
+                    for attribute in [pk_item, sk_item, *index_attributes]
                 ],
                 BillingMode="PAY_PER_REQUEST",  # Use on-demand capacity mode
+                **table_args,
             )
 
             # Wait for the table to be created
@@ -2777,14 +2958,98 @@ class AgentsForAmazonBedrock:
         except self._dynamodb_client.exceptions.ResourceInUseException:
             print(f"Table {table_name} already exists, skipping table creation step")
 
-    def load_dynamodb(self, table_name: str, items: List):
-        try:
+    def load_dynamodb(
+        self,
+        table_name: str,
+        items: Union[Iterable[Dict], str],
+        max_workers: int = 4,
+        chunk_size: int = 500,
+        verbose: bool = False,
+    ) -> dynamodb_loader.LoadReport:
+        """Writes items to a DynamoDB table in batches, on a pool of threads.
+
+        Args:
+            table_name (str): Name of the table
+            items (Iterable[Dict] | str): Items to write, or the path of a JSON Lines or
+            .csv file to stream them from
+            max_workers (int, Optional): Number of writer threads
+            chunk_size (int, Optional): Number of items handed to a thread at a time
+            verbose (bool, Optional): Print progress and the load rate
 
-            table = self._dynamodb_resource.Table(table_name)
-            for item in items:
-                table.put_item(Item=item)
+        Returns:
+            LoadReport: number of items written, elapsed time and items per second
+        """
+        if isinstance(items, str):
+            items = dynamodb_loader.iter_items(items)
+        try:
+            report = dynamodb_loader.bulk_load(
+                table_name,
+                items,
+                region_name=self._region,
+                endpoint_url=self._dynamodb_client.meta.endpoint_url,
+                max_workers=max_workers,
+                chunk_size=chunk_size,
+                verbose=verbose,
+            )
         except self._dynamodb_client.exceptions.ResourceInUseException:
             print(f"Error on loading process for table: {table_name}.")
+            return None
+        if verbose:
+            print(report)
+        return report
+
+    def iter_dynamodb(
+        self,
+        table_name: str,
+        pk_field: str,
+        pk_value: str,
+        sk_field: str = None,
+        sk_value: str = None,
+        index_name: str = None,
+        projection: List[str] = None,
+        page_size: int = None,
+    ):
+        """Yields the items of a partition, querying one page at a time.
+
+        Args:
+            table_name (str): Name of the table
+            pk_field (str): Name of the partition key
+            pk_value (str): Partition key value
+            sk_field (str, Optional): Name of the sort key, or of the index sort key
+            sk_value (str, Optional): Prefix of the sort key values to return
+            index_name (str, Optional): GSI to query instead of the table, e.g. 'kind-index'
+            projection (List[str], Optional): Attributes to return. Defaults to whole items
+            page_size (int, Optional): Maximum number of items to read per request
+        """
+        table = self._dynamodb_resource.Table(table_name)
+        # Create expression
+        if sk_field:
+            key_expression = Key(pk_field).eq(pk_value) & Key(sk_field).begins_with(
+                sk_value
+            )
+        else:
+            key_expression = Key(pk_field).eq(pk_value)
+
+        query_args = {"KeyConditionExpression": key_expression}
+        if index_name:
+            query_args["IndexName"] = index_name
+        if projection:
+            # Placeholders avoid clashes with reserved words such as "day"
+            query_args["ProjectionExpression"] = ", ".join(
+                f"#p{idx}" for idx in range(len(projection))
+            )
+            query_args["ExpressionAttributeNames"] = {
+                f"#p{idx}": name for idx, name in enumerate(projection)
+            }
+        if page_size:
+            query_args["Limit"] = page_size
+
+        while True:
+            query_data = table.query(**query_args)
+            yield from query_data["Items"]
+            if "LastEvaluatedKey" not in query_data:
+                return
+            query_args["ExclusiveStartKey"] = query_data["LastEvaluatedKey"]
 
     def query_dynamodb(
         self,
@@ -2793,20 +3058,21 @@ class AgentsForAmazonBedrock:
         pk_value: str,
         sk_field: str = None,
         sk_value: str = None,
+        index_name: str = None,
+        projection: List[str] = None,
     ):
         try:
-
-            table = self._dynamodb_resource.Table(table_name)
-            # Create expression
-            if sk_field:
-                key_expression = Key(pk_field).eq(pk_value) & Key(sk_field).begins_with(
-                    sk_value
+            return list(
+                self.iter_dynamodb(
+                    table_name,
+                    pk_field,
+                    pk_value,
+                    sk_field,
+                    sk_value,
+                    index_name=index_name,
+                    projection=projection,
                 )
-            else:
-                key_expression = Key(pk_field).eq(pk_value)
-
-            query_data = table.query(KeyConditionExpression=key_expression)
-            return query_data["Items"]
+            )
         except self._dynamodb_client.exceptions.ResourceInUseException:
             print(f"Error querying table: {table_name}.")
 
@@ -2827,33 +3093,15 @@ class AgentsForAmazonBedrock:
         # Get the function's name
         func_name = func.__name__
 
+        # The Lambda package holds only this file, so the dispatcher is inlined
         lambda_code = [
-            "import json",
-            "import inspect",
-            "from typing import Any, Dict",
+            inspect.getsource(lambda_dispatcher),
             "",
-            "def get_named_parameter(event: Dict[str, Any], name: str) -> Any:",
-            '    """Extract a named parameter from the event object."""',
-            "    if 'parameters' in event:",
-            "        return next(item for item in event['parameters'] if item['name'] == name)['value']",
-            "    else:",
-            "        return None",
+            func_source,
             "",
-            "def populate_function_response(event: Dict[str, Any], response_body: Any) -> Dict[str, Any]:",
-            '    """Create the response structure expected by the agent."""',
-            "    return {",
-            "        'response': {",
-            "            'actionGroup': event['actionGroup'],",
-            "            'function': event['function'],",
-            "            'functionResponse': {",
-            "                'responseBody': {",
-            "                    'TEXT': {'body': str(response_body)}",
-            "                }",
-            "            }",
-            "        }",
-            "    }",
+            "dispatcher = ActionGroupDispatcher(serialize=str)",
+            f"dispatcher.register({func_name})",
             "",
-            func_source,
             "",
             "def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:",
             '    """',
@@ -2861,34 +3109,7 @@ class AgentsForAmazonBedrock:
             "    Extracts parameters from the event and formats the response.",
             '    """',
             '    print(f"Received event: {event}")',
-            "",
-            f"    function = event['function']",
-            f"    if function == '{func_name}':",
-            "        # Get parameters from the event",
-            "        params = {}",
-            f"        for param_name in inspect.signature({func_name}).parameters:",
-            "            param_value = get_named_parameter(event, param_name)",
-            "            if param_value is None:",
-            "                # Check session state if parameter not found",
-            "                session_state = event.get('sessionAttributes', {})",
-            "                if session_state and param_name in session_state:",
-            "                    param_value = session_state[param_name]",
-            "                else:",
-            '                    result = f"Missing required parameter: {param_name}"',
-            "                    return populate_function_response(event, result)",
-            "            params[param_name] = param_value",
-            "",
-            "        try:",
-            "            # Call the function with extracted parameters",
-            f"            result = {func_name}(**params)",
-            "            return populate_function_response(event, result)",
-            "        except Exception as e:",
-            f'            error_message = f"Error executing {func_name}: {{str(e)}}"',
-            "            print(error_message)",
-            "            return populate_function_response(event, error_message)",
-            "    else:",
-            "        result = f\"Error: Function '{function}' not recognized\"",
-            "        return populate_function_response(event, result)",
+            "    return dispatcher.dispatch(event, context)",
         ]
 
         # Create output directory if it doesn't exist
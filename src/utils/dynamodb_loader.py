@@ -0,0 +1,221 @@
+# Copyright 2024 Amazon.com and its affiliates; all rights reserved.
+# This file is AWS Content and may not be duplicated or distributed without permission
+
+"""
+This module contains a bulk loader for DynamoDB tables, used by
+AgentsForAmazonBedrock.load_dynamodb to seed the sample datasets of the examples.
+
+Items are written with batch_writer, 25 per BatchWriteItem request, by a pool of
+threads. The input is read lazily in chunks, so JSON Lines and CSV files of any size
+can be loaded without holding them in memory.
+
+    python -m src.utils.dynamodb_loader items.jsonl my-table --endpoint-url http://localhost:8000
+"""
+
+import argparse
+import csv
+import json
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from decimal import Decimal
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+import boto3
+from botocore.config import Config
+
+# Throttled requests are retried by botocore with client-side rate limiting
+RETRY_CONFIG = Config(retries={"max_attempts": 10, "mode": "adaptive"})
+
+
+def iter_json_lines(path: str) -> Iterator[Dict[str, Any]]:
+    """Yields the items of a JSON Lines file, one JSON object per line.
+
+    Numbers with a fraction are read as Decimal, as DynamoDB does not accept floats.
+
+    Args:
+        path (str): Path of the file
+    """
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line, parse_float=Decimal)
+
+
+def iter_csv(
+    path: str, types: Dict[str, Callable[[str], Any]] = None
+) -> Iterator[Dict[str, Any]]:
+    """Yields the rows of a CSV file with a header line as items.
+
+    Empty values are left out of the item.
+
+    Args:
+        path (str): Path of the file
+        types (Dict, Optional): Converters by column name, e.g. {"quota": Decimal}.
+        Columns without a converter are loaded as strings
+    """
+    types = types or {}
+    with open(path, "r", newline="") as f:
+        for row in csv.DictReader(f):
+            yield {
+                name: types[name](value) if name in types else value
+                for name, value in row.items()
+                if value != ""
+            }
+
+
+def iter_items(path: str) -> Iterator[Dict[str, Any]]:
+    """Yields the items of a .csv file or a JSON Lines file."""
+    if path.endswith(".csv"):
+        return iter_csv(path)
+    return iter_json_lines(path)
+
+
+@dataclass
+class LoadReport:
+    """Result of a bulk load."""
+
+    items: int
+    seconds: float
+
+    @property
+    def items_per_second(self) -> float:
+        return self.items / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"Loaded {self.items} items in {self.seconds:.2f}s "
+            f"({self.items_per_second:.0f} items/s)"
+        )
+
+
+def _chunks(items: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def bulk_load(
+    table_name: str,
+    items: Iterable[Dict[str, Any]],
+    region_name: str = None,
+    endpoint_url: str = None,
+    max_workers: int = 4,
+    chunk_size: int = 500,
+    overwrite_by_pkeys: List[str] = None,
+    session: boto3.session.Session = None,
+    verbose: bool = False,
+) -> LoadReport:
+    """Writes items to a DynamoDB table with batch_writer on a pool of threads.
+
+    batch_writer resubmits the UnprocessedItems of every BatchWriteItem response, and
+    throttled requests are retried with adaptive backoff. At most two chunks per
+    thread are read ahead of the writers.
+
+    Chunks are written concurrently, so when items with the same key are in
+    different chunks, which of them ends up in the table is not deterministic,
+    unlike with put_item in input order. Only duplicates within a chunk keep the
+    last item.
+
+    Args:
+        table_name (str): Name of the table
+        items (Iterable[Dict]): Items to write, e.g. from iter_json_lines
+        region_name (str, Optional): AWS region of the table
+        endpoint_url (str, Optional): DynamoDB endpoint, e.g. DynamoDB Local
+        max_workers (int, Optional): Number of writer threads
+        chunk_size (int, Optional): Number of items handed to a thread at a time
+        overwrite_by_pkeys (List[str], Optional): Primary key attributes, to keep the
+        last of the items with the same key within a batch instead of failing it.
+        Read from the key schema of the table by default
+        session (Session, Optional): boto3 session to create the table resources with
+        verbose (bool, Optional): Print progress after every chunk
+
+    Returns:
+        LoadReport: number of items written, elapsed time and items per second
+    """
+    session = session or boto3.session.Session()
+    # Sessions and resources are not thread safe, so the resources are created
+    # here and every writer thread takes one of its own
+    tables = queue.SimpleQueue()
+    for _ in range(max_workers):
+        tables.put(
+            session.resource(
+                "dynamodb",
+                region_name=region_name,
+                endpoint_url=endpoint_url,
+                config=RETRY_CONFIG,
+            ).Table(table_name)
+        )
+    if overwrite_by_pkeys is None:
+        # put_item overwrites items with the same key, a batch rejects them
+        table = tables.get()
+        overwrite_by_pkeys = [key["AttributeName"] for key in table.key_schema]
+        tables.put(table)
+    local = threading.local()
+
+    def write(chunk: List[Dict[str, Any]]) -> int:
+        table = getattr(local, "table", None)
+        if table is None:
+            table = local.table = tables.get_nowait()
+        with table.batch_writer(overwrite_by_pkeys=overwrite_by_pkeys) as batch:
+            for item in chunk:
+                batch.put_item(Item=item)
+        return len(chunk)
+
+    start = time.perf_counter()
+    loaded = 0
+
+    def collect(done) -> int:
+        count = sum(future.result() for future in done)
+        if verbose:
+            elapsed = time.perf_counter() - start
+            print(f"{loaded + count} items, {(loaded + count) / elapsed:.0f} items/s")
+        return count
+
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="dynamodb-loader"
+    ) as executor:
+        pending = set()
+        for chunk in _chunks(items, chunk_size):
+            if len(pending) >= 2 * max_workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                loaded += collect(done)
+            pending.add(executor.submit(write, chunk))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            loaded += collect(done)
+
+    return LoadReport(items=loaded, seconds=time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load a JSON Lines or CSV file into a DynamoDB table"
+    )
+    parser.add_argument("path", help="JSON Lines or .csv file")
+    parser.add_argument("table_name")
+    parser.add_argument("--region")
+    parser.add_argument("--endpoint-url", help="e.g. http://localhost:8000")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+
+    report = bulk_load(
+        args.table_name,
+        iter_items(args.path),
+        region_name=args.region,
+        endpoint_url=args.endpoint_url,
+        max_workers=args.workers,
+        chunk_size=args.chunk_size,
+    )
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
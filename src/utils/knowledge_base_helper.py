@@ -8,6 +8,7 @@ It includes methods for creating, updating, and invoking Knowledge Bases, as wel
 IAM roles and OpenSearch Serverless.
 """
 
+import asyncio
 import json
 import boto3
 import time
@@ -16,11 +17,15 @@ from opensearchpy import (
     OpenSearch,
     RequestsHttpConnection,
     AWSV4SignerAuth,
+    AuthorizationException,
     RequestError,
 )
 import pprint
 from retrying import retry
 import random
+from typing import Dict, List, Tuple
+
+from src.utils import waiters
 
 valid_embedding_models = [
     "cohere.embed-multilingual-v3",
@@ -226,7 +231,7 @@ class KnowledgeBasesForAmazonBedrock:
                 kb_description,
                 bedrock_kb_execution_role,
             )
-            interactive_sleep(60)
+            self.wait_knowledge_base(knowledge_base["knowledgeBaseId"])
             print(
                 "========================================================================================"
             )
@@ -594,25 +599,22 @@ class KnowledgeBasesForAmazonBedrock:
         print(host)
         # wait for collection creation
         # This can take couple of minutes to finish
-        response = self.aoss_client.batch_get_collection(names=[vector_store_name])
-        # Periodically check collection status
-        while (response["collectionDetails"][0]["status"]) == "CREATING":
-            print("Creating collection...")
-            interactive_sleep(30)
-            response = self.aoss_client.batch_get_collection(names=[vector_store_name])
+        response = waiters.wait_until(
+            lambda: self.aoss_client.batch_get_collection(names=[vector_store_name]),
+            lambda response: response["collectionDetails"][0]["status"] != "CREATING",
+            timeout=900,
+            description=f"collection {vector_store_name}",
+            on_poll=lambda response: print("Creating collection...", end="\r"),
+        )
         print("\nCollection successfully created:")
         pp.pprint(response["collectionDetails"])
         # create opensearch serverless access policy and attach it to Bedrock execution role
         try:
-            created = self.create_oss_policy_attach_bedrock_execution_role(
+            self.create_oss_policy_attach_bedrock_execution_role(
                 collection_id, oss_policy_name, bedrock_kb_execution_role
             )
-            if created:
-                # It can take up to a minute for data access rules to be enforced
-                print(
-                    "Sleeping for a minute to ensure data access rules have been enforced"
-                )
-                interactive_sleep(60)
+            # It can take up to a minute for data access rules to be enforced,
+            # create_vector_index retries until they are
             return host, collection, collection_id, collection_arn
         except Exception as e:
             print("Policy already exists")
@@ -648,16 +650,25 @@ class KnowledgeBasesForAmazonBedrock:
             },
         }
 
-        # Create index
+        # Create index, retrying until the data access rules are enforced
         try:
-            response = self.oss_client.indices.create(
-                index=index_name, body=json.dumps(body_json)
+            response = waiters.retry_call(
+                lambda: self.oss_client.indices.create(
+                    index=index_name, body=json.dumps(body_json)
+                ),
+                retry_if=lambda e: isinstance(e, AuthorizationException),
+                timeout=180,
             )
             print("\nCreating index:")
             pp.pprint(response)
 
             # index creation can take up to a minute
-            interactive_sleep(60)
+            waiters.wait_until(
+                lambda: self.oss_client.indices.exists(index=index_name),
+                bool,
+                timeout=180,
+                description=f"index {index_name}",
+            )
         except RequestError as e:
             # you can delete the index if its already exists
             # oss_client.indices.delete(index=index_name)
@@ -789,6 +800,35 @@ class KnowledgeBasesForAmazonBedrock:
             pp.pprint(ds)
         return kb, ds
 
+    def wait_knowledge_base(self, kb_id: str, timeout: float = 600) -> str:
+        """
+        Wait until the Knowledge Base is not CREATING, UPDATING or DELETING
+        Args:
+            kb_id: knowledge base id
+            timeout: seconds to wait before raising WaiterTimeout
+        Returns:
+            the final status of the knowledge base
+        """
+        return waiters.wait_until(
+            lambda: self.bedrock_agent_client.get_knowledge_base(knowledgeBaseId=kb_id)[
+                "knowledgeBase"
+            ]["status"],
+            waiters.is_settled,
+            timeout=timeout,
+            description=f"knowledge base {kb_id}",
+        )
+
+    def _get_ingestion_job(self, job: Dict) -> Dict:
+        return self.bedrock_agent_client.get_ingestion_job(
+            knowledgeBaseId=job["knowledgeBaseId"],
+            dataSourceId=job["dataSourceId"],
+            ingestionJobId=job["ingestionJobId"],
+        )["ingestionJob"]
+
+    @staticmethod
+    def _ingestion_job_done(job: Dict) -> bool:
+        return job["status"] in ("COMPLETE", "FAILED", "STOPPED")
+
     def synchronize_data(self, kb_id, ds_id):
         """
         Start an ingestion job to synchronize data from an S3 bucket to the Knowledge Base
@@ -798,14 +838,7 @@ class KnowledgeBasesForAmazonBedrock:
             ds_id: data source id
         """
         # ensure that the kb is available
-        i_status = ["CREATING", "DELETING", "UPDATING"]
-        while (
-            self.bedrock_agent_client.get_knowledge_base(knowledgeBaseId=kb_id)[
-                "knowledgeBase"
-            ]["status"]
-            in i_status
-        ):
-            time.sleep(10)
+        self.wait_knowledge_base(kb_id)
         # Start an ingestion job
         start_job_response = self.bedrock_agent_client.start_ingestion_job(
             knowledgeBaseId=kb_id, dataSourceId=ds_id
@@ -813,16 +846,67 @@ class KnowledgeBasesForAmazonBedrock:
         job = start_job_response["ingestionJob"]
         pp.pprint(job)
         # Get job
-        while job["status"] != "COMPLETE" and job["status"] != "FAILED":
-            get_job_response = self.bedrock_agent_client.get_ingestion_job(
-                knowledgeBaseId=kb_id,
-                dataSourceId=ds_id,
-                ingestionJobId=job["ingestionJobId"],
-            )
-            job = get_job_response["ingestionJob"]
-            interactive_sleep(5)
+        job = waiters.wait_until(
+            lambda: self._get_ingestion_job(job),
+            self._ingestion_job_done,
+            timeout=3600,
+            description=f"ingestion job {job['ingestionJobId']}",
+        )
         pp.pprint(job)
-        # interactive_sleep(40)
+
+    async def wait_ingestion_jobs_async(
+        self, jobs: List[Dict], timeout: float = 3600
+    ) -> List[Dict]:
+        """
+        Wait for several ingestion jobs at once
+        Args:
+            jobs: ingestion jobs, as returned by start_ingestion_job
+            timeout: seconds to wait for each job
+        Returns:
+            the final state of every job, in order
+        """
+        return await asyncio.gather(
+            *(
+                waiters.wait_until_async(
+                    lambda job=job: self._get_ingestion_job(job),
+                    self._ingestion_job_done,
+                    timeout=timeout,
+                    description=f"ingestion job {job['ingestionJobId']}",
+                )
+                for job in jobs
+            )
+        )
+
+    async def synchronize_data_async(
+        self, data_sources: List[Tuple[str, str]]
+    ) -> List[Dict]:
+        """
+        Synchronize several data sources at once, waiting for all ingestion jobs
+        Args:
+            data_sources: (knowledge base id, data source id) pairs
+        Returns:
+            the final state of every ingestion job, in order
+        """
+        kb_ids = list(dict.fromkeys(kb_id for kb_id, _ in data_sources))
+        await asyncio.gather(
+            *(
+                waiters.wait_until_async(
+                    lambda kb_id=kb_id: self.bedrock_agent_client.get_knowledge_base(
+                        knowledgeBaseId=kb_id
+                    )["knowledgeBase"]["status"],
+                    waiters.is_settled,
+                    description=f"knowledge base {kb_id}",
+                )
+                for kb_id in kb_ids
+            )
+        )
+        jobs = [
+            self.bedrock_agent_client.start_ingestion_job(
+                knowledgeBaseId=kb_id, dataSourceId=ds_id
+            )["ingestionJob"]
+            for kb_id, ds_id in data_sources
+        ]
+        return await self.wait_ingestion_jobs_async(jobs)
 
     def get_kb(self, kb_id):
         """
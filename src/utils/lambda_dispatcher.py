@@ -0,0 +1,287 @@
+# Copyright 2024 Amazon.com and its affiliates; all rights reserved.
+# This file is AWS Content and may not be duplicated or distributed without permission
+
+"""
+This module contains a dispatcher for Lambda functions that implement the actions of a
+Bedrock Agent action group with a function schema.
+
+It has no dependencies beyond the Python standard library and boto3, so it can be
+shipped next to a Lambda function or inlined into one (see
+AgentsForAmazonBedrock.create_lambda_file).
+
+    dispatcher = ActionGroupDispatcher()
+
+    @dispatcher.action()
+    def get_booking_details(booking_id: str) -> dict:
+        return client("dynamodb").get_item(...)
+
+    def lambda_handler(event, context):
+        return dispatcher.dispatch(event, context)
+"""
+
+import inspect
+import json
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+_clients: Dict[Tuple, Any] = {}
+_clients_lock = threading.Lock()
+
+
+def _cached(kind: str, service_name: str, **kwargs) -> Any:
+    key = (kind, service_name, tuple(sorted(kwargs.items())))
+    cached = _clients.get(key)
+    if cached is None:
+        with _clients_lock:
+            cached = _clients.get(key)
+            if cached is None:
+                import boto3
+
+                cached = getattr(boto3, kind)(service_name, **kwargs)
+                _clients[key] = cached
+    return cached
+
+
+def client(service_name: str, **kwargs) -> Any:
+    """Returns a boto3 client that is created once per Lambda execution environment.
+
+    Clients are kept at module level, so only the cold start pays for creating them
+    and warm invocations reuse their connection pools.
+
+    Args:
+        service_name (str): Name of the AWS service, e.g. 'dynamodb'
+        **kwargs: Additional arguments for boto3.client, e.g. region_name
+    """
+    return _cached("client", service_name, **kwargs)
+
+
+def resource(service_name: str, **kwargs) -> Any:
+    """Returns a boto3 resource that is created once per Lambda execution environment.
+
+    Args:
+        service_name (str): Name of the AWS service, e.g. 'dynamodb'
+        **kwargs: Additional arguments for boto3.resource, e.g. region_name
+    """
+    return _cached("resource", service_name, **kwargs)
+
+
+def _parse_array(value: str) -> Any:
+    try:
+        return json.loads(value)
+    except ValueError:
+        return [item.strip() for item in value.strip("[]").split(",") if item.strip()]
+
+
+def _parse_number(value: str) -> Any:
+    number = float(value)
+    return int(number) if number.is_integer() and "." not in value else number
+
+
+# Converters from the parameter types of a function schema to Python values
+COERCIONS: Dict[str, Callable[[str], Any]] = {
+    "string": str,
+    "integer": int,
+    "number": _parse_number,
+    "boolean": lambda value: str(value).strip().lower() in ("true", "1", "yes"),
+    "array": _parse_array,
+}
+
+
+def parameter_map(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Returns the parameters of an event by name, converted to their schema types.
+
+    Values that cannot be converted are kept as strings.
+
+    Args:
+        event (Dict): Bedrock Agent Lambda event
+    """
+    parameters = {}
+    for parameter in event.get("parameters") or []:
+        value = parameter.get("value")
+        coerce = COERCIONS.get(parameter.get("type"))
+        if coerce is not None and value is not None:
+            try:
+                value = coerce(value)
+            except (TypeError, ValueError):
+                pass
+        parameters[parameter["name"]] = value
+    return parameters
+
+
+class Action:
+    """A function registered with an ActionGroupDispatcher.
+
+    The signature is inspected once at registration, not on every invocation.
+    """
+
+    def __init__(self, func: Callable, name: str):
+        self.func = func
+        self.name = name
+
+        self.parameters: List[str] = []
+        self.required: List[str] = []
+        self.accepts_kwargs = False
+        for param in inspect.signature(func).parameters.values():
+            if param.kind == inspect.Parameter.VAR_KEYWORD:
+                self.accepts_kwargs = True
+            elif param.kind in (
+                inspect.Parameter.POSITIONAL_OR_KEYWORD,
+                inspect.Parameter.KEYWORD_ONLY,
+            ):
+                self.parameters.append(param.name)
+                if param.default is inspect.Parameter.empty:
+                    self.required.append(param.name)
+
+    def arguments(
+        self, parameters: Dict[str, Any], session_attributes: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """Returns the keyword arguments for the function and the missing parameters."""
+        if self.accepts_kwargs:
+            kwargs = dict(parameters)
+        else:
+            kwargs = {
+                name: parameters[name] for name in self.parameters if name in parameters
+            }
+
+        missing = []
+        for name in self.required:
+            if name not in kwargs:
+                # Fall back to the session state for parameters the agent did not fill
+                if name in session_attributes:
+                    kwargs[name] = session_attributes[name]
+                else:
+                    missing.append(name)
+        return kwargs, missing
+
+
+class ActionGroupDispatcher:
+    """Routes Bedrock Agent Lambda events to registered Python functions.
+
+    Functions are looked up in a dict by function name, optionally scoped to an
+    action group, instead of an if/elif chain. Event parameters are collected into a
+    dict once per event and converted to the types declared in the function schema.
+    """
+
+    def __init__(
+        self,
+        serialize: Optional[Callable[[Any], str]] = None,
+        failure_state: bool = False,
+    ):
+        """
+        Args:
+            serialize (Callable, Optional): Converts function results to the response
+            body. Defaults to str() for strings and json.dumps() for everything else
+            failure_state (bool, Optional): Return errors and unknown functions with
+            responseState FAILURE, which ends the agent's turn, instead of as text
+            the agent can act on. Defaults to False
+        """
+        self._actions: Dict[Tuple[Optional[str], str], Action] = {}
+        self.serialize = serialize or self._serialize
+        self.failure_state = failure_state
+
+    def register(
+        self, func: Callable, name: str = None, action_group: str = None
+    ) -> Callable:
+        """Registers a function as an action.
+
+        Args:
+            func (Callable): The function to call
+            name (str, Optional): Function name in the schema. Defaults to func.__name__
+            action_group (str, Optional): Only route events of this action group here
+        """
+        name = name or func.__name__
+        self._actions[(action_group, name)] = Action(func, name)
+        return func
+
+    def action(self, name: str = None, action_group: str = None) -> Callable:
+        """Decorator form of register."""
+
+        def decorator(func: Callable) -> Callable:
+            return self.register(func, name=name, action_group=action_group)
+
+        return decorator
+
+    @property
+    def functions(self) -> List[str]:
+        """Names of the registered functions."""
+        return [name for _, name in self._actions]
+
+    def route(self, action_group: str, function: str) -> Optional[Action]:
+        """Returns the action for an event, or None if nothing is registered."""
+        return self._actions.get((action_group, function)) or self._actions.get(
+            (None, function)
+        )
+
+    def dispatch(self, event: Dict[str, Any], context: Any = None) -> Dict[str, Any]:
+        """Handles a Bedrock Agent Lambda event.
+
+        Args:
+            event (Dict): Bedrock Agent Lambda event
+            context (Any): Lambda context, unused
+
+        Returns:
+            Dict: Lambda response in the format the agent expects
+        """
+        function = event.get("function", "")
+        action = self.route(event.get("actionGroup", ""), function)
+        if action is None:
+            return self.response(
+                event, f"Error: Function '{function}' not recognized", self._failure
+            )
+
+        kwargs, missing = action.arguments(
+            parameter_map(event), event.get("sessionAttributes") or {}
+        )
+        if missing:
+            return self.response(
+                event,
+                f"Missing required parameter: {', '.join(missing)}",
+                "REPROMPT",
+            )
+
+        try:
+            result = action.func(**kwargs)
+        except Exception as e:
+            error_message = f"Error executing {function}: {str(e)}"
+            print(error_message)
+            return self.response(event, error_message, self._failure)
+        return self.response(event, self.serialize(result))
+
+    __call__ = dispatch
+
+    @property
+    def _failure(self) -> Optional[str]:
+        return "FAILURE" if self.failure_state else None
+
+    def response(
+        self, event: Dict[str, Any], body: str, response_state: str = None
+    ) -> Dict[str, Any]:
+        """Builds the Lambda response for an event.
+
+        Args:
+            event (Dict): Bedrock Agent Lambda event
+            body (str): Text returned to the agent
+            response_state (str, Optional): FAILURE or REPROMPT
+        """
+        function_response = {"responseBody": {"TEXT": {"body": body}}}
+        if response_state:
+            function_response["responseState"] = response_state
+        return {
+            "messageVersion": event.get("messageVersion", "1.0"),
+            "response": {
+                "actionGroup": event.get("actionGroup", ""),
+                "function": event.get("function", ""),
+                "functionResponse": function_response,
+            },
+            "sessionAttributes": event.get("sessionAttributes") or {},
+            "promptSessionAttributes": event.get("promptSessionAttributes") or {},
+        }
+
+    @staticmethod
+    def _serialize(result: Any) -> str:
+        if isinstance(result, str):
+            return result
+        try:
+            return json.dumps(result)
+        except (TypeError, ValueError):
+            return str(result)
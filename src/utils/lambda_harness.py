@@ -0,0 +1,261 @@
+# Copyright 2024 Amazon.com and its affiliates; all rights reserved.
+# This file is AWS Content and may not be duplicated or distributed without permission
+
+"""
+This module contains a local harness that replays Bedrock Agent Lambda events against
+an action group Lambda function, to check its responses and compare cold and warm
+invocation latency before deploying it.
+
+A cold start is measured in a fresh Python interpreter, which imports the Lambda file
+and handles the first event, as a new Lambda execution environment would. Warm
+invocations reuse one loaded module.
+
+    python -m src.utils.lambda_harness lambda_function.py events.json --warm 100
+
+events.json holds a list of events, either complete Lambda events or
+{"function": ..., "parameters": {...}} shorthands expanded by make_event.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from typing import Any, Callable, Dict, List
+
+
+def _schema_type(value: Any) -> str:
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "integer"
+    if isinstance(value, float):
+        return "number"
+    if isinstance(value, (list, tuple)):
+        return "array"
+    return "string"
+
+
+def make_event(
+    function: str,
+    parameters: Dict[str, Any] = None,
+    action_group: str = "ActionGroup",
+    session_attributes: Dict[str, str] = None,
+    agent_name: str = "local-agent",
+) -> Dict[str, Any]:
+    """Builds a Bedrock Agent Lambda event for a function schema action group.
+
+    Parameter types are inferred from the Python values, and values are sent as
+    strings the way the agent sends them.
+
+    Args:
+        function (str): Name of the function to invoke
+        parameters (Dict, Optional): Parameter values by name
+        action_group (str, Optional): Name of the action group
+        session_attributes (Dict, Optional): Session attributes of the invocation
+        agent_name (str, Optional): Name of the agent in the event
+    """
+    return {
+        "messageVersion": "1.0",
+        "agent": {
+            "name": agent_name,
+            "id": "LOCALAGENT",
+            "alias": "TSTALIASID",
+            "version": "DRAFT",
+        },
+        "inputText": "",
+        "sessionId": str(uuid.uuid4()),
+        "actionGroup": action_group,
+        "function": function,
+        "parameters": [
+            {
+                "name": name,
+                "type": _schema_type(value),
+                "value": (
+                    json.dumps(value)
+                    if isinstance(value, (list, tuple))
+                    else str(value).lower() if isinstance(value, bool) else str(value)
+                ),
+            }
+            for name, value in (parameters or {}).items()
+        ],
+        "sessionAttributes": session_attributes or {},
+        "promptSessionAttributes": {},
+    }
+
+
+def load_events(path: str) -> List[Dict[str, Any]]:
+    """Loads events from a JSON file, expanding make_event shorthands."""
+    with open(path, "r") as f:
+        events = json.load(f)
+    if isinstance(events, dict):
+        events = [events]
+    return [
+        event if "messageVersion" in event else make_event(**event) for event in events
+    ]
+
+
+def load_handler(source_file: str, handler: str = "lambda_handler") -> Callable:
+    """Imports a Lambda source file as a new module and returns its handler.
+
+    Modules next to the source file are importable, as they are in the Lambda
+    package, and so is lambda_dispatcher.
+    """
+    source_file = os.path.abspath(source_file)
+    directory = os.path.dirname(source_file)
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    # Lambda files that import lambda_dispatcher without shipping a copy
+    utils_directory = os.path.dirname(os.path.abspath(__file__))
+    if utils_directory not in sys.path:
+        sys.path.append(utils_directory)
+
+    module_name = f"_lambda_{uuid.uuid4().hex}"
+    spec = importlib.util.spec_from_file_location(module_name, source_file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, handler)
+
+
+class _NullContext:
+    function_name = "local"
+    aws_request_id = "local"
+
+    def get_remaining_time_in_millis(self) -> int:
+        return 180_000
+
+
+def cold_start(
+    source_file: str, event: Dict[str, Any], handler: str = "lambda_handler"
+) -> Dict[str, Any]:
+    """Imports the Lambda file and handles one event in a fresh interpreter.
+
+    Returns:
+        Dict: init_ms (import time), invoke_ms (first invocation) and the response
+    """
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "src.utils.lambda_harness",
+            "--cold-worker",
+            source_file,
+        ],
+        input=json.dumps({"event": event, "handler": handler}),
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")),
+    )
+    # The handler may print; the measurement is the last line
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def _cold_worker(source_file: str):
+    request = json.loads(sys.stdin.read())
+    start = time.perf_counter()
+    lambda_handler = load_handler(source_file, request["handler"])
+    loaded = time.perf_counter()
+    response = lambda_handler(request["event"], _NullContext())
+    done = time.perf_counter()
+    print(
+        json.dumps(
+            {
+                "init_ms": (loaded - start) * 1e3,
+                "invoke_ms": (done - loaded) * 1e3,
+                "response": response,
+            },
+            default=str,
+        )
+    )
+
+
+def replay(
+    source_file: str,
+    events: List[Dict[str, Any]],
+    warm: int = 100,
+    cold: int = 3,
+    handler: str = "lambda_handler",
+) -> Dict[str, Any]:
+    """Replays events against a Lambda file and measures cold and warm latency.
+
+    Args:
+        source_file (str): Path of the Lambda source file
+        events (List[Dict]): Events to replay, round robin
+        warm (int, Optional): Number of warm invocations
+        cold (int, Optional): Number of cold starts, each in a fresh interpreter
+        handler (str, Optional): Name of the handler function
+
+    Returns:
+        Dict: cold and warm latency statistics in milliseconds, and the first
+        response of every event
+    """
+    cold_starts = [
+        cold_start(source_file, events[idx % len(events)], handler)
+        for idx in range(cold)
+    ]
+
+    lambda_handler = load_handler(source_file, handler)
+    context = _NullContext()
+    responses = [lambda_handler(event, context) for event in events]
+    timings = []
+    for idx in range(warm):
+        start = time.perf_counter()
+        lambda_handler(events[idx % len(events)], context)
+        timings.append((time.perf_counter() - start) * 1e3)
+
+    def summary(values: List[float]) -> Dict[str, float]:
+        if not values:
+            return {}
+        ordered = sorted(values)
+        return {
+            "mean": statistics.fmean(ordered),
+            "p50": ordered[len(ordered) // 2],
+            "p99": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+        }
+
+    return {
+        "cold_init_ms": summary([run["init_ms"] for run in cold_starts]),
+        "cold_invoke_ms": summary([run["invoke_ms"] for run in cold_starts]),
+        "warm_invoke_ms": summary(timings),
+        "responses": responses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay Bedrock Agent events against a Lambda function file"
+    )
+    parser.add_argument("source_file", help="Lambda source file")
+    parser.add_argument("events", nargs="?", help="JSON file with events")
+    parser.add_argument("--handler", default="lambda_handler")
+    parser.add_argument("--warm", type=int, default=100)
+    parser.add_argument("--cold", type=int, default=3)
+    parser.add_argument("--cold-worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cold_worker:
+        return _cold_worker(args.source_file)
+
+    report = replay(
+        args.source_file,
+        load_events(args.events),
+        warm=args.warm,
+        cold=args.cold,
+        handler=args.handler,
+    )
+    for name in ("cold_init_ms", "cold_invoke_ms", "warm_invoke_ms"):
+        stats = report[name]
+        print(
+            f"{name:16} "
+            + "  ".join(f"{key} {value:8.3f}" for key, value in stats.items())
+        )
+    print(json.dumps(report["responses"], indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import threading
+import time
+import unittest
+
+from src.utils.dynamodb_loader import LoadReport, bulk_load
+
+
+class StubBatchWriter:
+    """Keeps the last item per key, as batch_writer does with overwrite_by_pkeys."""
+
+    def __init__(self, table, overwrite_by_pkeys):
+        self.table = table
+        self.overwrite_by_pkeys = overwrite_by_pkeys
+        self.items = dict()
+
+    def __enter__(self):
+        return self
+
+    def put_item(self, Item):
+        if Item.get("fail"):
+            raise RuntimeError(f"cannot write {Item['pk']}")
+        if self.overwrite_by_pkeys:
+            key = tuple(Item[name] for name in self.overwrite_by_pkeys)
+        else:
+            key = len(self.items)
+        self.items[key] = Item
+
+    def __exit__(self, *exc_info):
+        if exc_info[0] is None:
+            self.table.flush(list(self.items.values()))
+        return False
+
+
+class StubTable:
+    def __init__(self, store):
+        self.store = store
+        self.key_schema = [
+            {"AttributeName": "pk", "KeyType": "HASH"},
+            {"AttributeName": "sk", "KeyType": "RANGE"},
+        ]
+        self.created_on = threading.current_thread()
+        self.used_on = set()
+
+    def batch_writer(self, overwrite_by_pkeys=None):
+        self.used_on.add(threading.current_thread().name)
+        self.store.overwrite_by_pkeys.append(overwrite_by_pkeys)
+        self.store.release.wait(5)
+        return StubBatchWriter(self, overwrite_by_pkeys)
+
+    def flush(self, items):
+        time.sleep(self.store.latency)
+        with self.store.lock:
+            self.store.batches.append(len(items))
+            for item in items:
+                self.store.items[(item["pk"], item["sk"])] = item
+
+
+class StubSession:
+    """Stands in for a boto3 session, creating one table resource per call."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.release = threading.Event()
+        self.release.set()
+        self.tables = []
+        self.batches = []
+        self.items = dict()
+        self.overwrite_by_pkeys = []
+
+    def resource(self, service_name, **kwargs):
+        session = self
+
+        class Resource:
+            def Table(self, table_name):
+                table = StubTable(session)
+                session.tables.append(table)
+                return table
+
+        return Resource()
+
+
+def make_items(count, keys=None):
+    for idx in range(count):
+        key = idx % keys if keys else idx
+        yield {"pk": f"item-{key}", "sk": "0", "value": idx}
+
+
+class TestBulkLoad(unittest.TestCase):
+    def test_chunks_are_spread_over_workers(self):
+        session = StubSession(latency=0.01)
+
+        report = bulk_load(
+            "table",
+            make_items(1050),
+            max_workers=3,
+            chunk_size=100,
+            session=session,
+        )
+
+        self.assertEqual(report.items, 1050)
+        self.assertEqual(len(session.items), 1050)
+        self.assertEqual(sorted(session.batches), [50] + [100] * 10)
+        self.assertEqual(len(session.tables), 3)
+        # Resources are created on the calling thread and used by one writer each
+        for table in session.tables:
+            self.assertIs(table.created_on, threading.main_thread())
+            self.assertLessEqual(len(table.used_on), 1)
+        self.assertGreater(sum(1 for table in session.tables if table.used_on), 1)
+
+    def test_read_ahead_is_bounded(self):
+        session = StubSession()
+        session.release.clear()
+        consumed = []
+
+        def items():
+            for item in make_items(10000):
+                consumed.append(item)
+                yield item
+
+        thread = threading.Thread(
+            target=bulk_load,
+            args=("table", items()),
+            kwargs={"max_workers": 2, "chunk_size": 10, "session": session},
+        )
+        thread.start()
+        try:
+            deadline = time.monotonic() + 5
+            while len(consumed) < 50 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            time.sleep(0.05)
+            # Two chunks per writer are pending, and the next one is read and waits
+            self.assertEqual(len(consumed), (2 * 2 + 1) * 10)
+        finally:
+            session.release.set()
+            thread.join(10)
+        self.assertEqual(len(consumed), 10000)
+
+    def test_duplicate_keys_use_the_key_schema(self):
+        session = StubSession()
+
+        report = bulk_load(
+            "table", make_items(1000, keys=50), chunk_size=1000, session=session
+        )
+
+        self.assertEqual(session.overwrite_by_pkeys, [["pk", "sk"]])
+        self.assertEqual(session.batches, [50])
+        self.assertEqual(len(session.items), 50)
+        # The last item with each key is kept within a chunk
+        self.assertEqual(session.items[("item-0", "0")]["value"], 950)
+        self.assertEqual(report.items, 1000)
+
+    def test_explicit_overwrite_by_pkeys(self):
+        session = StubSession()
+
+        bulk_load(
+            "table",
+            make_items(10),
+            overwrite_by_pkeys=["pk"],
+            max_workers=1,
+            session=session,
+        )
+
+        self.assertEqual(session.overwrite_by_pkeys, [["pk"]])
+
+    def test_chunk_error_reaches_caller(self):
+        session = StubSession()
+        items = list(make_items(100))
+        items[42]["fail"] = True
+
+        with self.assertRaisesRegex(RuntimeError, "cannot write item-42"):
+            bulk_load("table", items, max_workers=2, chunk_size=10, session=session)
+
+    def test_empty_input(self):
+        report = bulk_load("table", [], session=StubSession())
+
+        self.assertEqual(report.items, 0)
+
+
+class TestLoadReport(unittest.TestCase):
+    def test_counts(self):
+        report = LoadReport(items=1000, seconds=2.0)
+
+        self.assertEqual(report.items_per_second, 500.0)
+        self.assertEqual(str(report), "Loaded 1000 items in 2.00s (500 items/s)")
+        self.assertEqual(LoadReport(items=0, seconds=0.0).items_per_second, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import unittest
+
+from src.utils.lambda_dispatcher import ActionGroupDispatcher, parameter_map
+
+
+def make_event(function, parameters=(), session_attributes=None):
+    return {
+        "messageVersion": "1.0",
+        "actionGroup": "bookings",
+        "function": function,
+        "parameters": [
+            {"name": name, "type": type_, "value": value}
+            for name, type_, value in parameters
+        ],
+        "sessionAttributes": session_attributes or {},
+    }
+
+
+def function_response(response):
+    return response["response"]["functionResponse"]
+
+
+class TestParameterMap(unittest.TestCase):
+    def test_coercion(self):
+        event = make_event(
+            "f",
+            [
+                ("name", "string", "Anna"),
+                ("guests", "integer", "4"),
+                ("price", "number", "12.5"),
+                ("count", "number", "3"),
+                ("vip", "boolean", "True"),
+                ("tags", "array", '["a", "b"]'),
+                ("days", "array", "[mon, tue]"),
+            ],
+        )
+        self.assertEqual(
+            parameter_map(event),
+            {
+                "name": "Anna",
+                "guests": 4,
+                "price": 12.5,
+                "count": 3,
+                "vip": True,
+                "tags": ["a", "b"],
+                "days": ["mon", "tue"],
+            },
+        )
+
+    def test_invalid_value_is_kept(self):
+        event = make_event("f", [("guests", "integer", "four")])
+        self.assertEqual(parameter_map(event), {"guests": "four"})
+
+
+class TestActionGroupDispatcher(unittest.TestCase):
+    def setUp(self):
+        self.dispatcher = ActionGroupDispatcher()
+
+        @self.dispatcher.action()
+        def create_booking(name: str, guests: int, date: str):
+            return {"name": name, "guests": guests, "date": date}
+
+        @self.dispatcher.action()
+        def fail():
+            raise ValueError("table is full")
+
+    def test_dispatch(self):
+        response = self.dispatcher.dispatch(
+            make_event(
+                "create_booking",
+                [
+                    ("name", "string", "Anna"),
+                    ("guests", "integer", "4"),
+                    ("date", "string", "2024-05-01"),
+                ],
+            )
+        )
+        self.assertEqual(
+            function_response(response),
+            {
+                "responseBody": {
+                    "TEXT": {
+                        "body": '{"name": "Anna", "guests": 4, "date": "2024-05-01"}'
+                    }
+                }
+            },
+        )
+        self.assertEqual(response["response"]["actionGroup"], "bookings")
+
+    def test_session_attribute_fallback(self):
+        response = self.dispatcher.dispatch(
+            make_event(
+                "create_booking",
+                [("name", "string", "Anna"), ("guests", "integer", "4")],
+                session_attributes={"date": "2024-05-01", "guests": "9"},
+            )
+        )
+        body = function_response(response)["responseBody"]["TEXT"]["body"]
+        self.assertEqual(body, '{"name": "Anna", "guests": 4, "date": "2024-05-01"}')
+        self.assertNotIn("responseState", function_response(response))
+
+    def test_reprompt(self):
+        response = self.dispatcher.dispatch(
+            make_event("create_booking", [("name", "string", "Anna")])
+        )
+        self.assertEqual(function_response(response)["responseState"], "REPROMPT")
+        self.assertEqual(
+            function_response(response)["responseBody"]["TEXT"]["body"],
+            "Missing required parameter: guests, date",
+        )
+
+    def test_errors_are_text(self):
+        response = self.dispatcher.dispatch(make_event("fail"))
+        self.assertEqual(
+            function_response(response),
+            {"responseBody": {"TEXT": {"body": "Error executing fail: table is full"}}},
+        )
+
+        response = self.dispatcher.dispatch(make_event("unknown"))
+        self.assertEqual(
+            function_response(response),
+            {
+                "responseBody": {
+                    "TEXT": {"body": "Error: Function 'unknown' not recognized"}
+                }
+            },
+        )
+
+    def test_failure_state(self):
+        self.dispatcher.failure_state = True
+        for function in ("fail", "unknown"):
+            response = self.dispatcher.dispatch(make_event(function))
+            self.assertEqual(function_response(response)["responseState"], "FAILURE")
+
+    def test_action_group_scope(self):
+        self.dispatcher.register(lambda: "scoped", name="fail", action_group="bookings")
+        response = self.dispatcher.dispatch(make_event("fail"))
+        self.assertEqual(
+            function_response(response)["responseBody"]["TEXT"]["body"], "scoped"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
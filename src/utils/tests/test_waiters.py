@@ -0,0 +1,148 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from src.utils.waiters import (
+    Backoff,
+    WaiterTimeout,
+    is_settled,
+    retry_call,
+    wait_until,
+    wait_until_async,
+)
+
+NO_JITTER = Backoff(initial=1.0, maximum=4.0, multiplier=2.0, jitter=0.0)
+
+
+class TestBackoff(unittest.TestCase):
+    def test_delays(self):
+        delays = NO_JITTER.delays()
+        self.assertEqual([next(delays) for _ in range(5)], [1.0, 2.0, 4.0, 4.0, 4.0])
+
+    def test_jitter(self):
+        delays = Backoff(initial=10.0, jitter=0.5).delays()
+        for _ in range(20):
+            self.assertTrue(5.0 <= next(delays) <= 20.0)
+
+
+class TestIsSettled(unittest.TestCase):
+    def test_statuses(self):
+        for status in ("CREATING", "PREPARING", "UPDATING", "DELETING", "VERSIONING"):
+            self.assertFalse(is_settled(status), status)
+        for status in ("PREPARED", "NOT_PREPARED", "ACTIVE", "FAILED", "DELETED"):
+            self.assertTrue(is_settled(status), status)
+
+
+class TestWaitUntil(unittest.TestCase):
+    def test_settled_resource_polls_once(self):
+        poll = mock.Mock(return_value="PREPARED")
+        sleep = mock.Mock()
+
+        self.assertEqual(wait_until(poll, is_settled, sleep=sleep), "PREPARED")
+        poll.assert_called_once_with()
+        sleep.assert_not_called()
+
+    def test_polls_with_backoff(self):
+        poll = mock.Mock(side_effect=["CREATING", "CREATING", "UPDATING", "ACTIVE"])
+        on_poll = mock.Mock()
+        sleep = mock.Mock()
+
+        state = wait_until(
+            poll, is_settled, backoff=NO_JITTER, on_poll=on_poll, sleep=sleep
+        )
+
+        self.assertEqual(state, "ACTIVE")
+        self.assertEqual(poll.call_count, 4)
+        self.assertEqual(
+            on_poll.call_args_list,
+            [mock.call("CREATING"), mock.call("CREATING"), mock.call("UPDATING")],
+        )
+        self.assertEqual(
+            sleep.call_args_list, [mock.call(1.0), mock.call(2.0), mock.call(4.0)]
+        )
+
+    def test_timeout(self):
+        with self.assertRaises(WaiterTimeout) as raised:
+            wait_until(
+                lambda: "CREATING",
+                is_settled,
+                timeout=0,
+                description="agent A1",
+                sleep=mock.Mock(),
+            )
+        self.assertEqual(raised.exception.last, "CREATING")
+        self.assertIn("agent A1", str(raised.exception))
+        self.assertIsInstance(raised.exception, TimeoutError)
+
+    def test_sleep_is_capped_by_timeout(self):
+        sleep = mock.Mock()
+        with mock.patch("src.utils.waiters.time.monotonic", side_effect=[0, 7, 10]):
+            with self.assertRaises(WaiterTimeout):
+                wait_until(
+                    lambda: "CREATING",
+                    is_settled,
+                    timeout=10,
+                    backoff=Backoff(initial=5.0, jitter=0.0),
+                    sleep=sleep,
+                )
+        self.assertEqual(sleep.call_args_list, [mock.call(3.0)])
+
+
+class TestWaitUntilAsync(unittest.IsolatedAsyncioTestCase):
+    async def test_gather(self):
+        statuses = {
+            "A1": iter(["CREATING", "PREPARED"]),
+            "A2": iter(["PREPARED"]),
+        }
+        backoff = Backoff(initial=0.001, jitter=0.0)
+
+        results = await asyncio.gather(
+            *(
+                wait_until_async(
+                    lambda agent_id=agent_id: next(statuses[agent_id]),
+                    is_settled,
+                    backoff=backoff,
+                )
+                for agent_id in statuses
+            )
+        )
+
+        self.assertEqual(results, ["PREPARED", "PREPARED"])
+
+    async def test_timeout(self):
+        with self.assertRaises(WaiterTimeout):
+            await wait_until_async(lambda: "CREATING", is_settled, timeout=0)
+
+
+class TestRetryCall(unittest.TestCase):
+    def test_retries_until_success(self):
+        func = mock.Mock(side_effect=[ValueError("role"), ValueError("role"), "ok"])
+        sleep = mock.Mock()
+
+        result = retry_call(
+            func, lambda e: isinstance(e, ValueError), backoff=NO_JITTER, sleep=sleep
+        )
+
+        self.assertEqual(result, "ok")
+        self.assertEqual(func.call_count, 3)
+        self.assertEqual(sleep.call_args_list, [mock.call(1.0), mock.call(2.0)])
+
+    def test_other_errors_are_raised(self):
+        func = mock.Mock(side_effect=KeyError("missing"))
+        sleep = mock.Mock()
+
+        with self.assertRaises(KeyError):
+            retry_call(func, lambda e: isinstance(e, ValueError), sleep=sleep)
+        func.assert_called_once_with()
+        sleep.assert_not_called()
+
+    def test_last_error_is_raised_after_timeout(self):
+        func = mock.Mock(side_effect=ValueError("role"))
+
+        with self.assertRaises(ValueError):
+            retry_call(func, lambda e: True, timeout=0, sleep=mock.Mock())
+        func.assert_called_once_with()
+
+
+if __name__ == "__main__":
+    unittest.main()
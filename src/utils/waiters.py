@@ -0,0 +1,163 @@
+# Copyright 2024 Amazon.com and its affiliates; all rights reserved.
+# This file is AWS Content and may not be duplicated or distributed without permission
+
+"""
+This module contains waiters that poll the status of Bedrock resources with exponential
+backoff and jitter, used by AgentsForAmazonBedrock and KnowledgeBasesForAmazonBedrock
+instead of fixed sleeps.
+
+Resources usually settle within seconds, so the first polls come quickly and the delay
+grows for operations that take minutes. The asyncio variants run the blocking boto3
+calls in threads, so many resources can be awaited at once:
+
+    await asyncio.gather(*(
+        wait_until_async(lambda: get_status(agent_id), is_settled) for agent_id in agent_ids
+    ))
+"""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class WaiterTimeout(TimeoutError):
+    """Raised when a resource does not reach the expected state in time."""
+
+    def __init__(self, description: str, timeout: float, last: Any = None):
+        self.last = last
+        super().__init__(
+            f"Timed out after {timeout}s waiting for {description}, last seen: {last}"
+        )
+
+
+@dataclass
+class Backoff:
+    """Delays between polls: initial, then multiplied after every poll, up to maximum.
+
+    Every delay is shortened by a random fraction of up to ``jitter``, so clients
+    that start together do not poll in lockstep.
+    """
+
+    initial: float = 1.0
+    maximum: float = 20.0
+    multiplier: float = 2.0
+    jitter: float = 0.5
+
+    def delays(self) -> Iterator[float]:
+        delay = self.initial
+        while True:
+            yield delay * (1 - self.jitter * random.random())
+            delay = min(delay * self.multiplier, self.maximum)
+
+
+DEFAULT_BACKOFF = Backoff()
+
+
+def is_settled(status: str) -> bool:
+    """Returns True for statuses that do not describe an operation in progress.
+
+    Bedrock reports operations in progress as CREATING, PREPARING, UPDATING,
+    DELETING, VERSIONING and so on.
+    """
+    return not status.endswith("ING")
+
+
+def wait_until(
+    poll: Callable[[], T],
+    done: Callable[[T], bool],
+    timeout: float = 600,
+    backoff: Backoff = None,
+    description: str = "resource",
+    on_poll: Optional[Callable[[T], None]] = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> T:
+    """Polls until done returns True for the result of poll, and returns that result.
+
+    The first poll happens immediately, so a resource that is already settled costs
+    a single request.
+
+    Args:
+        poll (Callable): Returns the current state, e.g. the status of an agent
+        done (Callable): Returns True when the state is final
+        timeout (float, Optional): Seconds to wait before raising WaiterTimeout
+        backoff (Backoff, Optional): Delays between polls
+        description (str, Optional): What is waited for, used in the timeout error
+        on_poll (Callable, Optional): Called with every state that is not final
+        sleep (Callable, Optional): Sleep function, replaced in tests
+    """
+    deadline = time.monotonic() + timeout
+    for delay in (backoff or DEFAULT_BACKOFF).delays():
+        state = poll()
+        if done(state):
+            return state
+        if on_poll:
+            on_poll(state)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise WaiterTimeout(description, timeout, state)
+        sleep(min(delay, remaining))
+
+
+async def wait_until_async(
+    poll: Callable[[], T],
+    done: Callable[[T], bool],
+    timeout: float = 600,
+    backoff: Backoff = None,
+    description: str = "resource",
+    on_poll: Optional[Callable[[T], None]] = None,
+) -> T:
+    """Asyncio version of wait_until. The blocking poll function runs in a thread.
+
+    Args:
+        poll (Callable): Returns the current state, e.g. the status of an agent
+        done (Callable): Returns True when the state is final
+        timeout (float, Optional): Seconds to wait before raising WaiterTimeout
+        backoff (Backoff, Optional): Delays between polls
+        description (str, Optional): What is waited for, used in the timeout error
+        on_poll (Callable, Optional): Called with every state that is not final
+    """
+    deadline = time.monotonic() + timeout
+    for delay in (backoff or DEFAULT_BACKOFF).delays():
+        state = await asyncio.to_thread(poll)
+        if done(state):
+            return state
+        if on_poll:
+            on_poll(state)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise WaiterTimeout(description, timeout, state)
+        await asyncio.sleep(min(delay, remaining))
+
+
+def retry_call(
+    func: Callable[[], T],
+    retry_if: Callable[[Exception], bool],
+    timeout: float = 120,
+    backoff: Backoff = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> T:
+    """Calls func until it does not raise an error that retry_if accepts.
+
+    Used for errors that clear up on their own, such as a new IAM role that has not
+    propagated yet.
+
+    Args:
+        func (Callable): The call to make
+        retry_if (Callable): Returns True for errors worth retrying
+        timeout (float, Optional): Seconds after which the last error is raised
+        backoff (Backoff, Optional): Delays between attempts
+        sleep (Callable, Optional): Sleep function, replaced in tests
+    """
+    deadline = time.monotonic() + timeout
+    for delay in (backoff or DEFAULT_BACKOFF).delays():
+        try:
+            return func()
+        except Exception as e:
+            remaining = deadline - time.monotonic()
+            if not retry_if(e) or remaining <= 0:
+                raise
+            sleep(min(delay, remaining))